@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import base64
+import json
 import queue
 import re
 import threading
@@ -8,6 +9,7 @@ from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 
 import pychrome
 import requests
+from pydantic import BaseModel
 from requests.exceptions import RequestException
 from websocket import WebSocketException
 
@@ -27,6 +29,30 @@ if TYPE_CHECKING:
 patch_all()
 
 
+class ResponseStats(BaseModel):
+    """Statistics of captured responses of a single URL pattern.
+
+    Attributes:
+        received: Number of responses put into the queue.
+        taken: Number of responses taken from the queue.
+        discarded: Number of taken responses discarded as stale or duplicate.
+        max_depth: Max queue depth.
+        latency_total: Total request-to-response latency in seconds.
+        latency_max: Max request-to-response latency in seconds.
+    """
+    received: int = 0
+    taken: int = 0
+    discarded: int = 0
+    max_depth: int = 0
+    latency_total: float = 0
+    latency_max: float = 0
+
+    @property
+    def latency_avg(self) -> float:
+        """Average request-to-response latency in seconds."""
+        return self.latency_total / self.received if self.received else 0
+
+
 class ChromeRemote:
     """Wrapper for Chrome DevTools Protocol Interface.
 
@@ -41,8 +67,10 @@ class ChromeRemote:
         self._chrome_tab: pychrome.Tab
         self._response_patterns: list[str] = response_patterns
         self._response_queues: dict[str, queue.Queue[Response]] = {x: queue.Queue() for x in response_patterns}
+        self._response_stats: dict[str, ResponseStats] = {x: ResponseStats() for x in response_patterns}
         self._requests: dict[str, Request] = {}  # _requests[request_id] = <Request>
         self._requests_lock = threading.Lock()
+        self._owns_browser = True
 
     @wait_until_finished(timeout=60)
     def _connect_interface(self) -> bool:
@@ -70,6 +98,25 @@ class ChromeRemote:
         self._setup_tab()
         self._init_tab_monitor()
 
+    def spawn_tab(self) -> ChromeRemote:
+        """Open another tab in the same browser.
+
+        Returns:
+            Started remote of the new tab, stopping it
+            closes the tab only, browser stays alive.
+        """
+        remote = ChromeRemote(chrome_options=self._chrome_options,
+                              response_patterns=self._response_patterns)
+        remote._chrome_browser = self._chrome_browser
+        remote._dev_url = self._dev_url
+        remote._owns_browser = False
+
+        # Connect tab with CDP
+        remote._connect_interface()
+        remote._setup_tab()
+        remote._init_tab_monitor()
+        return remote
+
     def _create_tab(self) -> pychrome.Tab:
         """Create Chrome Tab."""
         resp = requests.put('%s/json/new' % (self._dev_url), json=True)         
@@ -131,7 +178,7 @@ class ChromeRemote:
             # If response is desired, put it in the queue
             for pattern in self._response_patterns:
                 if re.match(pattern, response['url']):
-                    self._response_queues[pattern].put(response)
+                    self._put_response(pattern, response)
 
         def loadingFailed(**kwargs) -> None:
             error_text = kwargs.get('errorText')
@@ -149,6 +196,7 @@ class ChromeRemote:
             response = {
                 'status': -1,
                 'statusText': status_text,
+                'meta': kwargs,
             }
 
             # Add response
@@ -164,7 +212,7 @@ class ChromeRemote:
                 # If response is desired, put it in the queue
                 for pattern in self._response_patterns:
                     if re.match(pattern, request_url):
-                        self._response_queues[pattern].put(response)
+                        self._put_response(pattern, response)
 
         def requestWillBeSent(**kwargs) -> None:
             request = kwargs.pop('request')
@@ -217,12 +265,23 @@ class ChromeRemote:
 
         def get_send_with_reraise() -> Callable[..., Any]:
             """Re-raise "Tab has been stopped" instead of `UserAbortException` in
-            case of tab detach detected."""
+            case of tab detach detected.
+
+            Message ids are allocated under the lock: pychrome doesn't lock them,
+            but the tab is used by several threads (e.g. response bodies get
+            fetched while links are being clicked), so concurrent calls could
+            get the same id and one of the replies would be lost."""
             original_send = self._chrome_tab._send
+            message_id_lock = threading.Lock()
+
+            def wrapped_send(message: dict[str, Any], *args, **kwargs) -> Any:
+                if 'id' not in message:
+                    with message_id_lock:
+                        self._chrome_tab._cur_id += 1
+                        message['id'] = self._chrome_tab._cur_id
 
-            def wrapped_send(*args, **kwargs) -> Any:
                 try:
-                    return original_send(*args, **kwargs)
+                    return original_send(message, *args, **kwargs)
                 except pychrome.UserAbortException:
                     if tab_detached:
                         raise pychrome.RuntimeException('Tab has been stopped')
@@ -247,6 +306,71 @@ class ChromeRemote:
         if error_message:
             raise ChromeException(error_message)
 
+    def navigate_spa(self, url: str) -> bool:
+        """Navigate to URL within currently loaded single page application:
+        push new history entry and let the app's router handle it
+        with `popstate` event, no full page reload happens.
+
+        Args:
+            url: URL to navigate.
+
+        Returns:
+            `True` on success, `False` if no page loaded yet
+            or URL belongs to another origin.
+        """
+        return bool(self.execute_script('''
+            (function(url) {
+                var target = new URL(url, window.location.href);
+                if (!/^https?:$/.test(window.location.protocol) || target.origin != window.location.origin) {
+                    return false;
+                }
+                window.history.pushState(window.history.state, '', target.href);
+                window.dispatchEvent(new PopStateEvent('popstate', { state: window.history.state }));
+                return true;
+            })(%s)
+        ''' % json.dumps(url)))
+
+    def _put_response(self, pattern: str, response: Response) -> None:
+        """Put captured response into the queue of its pattern and update statistics."""
+        response_queue = self._response_queues[pattern]
+        response_queue.put(response)
+
+        try:
+            latency = response['meta']['timestamp'] - response['request']['meta']['timestamp']
+        except (KeyError, TypeError):
+            latency = 0
+
+        with self._requests_lock:
+            stats = self._response_stats[pattern]
+            stats.received += 1
+            stats.max_depth = max(stats.max_depth, response_queue.qsize())
+            stats.latency_total += latency
+            stats.latency_max = max(stats.latency_max, latency)
+
+    def discard_response(self, response_pattern: str) -> None:
+        """Count taken response as stale or duplicate one.
+
+        Args:
+            response_pattern: Response URL pattern.
+        """
+        with self._requests_lock:
+            self._response_stats[response_pattern].discarded += 1
+
+    def response_stats(self, response_pattern: str) -> ResponseStats:
+        """Get statistics of captured responses.
+
+        Args:
+            response_pattern: Response URL pattern.
+
+        Returns:
+            Statistics snapshot, `max_depth` includes responses currently queued.
+        """
+        with self._requests_lock:
+            stats = self._response_stats[response_pattern].copy()
+
+        stats.max_depth = max(stats.max_depth, self._response_queues[response_pattern].qsize())
+        return stats
+
     @wait_until_finished(timeout=30, throw_exception=False)
     def wait_response(self, response_pattern: str) -> Response | None:
         """Wait for specified response with pre-defined pattern.
@@ -260,7 +384,10 @@ class ChromeRemote:
         try:
             if self._chrome_tab._stopped.is_set():
                 raise pychrome.RuntimeException('Tab has been stopped')
-            return self._response_queues[response_pattern].get(block=False)
+            response = self._response_queues[response_pattern].get(block=False)
+            with self._requests_lock:
+                self._response_stats[response_pattern].taken += 1
+            return response
         except queue.Empty:
             return None
 
@@ -375,7 +502,7 @@ class ChromeRemote:
             except (pychrome.RuntimeException, RequestException):
                 pass
 
-        if self._chrome_browser:
+        if self._chrome_browser and self._owns_browser:
             self._chrome_browser.close()
 
         self.clear_requests()
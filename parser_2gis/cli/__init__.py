@@ -1,5 +1,9 @@
 from .app import cli_app
+from .export import export_app
+from .generate import generate_app
 
 __all__ = [
     'cli_app',
+    'export_app',
+    'generate_app',
 ]
@@ -9,7 +9,7 @@ if TYPE_CHECKING:
     from ..config import Configuration
 
 
-def cli_app(urls: list[str], output_path: str, format: str, config: Configuration) -> None:
+def cli_app(urls: list[str], output_path: str | list[str], format: str | list[str], config: Configuration) -> None:
     setup_cli_logger(config.log)
 
     runner = CLIRunner(urls, output_path, format, config)
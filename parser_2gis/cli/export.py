@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import functools
+import multiprocessing
+import os
+import sys
+from typing import TYPE_CHECKING
+
+from ..exceptions import WriterFormatUnavailable
+from ..logger import logger, setup_cli_logger
+from ..writer import get_writer, read_archive, read_archive_chunk, read_archive_index
+
+if TYPE_CHECKING:
+    import argparse
+
+    from ..config import Configuration
+
+
+def export_app(args: argparse.Namespace, config: Configuration) -> None:
+    """Render raw archive of catalog documents into any output format, no browser needed.
+
+    Archive chunks are decoded by a pool of processes, documents get
+    written down in order of the archive.
+
+    Args:
+        args: Command line arguments of `export` command.
+        config: Configuration.
+    """
+    setup_cli_logger(config.log)
+
+    if not os.path.isfile(args.archive_path):
+        logger.error('Архив %s не найден.', args.archive_path)
+        sys.exit(1)
+
+    # Don't archive the archive
+    config.writer.archive_path = None
+
+    try:
+        chunks = read_archive_index(args.archive_path)
+    except FileNotFoundError:
+        chunks = None
+        logger.warning('Индекс архива не найден, архив будет прочитан последовательно.')
+
+    try:
+        output_writer = get_writer(args.output_path, args.format, config.writer)
+    except WriterFormatUnavailable as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    logger.info('Экспорт архива %s запущен.', args.archive_path)
+    with output_writer as writer:
+        if chunks is None or args.processes == 1:
+            for catalog_doc in read_archive(args.archive_path):
+                writer.write(catalog_doc)
+        else:
+            read_chunk = functools.partial(read_archive_chunk, args.archive_path)
+            with multiprocessing.Pool(args.processes) as pool:
+                for catalog_docs in pool.imap(read_chunk, chunks):
+                    for catalog_doc in catalog_docs:
+                        writer.write(catalog_doc)
+
+    logger.info('Экспорт завершён.')
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+from ..parser import generate_urls, select_cities, write_job_file
+
+if TYPE_CHECKING:
+    import argparse
+
+
+def generate_app(args: argparse.Namespace) -> None:
+    """Generate search URLs out of cities and rubrics selection
+    and write them into job file (or `stdout`), one URL per line.
+
+    URLs are ordered by their estimated cost, the most expensive go first.
+
+    Args:
+        args: Command line arguments of `generate` command.
+    """
+    cities = select_cities(args.cities, args.countries)
+    if not cities:
+        print('Не найдено ни одного города.', file=sys.stderr)
+        sys.exit(1)
+
+    urls = generate_urls(cities, query=args.query, rubric_codes=args.rubrics,
+                         expand_rubrics=args.leaf_rubrics, sort_by_name=args.sort_by_name)
+    ordered_urls = [url for url, _ in sorted(urls, key=lambda x: x[1], reverse=True)]
+
+    if args.output_path in (None, '-'):
+        count = write_job_file(sys.stdout, ordered_urls)
+    else:
+        with open(args.output_path, 'w', encoding='utf-8') as f:
+            count = write_job_file(f, ordered_urls)
+
+    print(f'Сгенерировано ссылок: {count}', file=sys.stderr)
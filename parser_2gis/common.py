@@ -3,6 +3,7 @@ from __future__ import annotations
 import functools
 import sys
 import time
+import urllib.parse
 import warnings
 from typing import Any, Callable
 
@@ -165,3 +166,27 @@ def unwrap_dot_dict(d: dict) -> dict:
 def floor_to_hundreds(arg: int | float) -> int:
     """Round number down to the nearest hundred."""
     return int(arg // 100 * 100)
+
+
+def url_query_encode(url: str) -> str:
+    """URL encode for query, nonascii
+    regular russian characters allowed (plus space).
+
+    Args:
+        url: URL to be encoded.
+
+    Returns:
+        Encoded URL.
+    """
+    encoded_characters = []
+    for char in url:
+        char_ord = ord(char.lower())
+
+        # Do not escape [а-яё ]
+        if 1072 <= char_ord <= 1103 \
+           or char_ord in (1105, 32):
+            encoded_characters.append(char)
+        else:
+            encoded_characters.append(urllib.parse.quote(char, safe=''))
+
+    return ''.join(encoded_characters)
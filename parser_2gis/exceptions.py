@@ -2,7 +2,7 @@ from .chrome.exceptions import (ChromeException, ChromePathNotFound,
                                 ChromeRuntimeException,
                                 ChromeUserAbortException)
 from .parser.exceptions import ParserException
-from .writer.exceptions import WriterUnknownFileFormat
+from .writer.exceptions import WriterFormatUnavailable, WriterUnknownFileFormat
 
 __all__ = [
     'ChromeException',
@@ -11,4 +11,5 @@ __all__ = [
     'ChromeUserAbortException',
     'ParserException',
     'WriterUnknownFileFormat',
+    'WriterFormatUnavailable',
 ]
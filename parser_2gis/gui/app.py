@@ -32,7 +32,7 @@ def gui_app(urls: list[str], output_path: str, format: str, config: Configuratio
     Args:
         url: 2GIS URLs with results to be collected.
         output_path: Path to the result file.
-        format: `csv`, `xlsx` or `json` format.
+        format: `csv`, `xlsx`, `json`, `jsonl`, `parquet` or `sqlite` format.
         config: User configuration.
     """
     # App color theme
@@ -48,7 +48,10 @@ def gui_app(urls: list[str], output_path: str, format: str, config: Configuratio
     default_result_format = format if format else 'csv'
     result_filetype = {'csv': [('CSV Table', '*.csv')],
                        'xlsx': [('Microsoft Excel Spreadsheet', '*.xlsx')],
-                       'json': [('JSON', '*.json')]}
+                       'json': [('JSON', '*.json')],
+                       'jsonl': [('JSON Lines', '*.jsonl')],
+                       'parquet': [('Apache Parquet', '*.parquet')],
+                       'sqlite': [('SQLite Database', '*.sqlite')]}
 
     # If urls wasn't passed then let it be an empty list
     if urls is None:
@@ -69,7 +72,8 @@ def gui_app(urls: list[str], output_path: str, format: str, config: Configuratio
                         [
                             sg.Text('Тип'),
                             sg.Combo(key='-FILE_FORMAT-', default_value=default_result_format,
-                                     values=['csv', 'xlsx', 'json'], readonly=True, enable_events=True),
+                                     values=['csv', 'xlsx', 'json', 'jsonl', 'parquet', 'sqlite'],
+                                     readonly=True, enable_events=True),
                             sg.Text('Путь'),
                             sg.Input(key='-OUTPUT_PATH-', expand_x=True,
                                      default_text='' if output_path is None else output_path),
@@ -257,8 +261,8 @@ def gui_app(urls: list[str], output_path: str, format: str, config: Configuratio
                 continue
 
             # Check result format
-            if values['-FILE_FORMAT-'] not in ('csv', 'xlsx', 'json'):
-                gui_error_popup('Формат результирующего файла должен быть csv, xlsx или json!')
+            if values['-FILE_FORMAT-'] not in ('csv', 'xlsx', 'json', 'jsonl', 'parquet', 'sqlite'):
+                gui_error_popup('Формат результирующего файла должен быть csv, xlsx, json, jsonl, parquet или sqlite!')
                 continue
 
             # Check if result format match output file extension
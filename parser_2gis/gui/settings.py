@@ -142,7 +142,7 @@ def gui_settings(config: Configuration) -> None:
                 ],
                 [
                     sg.Checkbox('Удалить дубликаты', pad=((0, 10), (0, 0)), key='-WRITER.CSV.REMOVE_DUPLICATES-',
-                                tooltip='Удалить повторяющиеся записи по завершению работы парсера',
+                                tooltip='Пропускать повторяющиеся организации (для всех форматов)',
                                 default=config.writer.csv.remove_duplicates,
                                 checkbox_color=sg.theme_input_background_color(), enable_events=True),
                 ],
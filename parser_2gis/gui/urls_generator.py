@@ -3,10 +3,11 @@ from __future__ import annotations
 import json
 
 from ..common import GUI_ENABLED, running_linux
+from ..parser.generator import search_url
 from ..paths import data_path
 from .error_popup import gui_error_popup
 from .rubric_selector import gui_rubric_selector
-from .utils import ensure_gui_enabled, setup_text_widget, url_query_encode
+from .utils import ensure_gui_enabled, setup_text_widget
 
 if GUI_ENABLED:
     import PySimpleGUI as sg
@@ -176,16 +177,7 @@ def gui_urls_generator() -> list[str]:
         urls = []
         rubric = window['-IN_RUBRIC-'].metadata  # noqa: F821
         for checkbox in get_checkboxes(state=True):
-            metadata = checkbox.metadata
-            base_url = f'https://2gis.{metadata["domain"]}/{metadata["code"]}'
-            rest_url = f'/search/{url_query_encode(query)}'
-            if rubric:
-                rest_url += f'/rubricId/{rubric["code"]}'
-
-            rest_url += '/filters/sort=name'
-
-            url = base_url + rest_url
-            urls.append(url)
+            urls.append(search_url(checkbox.metadata, query, rubric))
 
         return urls
 
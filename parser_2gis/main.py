@@ -1,17 +1,25 @@
 from __future__ import annotations
 
 import argparse
+import os
+import sys
 from typing import Any
 
 import pydantic
 
 from .common import GUI_ENABLED, report_from_validation_error, unwrap_dot_dict
 from .config import Configuration
+from .parser import read_job_file
 from .version import version
-from .cli import cli_app
+from .writer import STDOUT_PATH
+from .writer.compression import split_compression_ext
+from .cli import cli_app, export_app, generate_app
 from .gui import gui_app
 
 
+_OUTPUT_FORMATS = ['csv', 'xlsx', 'json', 'jsonl', 'parquet', 'sqlite']
+
+
 class ArgumentHelpFormatter(argparse.HelpFormatter):
     """Help message formatter which adds default values to argument help."""
     def __init__(self, *args, **kwargs) -> None:
@@ -78,6 +86,78 @@ def patch_argparse_translations() -> None:
     argparse.ArgumentError.__str__ = argument_error__str__  # type: ignore
 
 
+def _add_writer_arguments(arg_parser: argparse.ArgumentParser) -> None:
+    """Add arguments of output formats to `arg_parser`."""
+    csv_parser = arg_parser.add_argument_group('Аргументы CSV/XLSX')
+    csv_parser.add_argument('--writer.csv.add-rubrics', metavar='{yes,no}', help='Добавить колонку "Рубрики"')
+    csv_parser.add_argument('--writer.csv.add-comments', metavar='{yes,no}', help='Добавлять комментарии к ячейкам Телефон, E-Mail, и т.д.')
+    csv_parser.add_argument('--writer.csv.columns-per-entity', metavar='{1,2,3,...}', help='Количество колонок для результата с несколькими возможными значениями: Телефон_1, Телефон_2, и т.д.')
+    csv_parser.add_argument('--writer.csv.remove-empty-columns', metavar='{yes,no}', help='Удалить пустые колонки по завершению работы парсера')
+    csv_parser.add_argument('--writer.csv.remove-duplicates', metavar='{yes,no}', help='Пропускать повторяющиеся организации (для всех форматов)')
+    csv_parser.add_argument('--writer.csv.join_char', metavar='{; ,% ,...}', help='Разделитель для комплексных значений ячеек Рубрики, Часы работы')
+
+    jsonl_parser = arg_parser.add_argument_group('Аргументы JSONL')
+    jsonl_parser.add_argument('--writer.jsonl.flush-every', metavar='{1,100,...}', help='Сбрасывать записи на диск каждые N записей')
+    jsonl_parser.add_argument('--writer.jsonl.fsync', metavar='{yes,no}', help='Синхронизировать файл с диском при каждом сбросе')
+    jsonl_parser.add_argument('--writer.jsonl.append', metavar='{yes,no}', help='Дописывать записи в существующий файл')
+
+    parquet_parser = arg_parser.add_argument_group('Аргументы Parquet')
+    parquet_parser.add_argument('--writer.parquet.row-group-size', metavar='{1000,10000,...}', help='Количество записей в группе строк')
+    parquet_parser.add_argument('--writer.parquet.compression', metavar='{snappy,gzip,brotli,zstd,lz4,none}', help='Алгоритм сжатия')
+
+    sqlite_parser = arg_parser.add_argument_group('Аргументы SQLite')
+    sqlite_parser.add_argument('--writer.sqlite.batch-size', metavar='{100,500,...}', help='Количество записей, добавляемых в базу данных одной транзакцией')
+
+
+def _pair_output_targets(arg_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Pair output paths with output formats.
+
+    Single path with several formats gets its extension replaced
+    by every format: `-o result.csv -f csv json` writes `result.csv` and `result.json`.
+    Single output is kept as plain strings, several outputs become lists.
+    """
+    output_paths, formats = args.output_path, args.format
+    if output_paths is None or formats is None:
+        return  # Incomplete arguments, GUI is to be run
+
+    if STDOUT_PATH in output_paths and len(formats) > 1:
+        arg_parser.error('в stdout (-o %s) записывается только один формат' % STDOUT_PATH)
+
+    if len(output_paths) == 1 and len(formats) > 1:
+        file_path, compression_ext = split_compression_ext(output_paths[0])
+        root = os.path.splitext(file_path)[0]
+        output_paths = [f'{root}.{x}' + (compression_ext if x in ('csv', 'json', 'jsonl') else '')
+                        for x in formats]
+    elif len(output_paths) != len(formats):
+        arg_parser.error('количество путей -o/--output-path не совпадает с количеством форматов -f/--format')
+
+    if len(set(map(os.path.abspath, output_paths))) != len(output_paths):
+        arg_parser.error('пути результирующих файлов совпадают: %s' % ' '.join(output_paths))
+
+    if len(output_paths) == 1:
+        args.output_path, args.format = output_paths[0], formats[0]
+    else:
+        args.output_path, args.format = output_paths, formats
+
+
+def _config_from_arguments(arg_parser: argparse.ArgumentParser, args: argparse.Namespace) -> Configuration:
+    """Initialize Configuration with command line arguments, report invalid ones with `arg_parser`."""
+    config_args = unwrap_dot_dict(vars(args))
+
+    try:
+        # Initialize config with command line arguments
+        return Configuration(**config_args)
+    except pydantic.ValidationError as e:
+        errors = []
+        errors_report = report_from_validation_error(e, config_args)
+        for path, description in errors_report.items():
+            arg = description['invalid_value']
+            error_msg = description['error_message']
+            errors.append(f'aргумент --{path} {arg} ({error_msg})')
+
+        arg_parser.error(', '.join(errors))
+
+
 def parse_arguments() -> tuple[argparse.Namespace, Configuration]:
     """Parse arguments depending on whether we got GUI support or not.
 
@@ -96,9 +176,11 @@ def parse_arguments() -> tuple[argparse.Namespace, Configuration]:
         main_parser_required = True
 
     main_parser = arg_parser.add_argument_group(main_parser_name)
-    main_parser.add_argument('-i', '--url', nargs='+', default=None, required=main_parser_required, help='URL с выдачей')
-    main_parser.add_argument('-o', '--output-path', metavar='PATH', default=None, required=main_parser_required, help='Путь до результирующего файла')
-    main_parser.add_argument('-f', '--format', metavar='{csv,xlsx,json}', choices=['csv', 'xlsx', 'json'], default=None, required=main_parser_required, help='Формат результирующего файла')
+    urls_parser = main_parser.add_mutually_exclusive_group(required=main_parser_required)
+    urls_parser.add_argument('-i', '--url', nargs='+', default=None, help='URL с выдачей')
+    urls_parser.add_argument('--url-file', metavar='PATH', default=None, help='Файл со списком URL, по одному в строке (см. команду generate)')
+    main_parser.add_argument('-o', '--output-path', nargs='+', metavar='PATH', default=None, required=main_parser_required, help='Путь до результирующего файла, расширение .gz или .zst включает сжатие (CSV, JSON), - выводит записи в stdout (CSV, JSON). Несколько путей - несколько файлов за один проход парсера')
+    main_parser.add_argument('-f', '--format', nargs='+', metavar='{%s}' % ','.join(_OUTPUT_FORMATS), choices=_OUTPUT_FORMATS, default=None, required=main_parser_required, help='Формат результирующего файла. Несколько форматов - несколько файлов за один проход парсера')
 
     browser_parser = arg_parser.add_argument_group('Аргументы браузера')
     browser_parser.add_argument('--chrome.binary_path', metavar='PATH', help='Путь до исполняемого файла браузера. Если не указан, то определяется автоматически')
@@ -108,13 +190,7 @@ def parse_arguments() -> tuple[argparse.Namespace, Configuration]:
     browser_parser.add_argument('--chrome.start-maximized', metavar='{yes,no}', help='Запустить окно браузера развёрнутым')
     browser_parser.add_argument('--chrome.memory-limit', metavar='{4096,5120,...}', help='Лимит оперативной памяти браузера (мегабайт)')
 
-    csv_parser = arg_parser.add_argument_group('Аргументы CSV/XLSX')
-    csv_parser.add_argument('--writer.csv.add-rubrics', metavar='{yes,no}', help='Добавить колонку "Рубрики"')
-    csv_parser.add_argument('--writer.csv.add-comments', metavar='{yes,no}', help='Добавлять комментарии к ячейкам Телефон, E-Mail, и т.д.')
-    csv_parser.add_argument('--writer.csv.columns-per-entity', metavar='{1,2,3,...}', help='Количество колонок для результата с несколькими возможными значениями: Телефон_1, Телефон_2, и т.д.')
-    csv_parser.add_argument('--writer.csv.remove-empty-columns', metavar='{yes,no}', help='Удалить пустые колонки по завершению работы парсера')
-    csv_parser.add_argument('--writer.csv.remove-duplicates', metavar='{yes,no}', help='Удалить повторяющиеся записи по завершению работы парсера')
-    csv_parser.add_argument('--writer.csv.join_char', metavar='{; ,% ,...}', help='Разделитель для комплексных значений ячеек Рубрики, Часы работы')
+    _add_writer_arguments(arg_parser)
 
     p_parser = arg_parser.add_argument_group('Аргументы парсера')
     p_parser.add_argument('--parser.use-gc', metavar='{yes,no}', help='Включить сборщик мусора - сдерживает быстрое заполнение RAM, уменьшает скорость парсинга')
@@ -122,39 +198,148 @@ def parse_arguments() -> tuple[argparse.Namespace, Configuration]:
     p_parser.add_argument('--parser.max-records', metavar='{1000,2000,...}', help='Максимальное количество спарсенных записей с одного URL')
     p_parser.add_argument('--parser.skip-404-response', metavar='{yes,no}', help='Пропускать ссылки вернувшие сообщение "Точных совпадений нет / Не найдено"')
     p_parser.add_argument('--parser.delay_between_clicks', metavar='{0,100,...}', help='Задержка между кликами по записям (миллисекунд)')
+    p_parser.add_argument('--parser.max-pending-clicks', metavar='{1,2,...}', help='Максимальное количество записей, ожидающих ответа сервера после клика')
+    p_parser.add_argument('--parser.spa-navigation', metavar='{yes,no}', help='Не перезапускать браузер между ссылками, переходить по ним без перезагрузки страницы')
+    p_parser.add_argument('--parser.prefetch-urls', metavar='{yes,no}', help='Загружать следующую ссылку в соседней вкладке во время парсинга текущей')
+    p_parser.add_argument('--parser.workers', metavar='{1,2,...}', help='Количество браузеров, параллельно обрабатывающих ссылки')
+    p_parser.add_argument('--parser.probe-urls', metavar='{yes,no}', help='Предварительно узнавать количество результатов ссылок поиска: пропускать пустые, начинать с самых больших')
+    p_parser.add_argument('--parser.split-by-tiles', metavar='{yes,no}', help='Разбивать ссылки поиска с большим количеством результатов на участки карты')
+    p_parser.add_argument('--parser.tiles-results-cap', metavar='{300,500,...}', help='Максимальное количество результатов участка карты, участки с большим количеством разбиваются')
+    p_parser.add_argument('--parser.tiles-max-zoom', metavar='{16,18,...}', help='Максимальный масштаб участка карты')
+    p_parser.add_argument('--parser.tiles-max-count', metavar='{1000,...}', help='Максимальное количество участков карты, получаемых разбиением всех ссылок')
+    p_parser.add_argument('--parser.split-by-rubrics', metavar='{yes,no}', help='Разбивать ссылки поиска с родительской рубрикой на ссылки её конечных рубрик')
+    p_parser.add_argument('--parser.split-by-cities', metavar='{yes,no}', help='Размножать ссылки поиска на все города страны')
 
     other_parser = arg_parser.add_argument_group('Прочие аргументы')
     other_parser.add_argument('--writer.verbose', metavar='{yes,no}', help='Отображать наименования позиций во время парсинга')
     other_parser.add_argument('--writer.encoding', metavar='{utf8,1251,...}', help='Кодировка результирующего файла')
+    other_parser.add_argument('--writer.compression-level', metavar='{1,2,...}', help='Уровень сжатия результирующего файла с расширением .gz или .zst (gzip: 1-9, zstd: 1-22)')
+    other_parser.add_argument('--writer.shard-records', metavar='{10000,100000,...}', help='Разбивать результат на пронумерованные файлы по N записей')
+    other_parser.add_argument('--writer.shard-bytes', metavar='{100000000,...}', help='Разбивать результат на пронумерованные файлы размером около M байт')
+    other_parser.add_argument('--writer.partition-by', metavar='{rubric,url}', help='Записывать результат в папку -o с разделами <город>/<рубрика или хеш ссылки>.<формат>')
+    other_parser.add_argument('--writer.partition-open-files', metavar='{16,64,...}', help='Максимальное количество одновременно открытых файлов разделов')
+    other_parser.add_argument('--writer.diff-index', metavar='PATH', help='Индекс предыдущего запуска: записывать только добавленные, изменённые и удалённые записи с колонкой "Изменение", индекс обновляется по завершению')
+    other_parser.add_argument('--writer.diff-base', metavar='PATH', help='Архив или результат JSONL предыдущего запуска для построения индекса изменений')
+    other_parser.add_argument('--writer.async-write', metavar='{yes,no}', help='Записывать результаты в отдельном потоке, не задерживая парсер')
+    other_parser.add_argument('--writer.queue-size', metavar='{100,1000,...}', help='Максимальное количество записей в очереди на запись')
+    other_parser.add_argument('--writer.archive-path', metavar='PATH', help='Дописывать исходные ответы сервера в архив для последующего экспорта (см. команду export)')
+    other_parser.add_argument('--writer.archive-chunk-size', metavar='{100,1000,...}', help='Количество записей в одном блоке архива')
 
     rest_parser = arg_parser.add_argument_group('Служебные аргументы')
     rest_parser.add_argument('-v', '--version', action='version', version=f'%(prog)s {version}', help='Показать версию программы и выйти')
     rest_parser.add_argument('-h', '--help', action='help', help='Показать эту справку и выйти')
 
     args = arg_parser.parse_args()
-    config_args = unwrap_dot_dict(vars(args))
+    _pair_output_targets(arg_parser, args)
+    config = _config_from_arguments(arg_parser, args)
 
-    try:
-        # Initialize config with command line arguments
-        config = Configuration(**config_args)
-    except pydantic.ValidationError as e:
-        errors = []
-        errors_report = report_from_validation_error(e, config_args)
-        for path, description in errors_report.items():
-            arg = description['invalid_value']
-            error_msg = description['error_message']
-            errors.append(f'aргумент --{path} {arg} ({error_msg})')
+    # Browser output must not get mixed with results streamed to stdout
+    if getattr(args, 'output_path', None) == STDOUT_PATH:
+        config.chrome.silent_browser = True
 
-        arg_parser.error(', '.join(errors))
+    return args, config
+
+
+def parse_generate_arguments(argv: list[str]) -> argparse.Namespace:
+    """Parse arguments of `generate` command.
+
+    Args:
+        argv: Command line arguments following the command name.
+
+    Returns:
+        Command line arguments.
+    """
+    patch_argparse_translations()  # Patch Russian translations
+    arg_parser = argparse.ArgumentParser('Parser2GIS generate', description='Генератор ссылок по городам и рубрикам',
+                                         add_help=False, formatter_class=argparse.HelpFormatter)
+
+    query_parser = arg_parser.add_argument_group('Запрос')
+    query_parser.add_argument('-q', '--query', default=None, help='Поисковый запрос. Если не указан, используется название рубрики')
+    query_parser.add_argument('-r', '--rubrics', nargs='+', metavar='CODE', default=[], help='Коды рубрик')
+    query_parser.add_argument('--leaf-rubrics', action='store_true', help='Заменить родительские рубрики их конечными рубриками')
+    query_parser.add_argument('--no-sort-by-name', dest='sort_by_name', action='store_false', help='Не добавлять в ссылки сортировку по алфавиту')
+
+    cities_parser = arg_parser.add_argument_group('Города')
+    cities_parser.add_argument('-c', '--cities', nargs='+', metavar='CODE', default=[], help='Коды городов (moscow, spb, ...)')
+    cities_parser.add_argument('--countries', nargs='+', metavar='CODE', default=[], help='Коды стран, выбираются все их города (ru, kz, ...)')
+
+    rest_parser = arg_parser.add_argument_group('Служебные аргументы')
+    rest_parser.add_argument('-o', '--output-path', metavar='PATH', default=None, help='Путь до файла со ссылками (по умолчанию: stdout)')
+    rest_parser.add_argument('-h', '--help', action='help', help='Показать эту справку и выйти')
+
+    args = arg_parser.parse_args(argv)
+    if not args.query and not args.rubrics:
+        arg_parser.error('один из аргументов -q/--query -r/--rubrics обязателен')
+    if not args.cities and not args.countries:
+        arg_parser.error('один из аргументов -c/--cities --countries обязателен')
+
+    return args
 
+
+def parse_export_arguments(argv: list[str]) -> tuple[argparse.Namespace, Configuration]:
+    """Parse arguments of `export` command.
+
+    Args:
+        argv: Command line arguments following the command name.
+
+    Returns:
+        Tuple of Command line arguments and Configuration.
+    """
+    patch_argparse_translations()  # Patch Russian translations
+    arg_parser = argparse.ArgumentParser('Parser2GIS export', description='Экспорт архива исходных ответов сервера в любой формат',
+                                         add_help=False, formatter_class=ArgumentHelpFormatter, argument_default=argparse.SUPPRESS)
+
+    main_parser = arg_parser.add_argument_group('Обязательные аргументы')
+    main_parser.add_argument('archive_path', metavar='ARCHIVE', help='Путь до архива (см. аргумент --writer.archive-path)')
+    main_parser.add_argument('-o', '--output-path', nargs='+', metavar='PATH', required=True, help='Путь до результирующего файла, расширение .gz или .zst включает сжатие (CSV, JSON), - выводит записи в stdout (CSV, JSON)')
+    main_parser.add_argument('-f', '--format', nargs='+', metavar='{%s}' % ','.join(_OUTPUT_FORMATS), choices=_OUTPUT_FORMATS, required=True, help='Формат результирующего файла')
+
+    _add_writer_arguments(arg_parser)
+
+    other_parser = arg_parser.add_argument_group('Прочие аргументы')
+    other_parser.add_argument('--processes', metavar='{1,2,...}', type=int, default=os.cpu_count() or 1, help='Количество процессов, распаковывающих архив')
+    other_parser.add_argument('--writer.verbose', metavar='{yes,no}', help='Отображать наименования позиций во время экспорта')
+    other_parser.add_argument('--writer.encoding', metavar='{utf8,1251,...}', help='Кодировка результирующего файла')
+    other_parser.add_argument('--writer.compression-level', metavar='{1,2,...}', help='Уровень сжатия результирующего файла с расширением .gz или .zst (gzip: 1-9, zstd: 1-22)')
+    other_parser.add_argument('--writer.shard-records', metavar='{10000,100000,...}', help='Разбивать результат на пронумерованные файлы по N записей')
+    other_parser.add_argument('--writer.shard-bytes', metavar='{100000000,...}', help='Разбивать результат на пронумерованные файлы размером около M байт')
+    other_parser.add_argument('--writer.partition-by', metavar='{rubric,url}', help='Записывать результат в папку -o с разделами <город>/<рубрика или хеш ссылки>.<формат>')
+    other_parser.add_argument('--writer.partition-open-files', metavar='{16,64,...}', help='Максимальное количество одновременно открытых файлов разделов')
+    other_parser.add_argument('--writer.diff-index', metavar='PATH', help='Индекс предыдущего запуска: записывать только добавленные, изменённые и удалённые записи с колонкой "Изменение", индекс обновляется по завершению')
+    other_parser.add_argument('--writer.diff-base', metavar='PATH', help='Архив или результат JSONL предыдущего запуска для построения индекса изменений')
+
+    rest_parser = arg_parser.add_argument_group('Служебные аргументы')
+    rest_parser.add_argument('-h', '--help', action='help', help='Показать эту справку и выйти')
+
+    args = arg_parser.parse_args(argv)
+    if args.processes < 1:
+        arg_parser.error('аргумент --processes должен быть больше нуля')
+
+    _pair_output_targets(arg_parser, args)
+    config = _config_from_arguments(arg_parser, args)
     return args, config
 
 
 def main() -> None:
     """Entry point."""
+    # Headless URLs generator
+    if sys.argv[1:2] == ['generate']:
+        generate_app(parse_generate_arguments(sys.argv[2:]))
+        return
+
+    # Offline export of raw archive
+    if sys.argv[1:2] == ['export']:
+        export_app(*parse_export_arguments(sys.argv[2:]))
+        return
+
     # Parse command line arguments
     args, command_line_config = parse_arguments()
 
+    # Read URLs from job file
+    if args.url_file is not None:
+        with open(args.url_file, 'r', encoding='utf-8') as f:
+            args.url = list(read_job_file(f))
+
     # Run CLI if we specified all required args, otherwise run GUI.
     if args.url is None or args.output_path is None or args.format is None:
         # Load user config and merge it with one created by command line arguments.
@@ -162,6 +347,12 @@ def main() -> None:
         user_config.merge_with(command_line_config)
         config = user_config
         app = gui_app
+
+        # GUI handles a single output
+        if isinstance(args.output_path, list):
+            args.output_path = args.output_path[0]
+        if isinstance(args.format, list):
+            args.format = args.format[0]
     else:
         config = command_line_config
         app = cli_app
@@ -1,7 +1,30 @@
-from .factory import get_parser
+from .factory import get_parser, get_parser_class
+from .generator import generate_urls, normalize_url, read_job_file, search_url, select_cities, write_job_file
 from .options import ParserOptions
+from .probe import ProbeResult, SearchProbe
+from .rubrics import city_leaf_rubrics, leaf_rubrics, load_cities, load_rubrics, split_city_url, split_rubric_url
+from .tiles import Tile, split_url, tile_url, url_tile
 
 __all__ = [
     'get_parser',
+    'get_parser_class',
+    'generate_urls',
+    'normalize_url',
+    'read_job_file',
+    'search_url',
+    'select_cities',
+    'write_job_file',
     'ParserOptions',
+    'ProbeResult',
+    'SearchProbe',
+    'city_leaf_rubrics',
+    'leaf_rubrics',
+    'load_cities',
+    'load_rubrics',
+    'split_city_url',
+    'split_rubric_url',
+    'Tile',
+    'split_url',
+    'tile_url',
+    'url_tile',
 ]
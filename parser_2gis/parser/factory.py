@@ -3,6 +3,23 @@ import re
 from .parsers import FirmParser, InBuildingParser, MainParser
 
 
+def get_parser_class(url):
+    """Get parser class suitable for URL.
+
+    Args:
+        url: 2GIS URLs with items to be collected.
+
+    Returns:
+        Parser class.
+    """
+    for parser in (FirmParser, InBuildingParser, MainParser):
+        if re.match(parser.url_pattern(), url):
+            return parser
+
+    # Default fallback
+    return MainParser
+
+
 def get_parser(url, chrome_options, parser_options):
     """Parser factory function.
 
@@ -14,9 +31,4 @@ def get_parser(url, chrome_options, parser_options):
     Returns:
         Parser instance.
     """
-    for parser in (FirmParser, InBuildingParser, MainParser):
-        if re.match(parser.url_pattern(), url):
-            return parser(url, chrome_options, parser_options)
-
-    # Default fallback
-    return MainParser(url, chrome_options, parser_options)
+    return get_parser_class(url)(url, chrome_options, parser_options)
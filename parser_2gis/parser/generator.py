@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import re
+import urllib.parse
+from typing import IO, Any, Iterable, Iterator
+
+from ..common import url_query_encode
+from .rubrics import city_leaf_rubrics, load_cities, load_rubrics
+
+
+def search_url(city: dict[str, Any], query: str,
+               rubric: dict[str, Any] | None = None,
+               sort_by_name: bool = True) -> str:
+    """Build 2GIS search URL.
+
+    Args:
+        city: City from `data/cities.json`.
+        query: Search query.
+        rubric: Rubric from `data/rubrics.json`.
+        sort_by_name: Sort results by name, it excludes repetitions
+            of search results during navigation through pages.
+
+    Returns:
+        Search URL.
+    """
+    url = f'https://2gis.{city["domain"]}/{city["code"]}/search/{url_query_encode(query)}'
+    if rubric:
+        url += f'/rubricId/{rubric["code"]}'
+
+    if sort_by_name:
+        url += '/filters/sort=name'
+
+    return url
+
+
+def normalize_url(url: str) -> str:
+    """Normalize 2GIS URL: lower case host, unified query encoding,
+    no page number and no trailing slash.
+
+    Args:
+        url: 2GIS URL.
+
+    Returns:
+        Normalized URL.
+    """
+    split_url = urllib.parse.urlsplit(url.strip())
+    path = re.sub(r'/page/\d+', '', split_url.path).rstrip('/')
+    path = re.sub(r'(?<=/search/)[^/]+', lambda x: url_query_encode(urllib.parse.unquote(x.group(0))), path)
+    return urllib.parse.urlunsplit(split_url._replace(netloc=split_url.netloc.lower(), path=path))
+
+
+def generate_urls(cities: Iterable[dict[str, Any]], query: str | None = None,
+                  rubric_codes: Iterable[str] = (), expand_rubrics: bool = False,
+                  sort_by_name: bool = True) -> Iterator[tuple[str, int]]:
+    """Generate search URLs for every city × rubric combination.
+
+    Note:
+        If `query` is not specified, rubric's name is used as a query.
+        Cost of the URL is estimated as one unit per leaf rubric it covers,
+        URL of a leaf rubric or without rubric filter costs 1.
+        Rubrics with no leaves in the city's rubric tree are skipped.
+
+    Args:
+        cities: Cities from `data/cities.json`.
+        query: Search query.
+        rubric_codes: Rubric codes, no rubric filter if empty.
+        expand_rubrics: Replace parent rubrics with their leaf rubrics.
+        sort_by_name: Sort results by name.
+
+    Returns:
+        Iterator of unique normalized URLs along with their estimated cost.
+    """
+    rubrics = load_rubrics()
+    rubric_codes = list(rubric_codes)
+    seen_urls: set[str] = set()
+
+    for city in cities:
+        if rubric_codes:
+            city_rubrics: list[tuple[dict[str, Any] | None, int]] = []
+            for code in rubric_codes:
+                leaves = city_leaf_rubrics(code, city)
+                if expand_rubrics:
+                    city_rubrics.extend((x, 1) for x in leaves)
+                elif leaves:
+                    city_rubrics.append((rubrics[code], len(leaves)))
+        else:
+            city_rubrics = [(None, 1)]
+
+        for rubric, cost in city_rubrics:
+            rubric_query = query or (rubric['label'] if rubric else '')
+            if not rubric_query:
+                continue
+
+            url = normalize_url(search_url(city, rubric_query, rubric, sort_by_name))
+            if url not in seen_urls:
+                seen_urls.add(url)
+                yield url, cost
+
+
+def select_cities(city_codes: Iterable[str] = (),
+                  country_codes: Iterable[str] = ()) -> list[dict[str, Any]]:
+    """Select cities from `data/cities.json` by their codes or country codes.
+
+    Args:
+        city_codes: City codes (e.g. `moscow`).
+        country_codes: Country codes (e.g. `ru`).
+
+    Returns:
+        List of cities.
+    """
+    city_codes, country_codes = set(city_codes), set(country_codes)
+    return [x for x in load_cities()
+            if x['code'] in city_codes or x['country_code'] in country_codes]
+
+
+def write_job_file(f: IO[str], urls: Iterable[str]) -> int:
+    """Write URLs into job file, one URL per line.
+
+    Args:
+        f: Opened job file.
+        urls: URLs to be written.
+
+    Returns:
+        Number of written URLs.
+    """
+    count = 0
+    for url in urls:
+        f.write(url + '\n')
+        count += 1
+
+    return count
+
+
+def read_job_file(f: IO[str]) -> Iterator[str]:
+    """Read URLs from job file, blank lines and `#` comments are skipped.
+
+    Args:
+        f: Opened job file.
+
+    Returns:
+        Iterator of URLs.
+    """
+    for line in f:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, NonNegativeInt, PositiveInt
+from pydantic import BaseModel, Field, NonNegativeInt, PositiveInt
 
 from ..chrome.options import default_memory_limit
 from ..common import floor_to_hundreds
@@ -18,12 +18,38 @@ class ParserOptions(BaseModel):
     Attrubutes:
         skip_404_response: Whether to skip 404 document response or not.
         delay_between_clicks: Delay between each item's click in milliseconds.
+        max_pending_clicks: Max number of clicked items waiting for their responses.
         max_records: Max number of records to parse from one URL.
         use_gc: Use Garbage Collector.
         gc_pages_interval: Run Garbage Collector every N pages (if `use_gc` enabled).
+        spa_navigation: Keep browser between URLs and move to the next URL with
+            2GIS app's own router instead of a full page load (organization URLs
+            are always loaded fully).
+        prefetch_urls: Load next URL in a standby tab while current one is being parsed.
+        workers: Number of browsers parsing URLs in parallel.
+        probe_urls: Probe search URLs for number of results before parsing,
+            skip empty ones and parse the largest first.
+        split_by_tiles: Split search URLs with too many results into map viewport tiles
+            (search URLs get probed).
+        tiles_results_cap: Max number of search results of a tile, tiles above get split.
+        tiles_max_zoom: Max map zoom of a tile.
+        tiles_max_count: Max number of map tiles produced by splitting of all URLs.
+        split_by_rubrics: Expand search URLs with parent rubric into URLs of its leaf rubrics.
+        split_by_cities: Fan out search URLs to all cities of their country.
     """
     skip_404_response: bool = True
     delay_between_clicks: NonNegativeInt = 0
+    max_pending_clicks: PositiveInt = 1
     max_records: PositiveInt = default_max_records()
     use_gc: bool = False
     gc_pages_interval: PositiveInt = 10
+    spa_navigation: bool = False
+    prefetch_urls: bool = False
+    workers: PositiveInt = 1
+    probe_urls: bool = False
+    split_by_tiles: bool = False
+    tiles_results_cap: PositiveInt = 500
+    tiles_max_zoom: int = Field(18, gt=0, le=20)
+    tiles_max_count: PositiveInt = 1000
+    split_by_rubrics: bool = False
+    split_by_cities: bool = False
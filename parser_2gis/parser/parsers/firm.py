@@ -19,6 +19,15 @@ class FirmParser(MainParser):
         """URL pattern for the parser."""
         return r'https?://2gis\.[^/]+(/[^/]+)?/firm/.*'
 
+    @property
+    def _not_found_message(self) -> str:
+        return 'Сервер вернул сообщение "Организация не найдена".'
+
+    @property
+    def _spa_navigation_supported(self) -> bool:
+        # Data is read from `window.initialState`, the app's router doesn't update it
+        return False
+
     def parse(self, writer: FileWriter) -> None:
         """Parse URL with an organization.
 
@@ -26,22 +35,8 @@ class FirmParser(MainParser):
             writer: Target file writer.
         """
         # Go URL
-        self._chrome_remote.navigate(self._url, referer='https://google.com', timeout=120)
-
-        # Document loaded, get its response
-        responses = self._chrome_remote.get_responses(timeout=5)
-        if not responses:
-            logger.error('Ошибка получения ответа сервера.')
+        if not self._navigate(self._url):
             return
-        document_response = responses[0]
-
-        # Handle 404
-        assert document_response['mimeType'] == 'text/html'
-        if document_response['status'] == 404:
-            logger.warn('Сервер вернул сообщение "Организация не найдена".')
-
-            if self._options.skip_404_response:
-                return
 
         # Wait all 2GIS requests get finished
         self._wait_requests_finished()
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import json
-import re
+import functools
 from typing import TYPE_CHECKING
 
 from ...common import wait_until_finished
@@ -9,7 +8,7 @@ from ...logger import logger
 from .main import MainParser
 
 if TYPE_CHECKING:
-    from ...chrome.dom import DOMNode
+    from ...chrome import ChromeRemote
     from ...writer import FileWriter
 
 
@@ -24,18 +23,101 @@ class InBuildingParser(MainParser):
         """URL pattern for the parser."""
         return r'https?://2gis\.[^/]+/[^/]+/inside/.*'
 
+    def _setup_remote(self, chrome_remote: ChromeRemote) -> None:
+        super()._setup_remote(chrome_remote)
+
+        # Collect lazy loaded links in-page
+        self._add_links_observer(chrome_remote)
+
+    def _add_links_observer(self, chrome_remote: ChromeRemote) -> None:
+        """Inject MutationObserver that puts every newly inserted
+        organization link into in-page queue, so we don't have to
+        download and search through the whole DOM after each list batch."""
+        observer_script = r'''
+            (function() {
+                var linkRegex = /^\/[^\/]+\/firm\/[^\/]+$/;
+                window.__parserResetLinks = function() {
+                    window.__parserSeenLinks = new Set();
+                    window.__parserLinksQueue = [];
+                    window.__parserLinksBatch = [];
+                    window.__parserLinksSwept = false;
+                };
+                window.__parserResetLinks();
+
+                window.__parserEnqueueLinks = function(root) {
+                    var anchors = [];
+                    if (root.matches && root.matches('a[href]')) {
+                        anchors.push(root);
+                    }
+                    if (root.querySelectorAll) {
+                        anchors.push.apply(anchors, root.querySelectorAll('a[href]'));
+                    }
+                    anchors.forEach(function(anchor) {
+                        var href = anchor.getAttribute('href');
+                        if (linkRegex.test(href) && !window.__parserSeenLinks.has(href)) {
+                            window.__parserSeenLinks.add(href);
+                            window.__parserLinksQueue.push({href: href, node: anchor});
+                        }
+                    });
+                };
+
+                new MutationObserver(function(mutations) {
+                    mutations.forEach(function(mutation) {
+                        mutation.addedNodes.forEach(function(node) {
+                            if (node.nodeType == Node.ELEMENT_NODE) {
+                                window.__parserEnqueueLinks(node);
+                            }
+                        });
+                    });
+                }).observe(document, {childList: true, subtree: true});
+            })();
+        '''
+        chrome_remote.add_start_script(observer_script)
+
+    def _navigate(self, url: str) -> bool:
+        # In-page queue outlives SPA navigation, start over
+        self._chrome_remote.execute_script('window.__parserResetLinks && window.__parserResetLinks()')
+        return super()._navigate(url)
+
     @wait_until_finished(timeout=5, throw_exception=False)
-    def _get_links(self) -> list[DOMNode]:
-        """Extracts specific DOM node links from current DOM snapshot."""
-        def valid_link(node: DOMNode) -> bool:
-            if node.local_name == 'a' and 'href' in node.attributes:
-                link_match = re.match(r'/[^/]+/firm/[^/]+$', node.attributes['href'])
-                return bool(link_match)
+    def _get_links(self) -> list[str]:
+        """Move links gathered by observer into current batch.
 
-            return False
+        Returns:
+            Link addresses of the batch.
+        """
+        return self._chrome_remote.execute_script('''
+            (function() {
+                // Catch up with the nodes that could have been inserted before observer
+                if (!window.__parserLinksSwept) {
+                    window.__parserLinksSwept = true;
+                    window.__parserEnqueueLinks(document);
+                }
+                window.__parserLinksBatch = window.__parserLinksQueue.splice(0);
+                return window.__parserLinksBatch.map(function(link) { return link.href; });
+            })()
+        ''') or []
+
+    def _click_link(self, index: int) -> None:
+        """Click link with `index` of the current batch.
+
+        Note:
+            If lazy list has been re-rendered and the node got detached,
+            fresh node with the same address is looked up.
 
-        dom_tree = self._chrome_remote.get_document()
-        return dom_tree.search(valid_link)
+        Args:
+            index: Link index in the current batch.
+        """
+        self._chrome_remote.execute_script('''
+            (function(link) {
+                var node = link.node;
+                if (!node.isConnected) {
+                    node = document.querySelector('a[href="' + link.href + '"]') || node;
+                }
+                node.scrollIntoView({ block: "center",  behavior: "instant" });
+                node.click();
+            })(window.__parserLinksBatch[%d])
+        ''' % index)
 
     def parse(self, writer: FileWriter) -> None:
         """Parse URL with organizations.
@@ -44,86 +126,28 @@ class InBuildingParser(MainParser):
             writer: Target file writer.
         """
         # Go URL
-        self._chrome_remote.navigate(self._url, referer='https://google.com', timeout=120)
-
-        # Document loaded, get its response
-        responses = self._chrome_remote.get_responses(timeout=5)
-        if not responses:
-            logger.error('Ошибка получения ответа сервера.')
+        if not self._navigate(self._url):
             return
-        document_response = responses[0]
-
-        # Handle 404
-        assert document_response['mimeType'] == 'text/html'
-        if document_response['status'] == 404:
-            logger.warn('Сервер вернул сообщение "Точных совпадений нет / Не найдено".')
-
-            if self._options.skip_404_response:
-                return
 
         # Parsed records
         collected_records = 0
 
-        # Already visited links
-        visited_links: set[str] = set()
-
-        # Get new links
-        @wait_until_finished(timeout=5, throw_exception=False)
-        def get_unique_links() -> list[DOMNode]:
-            links = self._get_links()
-            link_addresses = set(x.attributes['href'] for x in links) - visited_links
-            visited_links.update(link_addresses)
-            return [x for x in links if x.attributes['href'] in link_addresses]
-
         # Loop down through lazy load organizations list
         while True:
             # Wait all 2GIS requests get finished
             self._wait_requests_finished()
 
-            # Gather links to be clicked
-            links = get_unique_links()
+            # Gather new links to be clicked
+            links = self._get_links()
             if not links:
                 break
 
             # Iterate through gathered links
-            for link in links:
-                for _ in range(3):  # 3 attempts to get response
-                    # Click the link to provoke request
-                    # with a auth key and secret arguments
-                    self._chrome_remote.perform_click(link)
-
-                    # Delay between clicks, could be usefull if
-                    # 2GIS's anti-bot service become more strict.
-                    if self._options.delay_between_clicks:
-                        self._chrome_remote.wait(self._options.delay_between_clicks / 1000)
-
-                    # Gather response and collect useful payload.
-                    resp = self._chrome_remote.wait_response(self._item_response_pattern)
-
-                    # If request is failed - repeat, otherwise go further.
-                    if resp and resp['status'] >= 0:
-                        break
-
-                # Get response body data
-                if resp and resp['status'] >= 0:
-                    data = self._chrome_remote.get_response_body(resp, timeout=10) if resp else None
-
-                    try:
-                        doc = json.loads(data)
-                    except json.JSONDecodeError:
-                        logger.error('Сервер вернул некорректный JSON документ: "%s", пропуск позиции.', data)
-                        doc = None
-                else:
-                    doc = None
-
-                if doc:
-                    # Write API document into a file
-                    writer.write(doc)
-                    collected_records += 1
-                else:
-                    logger.error('Данные не получены, пропуск позиции.')
-
-                # We've reached our limit, bail
-                if collected_records >= self._options.max_records:
-                    logger.info('Спарсено максимально разрешенное количество записей с данного URL.')
-                    return
+            batch_links = [(address, functools.partial(self._click_link, index))
+                           for index, address in enumerate(links)]
+            collected_records = self._parse_links(batch_links, writer, collected_records)
+
+            # We've reached our limit, bail
+            if collected_records >= self._options.max_records:
+                logger.info('Спарсено максимально разрешенное количество записей с данного URL.')
+                return
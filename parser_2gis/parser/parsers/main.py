@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import base64
+import collections
+import dataclasses
+import functools
 import json
+import queue
 import re
+import threading
+import time
 import urllib.parse
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
 
 from ...chrome import ChromeRemote
 from ...common import wait_until_finished
@@ -14,10 +20,29 @@ from ..utils import blocked_requests
 if TYPE_CHECKING:
     from ...chrome import ChromeOptions
     from ...chrome.dom import DOMNode
+    from ...chrome.remote import Response
     from ...writer import FileWriter
     from ..options import ParserOptions
 
 
+@dataclasses.dataclass
+class PendingClick:
+    """Clicked link waiting for its response.
+
+    Attributes:
+        address: Link address.
+        click: Function that clicks the link.
+        firm_id: Organization id extracted from link address.
+        attempts: Number of clicks made.
+        clicked_at: Time of the last click.
+    """
+    address: str
+    click: Callable[[], None]
+    firm_id: Optional[str] = None
+    attempts: int = 0
+    clicked_at: float = 0
+
+
 class MainParser:
     """Main parser that extracts useful payload
     from search result pages using Chrome browser
@@ -38,23 +63,40 @@ class MainParser:
         self._item_response_pattern = r'https://catalog\.api\.2gis.[^/]+/.*/items/byid'
 
         # Open browser, start remote
-        response_patterns = [self._item_response_pattern]
+        self._chrome_options = chrome_options
+        response_patterns = self._response_patterns()
         self._chrome_remote = ChromeRemote(chrome_options=chrome_options,
                                            response_patterns=response_patterns)
         self._chrome_remote.start()
+        self._setup_remote(self._chrome_remote)
 
-        # Add counter for 2GIS requsts
-        self._add_xhr_counter()
-
-        # Disable specific requests
-        blocked_urls = blocked_requests(extended=chrome_options.disable_images)
-        self._chrome_remote.add_blocked_requests(blocked_urls)
+        # Standby tab, next URL is loaded there while current one is being parsed
+        self._standby_remote: ChromeRemote | None = None
+        self._prefetch_thread: threading.Thread | None = None
+        self._prefetched_url: str | None = None
 
     @staticmethod
     def url_pattern():
         """URL pattern for the parser."""
         return r'https?://2gis\.[^/]+/[^/]+/search/.*'
 
+    def _setup_remote(self, chrome_remote: ChromeRemote) -> None:
+        """Prepare browser tab for parsing.
+
+        Args:
+            chrome_remote: Remote of the tab.
+        """
+        # Add counter for 2GIS requsts
+        self._add_xhr_counter(chrome_remote)
+
+        # Disable specific requests
+        blocked_urls = blocked_requests(extended=self._chrome_options.disable_images)
+        chrome_remote.add_blocked_requests(blocked_urls)
+
+    def _response_patterns(self) -> list[str]:
+        """Response URL patterns to be captured by the browser."""
+        return [self._item_response_pattern]
+
     @wait_until_finished(timeout=5, throw_exception=False)
     def _get_links(self) -> list[DOMNode]:
         """Extracts specific DOM node links from current DOM snapshot."""
@@ -73,7 +115,7 @@ class MainParser:
         dom_tree = self._chrome_remote.get_document()
         return dom_tree.search(valid_link)
 
-    def _add_xhr_counter(self) -> None:
+    def _add_xhr_counter(self, chrome_remote: ChromeRemote) -> None:
         """Inject old-school wrapper around XMLHttpRequest,
         to keep track of all pending requests to 2GIS website."""
         xhr_script = r'''
@@ -96,12 +138,361 @@ class MainParser:
                 }
             })();
         '''
-        self._chrome_remote.add_start_script(xhr_script)
+        chrome_remote.add_start_script(xhr_script)
 
     @wait_until_finished(timeout=120)
-    def _wait_requests_finished(self) -> bool:
+    def _wait_requests_finished(self, chrome_remote: ChromeRemote | None = None) -> bool:
         """Wait for all pending requests."""
-        return self._chrome_remote.execute_script('window.openHTTPs == 0')
+        return (chrome_remote or self._chrome_remote).execute_script('window.openHTTPs == 0')
+
+    @wait_until_finished(timeout=3, throw_exception=False)
+    def _wait_requests_started(self) -> bool:
+        """Wait for the app to start any request to 2GIS website."""
+        return self._chrome_remote.execute_script('window.openHTTPs > 0')
+
+    @property
+    def url(self) -> str:
+        """URL to be parsed."""
+        return self._url
+
+    @url.setter
+    def url(self, url: str) -> None:
+        """Point parser to another URL, browser stays warm."""
+        self._url = url
+        self._chrome_remote.clear_requests()
+
+    def prefetch(self, url: str) -> None:
+        """Start loading `url` in a standby tab while current URL is being parsed.
+        Parser switches to the standby tab once it's pointed to `url`.
+
+        Args:
+            url: Next URL to be parsed.
+        """
+        self._join_prefetch()
+
+        if not self._standby_remote:
+            self._standby_remote = self._chrome_remote.spawn_tab()
+            self._setup_remote(self._standby_remote)
+
+        def load_url(chrome_remote: ChromeRemote) -> None:
+            try:
+                chrome_remote.clear_requests()
+                chrome_remote.navigate(url, referer='https://google.com', timeout=120)
+                self._wait_requests_finished(chrome_remote, throw_exception=False)
+            except Exception:
+                logger.debug('Ошибка предзагрузки ссылки %s.', url, exc_info=True)
+
+        self._prefetched_url = url
+        self._prefetch_thread = threading.Thread(target=load_url, args=(self._standby_remote,), daemon=True)
+        self._prefetch_thread.start()
+
+    def _join_prefetch(self) -> None:
+        """Wait for standby tab to finish loading."""
+        if self._prefetch_thread:
+            self._prefetch_thread.join()
+            self._prefetch_thread = None
+
+    def _swap_to_prefetched(self, url: str) -> bool:
+        """Make standby tab active if it has loaded `url`.
+
+        Args:
+            url: URL to navigate.
+
+        Returns:
+            `True` if tabs have been swapped.
+        """
+        if not self._standby_remote or self._prefetched_url != url:
+            return False
+
+        self._join_prefetch()
+        self._prefetched_url = None
+        self._chrome_remote, self._standby_remote = self._standby_remote, self._chrome_remote
+        return True
+
+    @property
+    def _spa_navigation_supported(self) -> bool:
+        """Whether data of the page comes with captured responses,
+        so the page could be navigated with the app's router."""
+        return True
+
+    def _navigate_spa(self, url: str) -> bool:
+        """Navigate to URL with the app's own router, no full page load happens.
+
+        Args:
+            url: URL to navigate.
+
+        Returns:
+            `True` if the app has started loading data of the new route.
+        """
+        if not self._options.spa_navigation or not self._spa_navigation_supported:
+            return False
+
+        if not self._chrome_remote.navigate_spa(url):
+            return False
+
+        # Router could ignore the new route, the page would stay the same then
+        if not self._wait_requests_started():
+            logger.debug('Переход без перезагрузки страницы не удался, ссылка %s будет загружена.', url)
+            return False
+
+        return True
+
+    def _navigate(self, url: str) -> bool:
+        """Navigate to URL and check document response.
+
+        Note:
+            If SPA navigation is enabled and the browser is already at 2GIS website,
+            the app's own router is used instead of a full page load. Responses
+            to 2GIS API requests of the new route are checked instead of the document one.
+
+        Args:
+            url: URL to navigate.
+
+        Returns:
+            `True` if page is ready to be parsed, `False` otherwise.
+        """
+        if self._swap_to_prefetched(url):
+            logger.debug('Ссылка %s загружена заранее.', url)
+        elif self._navigate_spa(url):
+            return self._check_spa_responses()
+        else:
+            self._chrome_remote.navigate(url, referer='https://google.com', timeout=120)
+
+        # Document loaded, get its response
+        responses = self._chrome_remote.get_responses(timeout=5)
+        if not responses:
+            logger.error('Ошибка получения ответа сервера.')
+            return False
+        document_response = responses[0]
+
+        # Handle 404
+        assert document_response['mimeType'] == 'text/html'
+        if document_response['status'] == 404:
+            logger.warn(self._not_found_message)
+
+            if self._options.skip_404_response:
+                return False
+
+        return True
+
+    def _check_spa_responses(self) -> bool:
+        """Check responses to 2GIS API requests of the route navigated by the app's router.
+
+        Returns:
+            `True` if page is ready to be parsed, `False` otherwise.
+        """
+        self._wait_requests_finished()
+
+        api_responses = [x for x in self._chrome_remote.get_responses(timeout=5)
+                         if re.match(r'https://catalog\.api\.2gis\.[^/]+/',
+                                     x.get('url') or x.get('request', {}).get('url', ''))]
+        if not api_responses:
+            logger.error('Ошибка получения ответа сервера.')
+            return False
+
+        # Handle 404
+        if any(x['status'] == 404 for x in api_responses):
+            logger.warn(self._not_found_message)
+
+            if self._options.skip_404_response:
+                return False
+
+        return True
+
+    @property
+    def _not_found_message(self) -> str:
+        """Warning on 404 document response."""
+        return 'Сервер вернул сообщение "Точных совпадений нет / Не найдено".'
+
+    @staticmethod
+    def _link_firm_id(address: str) -> str | None:
+        """Get organization id out of link address."""
+        link_match = re.search(r'/(?:firm|station)/(?P<id>[^/?]+)', address)
+        return link_match.group('id') if link_match else None
+
+    @staticmethod
+    def _response_firm_id(response: Response) -> str | None:
+        """Get organization id out of "Catalog Item Document" response's request URL."""
+        url = response.get('url') or response.get('request', {}).get('url', '')
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+        for item_id in query.get('id', []):
+            return item_id.split('_')[0]
+
+        return None
+
+    @staticmethod
+    def _response_request_id(response: Response) -> str | None:
+        """Get CDP request id of the response."""
+        return response.get('meta', {}).get('requestId')
+
+    def _discard_stale_responses(self) -> None:
+        """Drop "Catalog Item Document" responses left from previous clicks."""
+        while True:
+            resp = self._chrome_remote.wait_response(self._item_response_pattern, timeout=0)
+            if not resp:
+                break
+
+            self._chrome_remote.discard_response(self._item_response_pattern)
+
+    def _parse_links(self, links: Sequence[tuple[str, Callable[[], None]]],
+                     writer: FileWriter, collected_records: int) -> int:
+        """Click links and write gathered "Catalog Item Documents".
+
+        Item loop is pipelined: up to `ParserOptions.max_pending_clicks` links
+        could be clicked without waiting for their responses, every response
+        is matched with its link by organization id, response bodies get
+        fetched and written by a separate thread.
+
+        Responses matched with no pending click, responses of already handled
+        requests and responses left from previous clicks get discarded.
+        Records limit is checked against written records and the ones being
+        written, so links keep getting clicked if some of the bodies fail.
+        Error of the writer stops parsing and gets raised.
+
+        Args:
+            links: Link addresses along with functions that click them.
+            writer: Target file writer.
+            collected_records: Number of records collected so far.
+
+        Returns:
+            Number of records collected.
+        """
+        max_attempts = 3  # 3 attempts to get response
+        response_timeout = 30
+        records_left = self._options.max_records - collected_records
+
+        # Body stage: get response body data and write API document into a file
+        responses_queue: queue.Queue[Response | None] = queue.Queue(maxsize=self._options.max_pending_clicks * 2)
+        written_records = 0
+        writer_error: Exception | None = None  # Stops parsing like in the parser thread
+
+        def write_documents() -> None:
+            nonlocal written_records, writer_error
+            while True:
+                resp = responses_queue.get()
+                if resp is None:
+                    break
+
+                try:
+                    if writer_error is not None:
+                        continue  # Writing has failed, drain the queue
+
+                    try:
+                        data = self._chrome_remote.get_response_body(resp, timeout=10)
+                    except Exception:
+                        logger.error('Ошибка получения ответа сервера, пропуск позиции.', exc_info=True)
+                        continue
+
+                    try:
+                        doc = json.loads(data)
+                    except json.JSONDecodeError:
+                        logger.error('Сервер вернул некорректный JSON документ: "%s", пропуск позиции.', data)
+                        doc = None
+
+                    if doc:
+                        try:
+                            writer.write(doc)
+                        except Exception as e:
+                            writer_error = e
+                            continue
+                        written_records += 1
+                    else:
+                        logger.error('Данные не получены, пропуск позиции.')
+                finally:
+                    responses_queue.task_done()
+
+        def accepted_records() -> int:
+            """Number of records written or being written."""
+            return written_records + responses_queue.unfinished_tasks
+
+        writer_thread = threading.Thread(target=write_documents, daemon=True)
+        writer_thread.start()
+
+        to_click = collections.deque(PendingClick(address=address, click=click, firm_id=self._link_firm_id(address))
+                                     for address, click in links)
+        pending: list[PendingClick] = []
+        handled_request_ids: set[str] = set()
+
+        # Nothing has been clicked yet, so everything queued is stale
+        self._discard_stale_responses()
+
+        def retry_or_skip(pending_click: PendingClick) -> None:
+            if pending_click.attempts < max_attempts:
+                to_click.appendleft(pending_click)
+            else:
+                logger.error('Данные не получены, пропуск позиции.')
+
+        try:
+            while (to_click or pending) and writer_error is None:
+                if accepted_records() >= records_left:
+                    if not responses_queue.unfinished_tasks:
+                        break  # Limit is reached
+
+                    # Some of the responses being written could fail
+                    self._chrome_remote.wait(0.05)
+                    continue
+
+                # Click stage: click links to provoke requests
+                # with a auth key and secret arguments
+                while (to_click and len(pending) < self._options.max_pending_clicks
+                       and accepted_records() + len(pending) < records_left):
+                    pending_click = to_click.popleft()
+                    pending_click.click()
+                    pending_click.attempts += 1
+                    pending_click.clicked_at = time.time()
+                    pending.append(pending_click)
+
+                    # Delay between clicks, could be usefull if
+                    # 2GIS's anti-bot service become more strict.
+                    if self._options.delay_between_clicks:
+                        self._chrome_remote.wait(self._options.delay_between_clicks / 1000)
+
+                # Response stage: match response with its link
+                resp = self._chrome_remote.wait_response(self._item_response_pattern, timeout=0)
+                if resp:
+                    request_id = self._response_request_id(resp)
+                    resp_firm_id = self._response_firm_id(resp)
+                    matched_click: PendingClick | None = next((x for x in pending if x.firm_id == resp_firm_id), None)
+                    if not matched_click and resp_firm_id is None and pending:
+                        matched_click = pending[0]
+
+                    # Late response of previous click or
+                    # failure reported after the response itself
+                    if not matched_click or (request_id and request_id in handled_request_ids):
+                        logger.debug('Пропуск устаревшего ответа: %s', resp.get('url'))
+                        self._chrome_remote.discard_response(self._item_response_pattern)
+                        continue
+
+                    if request_id:
+                        handled_request_ids.add(request_id)
+
+                    pending.remove(matched_click)
+                    if resp['status'] >= 0:
+                        responses_queue.put(resp)
+                    else:
+                        # If request is failed - repeat, otherwise go further.
+                        retry_or_skip(matched_click)
+                else:
+                    self._chrome_remote.wait(0.05)
+
+                # Response has not come in time
+                for pending_click in [x for x in pending if time.time() - x.clicked_at > response_timeout]:
+                    pending.remove(pending_click)
+                    retry_or_skip(pending_click)
+        finally:
+            responses_queue.put(None)
+            writer_thread.join()
+
+        if writer_error is not None:
+            raise writer_error
+
+        stats = self._chrome_remote.response_stats(self._item_response_pattern)
+        logger.debug('Ответы сервера: получено %d, отброшено %d, макс. очередь %d, '
+                     'средняя задержка %.3f с, макс. задержка %.3f с.',
+                     stats.received, stats.discarded, stats.max_depth,
+                     stats.latency_avg, stats.latency_max)
+
+        return collected_records + written_records
 
     def _get_available_pages(self) -> dict[int, DOMNode]:
         """Get available pages to navigate."""
@@ -156,22 +547,8 @@ class MainParser:
             walk_page_number = None
 
         # Go URL
-        self._chrome_remote.navigate(url, referer='https://google.com', timeout=120)
-
-        # Document loaded, get its response
-        responses = self._chrome_remote.get_responses(timeout=5)
-        if not responses:
-            logger.error('Ошибка получения ответа сервера.')
+        if not self._navigate(url):
             return
-        document_response = responses[0]
-
-        # Handle 404
-        assert document_response['mimeType'] == 'text/html'
-        if document_response['status'] == 404:
-            logger.warn('Сервер вернул сообщение "Точных совпадений нет / Не найдено".')
-
-            if self._options.skip_404_response:
-                return
 
         # Parsed records
         collected_records = 0
@@ -201,47 +578,14 @@ class MainParser:
             # We should parse the page if we are not walking
             if not walk_page_number:
                 # Iterate through gathered links
-                for link in links:
-                    for _ in range(3):  # 3 attempts to get response
-                        # Click the link to provoke request
-                        # with a auth key and secret arguments
-                        self._chrome_remote.perform_click(link)
-
-                        # Delay between clicks, could be usefull if
-                        # 2GIS's anti-bot service become more strict.
-                        if self._options.delay_between_clicks:
-                            self._chrome_remote.wait(self._options.delay_between_clicks / 1000)
-
-                        # Gather response and collect useful payload.
-                        resp = self._chrome_remote.wait_response(self._item_response_pattern)
-
-                        # If request is failed - repeat, otherwise go further.
-                        if resp and resp['status'] >= 0:
-                            break
-
-                    # Get response body data
-                    if resp and resp['status'] >= 0:
-                        data = self._chrome_remote.get_response_body(resp, timeout=10) if resp else None
-
-                        try:
-                            doc = json.loads(data)
-                        except json.JSONDecodeError:
-                            logger.error('Сервер вернул некорректный JSON документ: "%s", пропуск позиции.', data)
-                            doc = None
-                    else:
-                        doc = None
-
-                    if doc:
-                        # Write API document into a file
-                        writer.write(doc)
-                        collected_records += 1
-                    else:
-                        logger.error('Данные не получены, пропуск позиции.')
+                page_links = [(x.attributes['href'], functools.partial(self._chrome_remote.perform_click, x))
+                              for x in links]
+                collected_records = self._parse_links(page_links, writer, collected_records)
 
-                    # We've reached our limit, bail
-                    if collected_records >= self._options.max_records:
-                        logger.info('Спарсено максимально разрешенное количество записей с данного URL.')
-                        return
+                # We've reached our limit, bail
+                if collected_records >= self._options.max_records:
+                    logger.info('Спарсено максимально разрешенное количество записей с данного URL.')
+                    return
 
             # Evaluate Garbage Collection if it's been exposed and enabled
             if self._options.use_gc and current_page_number % self._options.gc_pages_interval == 0:
@@ -270,6 +614,9 @@ class MainParser:
                 walk_page_number = None
 
     def close(self) -> None:
+        if self._standby_remote:
+            self._standby_remote.stop()
+            self._join_prefetch()
         self._chrome_remote.stop()
 
     def __enter__(self) -> MainParser:
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Optional
+
+from pydantic import BaseModel
+
+from ..logger import logger
+from .parsers import MainParser
+
+if TYPE_CHECKING:
+    from ..chrome import ChromeOptions
+    from .options import ParserOptions
+
+
+class ProbeResult(BaseModel):
+    """Result of a search URL probe.
+
+    Attributes:
+        url: Probed URL.
+        location: Browser location after the page got loaded,
+            2GIS puts current map viewport into it.
+        status: Document response status, `-1` if no response received.
+        total: Total number of search results, `None` if unknown.
+        viewport_width: Browser viewport width in pixels.
+        viewport_height: Browser viewport height in pixels.
+    """
+    url: str
+    location: Optional[str] = None
+    status: int = -1
+    total: Optional[int] = None
+    viewport_width: int = 0
+    viewport_height: int = 0
+
+
+class SearchProbe(MainParser):
+    """Cheap loader of search result pages that reads total number
+    of results without clicking any items.
+
+    Browser is kept warm between probes, so one instance
+    could probe any number of URLs.
+
+    Args:
+        chrome_options: Chrome options.
+        parser_options: Parser options.
+    """
+    def __init__(self, chrome_options: ChromeOptions,
+                 parser_options: ParserOptions) -> None:
+        # "Catalog Search Results" response pattern.
+        self._search_response_pattern = r'https://catalog\.api\.2gis.[^/]+/.*/items\?'
+
+        super().__init__('', chrome_options, parser_options)
+
+    def _response_patterns(self) -> list[str]:
+        return [*super()._response_patterns(), self._search_response_pattern]
+
+    def _get_total_from_response(self) -> int | None:
+        """Get total number of results from captured search API response."""
+        resp = self._chrome_remote.wait_response(self._search_response_pattern, timeout=1)
+        if not resp or resp['status'] < 0:
+            return None
+
+        data = self._chrome_remote.get_response_body(resp, timeout=5)
+        try:
+            return int(json.loads(data)['result']['total'])
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    def _get_total_from_state(self) -> int | None:
+        """Get total number of results from server-side rendered initial state."""
+        return self._chrome_remote.execute_script(r'''
+            (function() {
+                function search(obj, depth) {
+                    if (!obj || typeof obj != 'object' || depth > 8) {
+                        return null;
+                    }
+                    if (typeof obj.total == 'number' && Array.isArray(obj.items)) {
+                        return obj.total;
+                    }
+                    for (var key in obj) {
+                        var found = search(obj[key], depth + 1);
+                        if (found !== null) {
+                            return found;
+                        }
+                    }
+                    return null;
+                }
+                return window.initialState ? search(window.initialState.data, 0) : null;
+            })()
+        ''')
+
+    def _get_total_from_pages(self) -> int | None:
+        """Estimate lower bound of results from available pages."""
+        available_pages = self._get_available_pages()
+        if not available_pages:
+            return None
+
+        return max(available_pages) * self._page_size
+
+    @property
+    def _page_size(self) -> int:
+        """Number of items on one search result page."""
+        return 12
+
+    def _drain_search_responses(self) -> None:
+        """Drop search responses left from previous probe."""
+        while self._chrome_remote.wait_response(self._search_response_pattern, timeout=0):
+            pass
+
+    def probe(self, url: str) -> ProbeResult:
+        """Load URL and read total number of search results.
+
+        Args:
+            url: 2GIS search URL.
+
+        Returns:
+            Probe result.
+        """
+        self._url = url
+        self._chrome_remote.clear_requests()
+        self._drain_search_responses()
+
+        # Go URL
+        self._chrome_remote.navigate(url, referer='https://google.com', timeout=120)
+
+        # Document loaded, get its response
+        result = ProbeResult(url=url)
+        responses = self._chrome_remote.get_responses(timeout=5)
+        if not responses:
+            logger.error('Ошибка получения ответа сервера.')
+            return result
+
+        result.status = responses[0]['status']
+        if result.status == 404:
+            result.total = 0
+            return result
+
+        # Wait all 2GIS requests get finished
+        self._wait_requests_finished()
+
+        for get_total in (self._get_total_from_response,
+                          self._get_total_from_state,
+                          self._get_total_from_pages):
+            result.total = get_total()
+            if result.total is not None:
+                break
+
+        result.location = self._chrome_remote.execute_script('window.location.href')
+        result.viewport_width = self._chrome_remote.execute_script('window.innerWidth') or 0
+        result.viewport_height = self._chrome_remote.execute_script('window.innerHeight') or 0
+
+        logger.debug('Количество результатов %s: %s', url, result.total)
+        return result
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import functools
+import json
+import re
+import urllib.parse
+from typing import Any
+
+from ..common import url_query_encode
+from ..paths import data_path
+
+# Search URL with rubric: https://2gis.<domain>/<city>/search/<query>/rubricId/<code><rest>
+_RUBRIC_URL_REGEX = (r'(?P<base>https?://2gis\.(?P<domain>[^/]+)/)(?P<city>[^/]+)'
+                     r'(?P<search>/search/)(?P<query>[^/?]+)/rubricId/(?P<code>\d+)(?P<rest>.*)')
+
+# Search URL: https://2gis.<domain>/<city>/search/<rest>
+_SEARCH_URL_REGEX = r'(?P<base>https?://2gis\.(?P<domain>[^/]+)/)(?P<city>[^/]+)(?P<rest>/search/.*)'
+
+
+@functools.lru_cache()
+def load_rubrics() -> dict[str, Any]:
+    """Load rubric tree `data/rubrics.json`.
+
+    Returns:
+        Rubric dictionary, keys are rubric codes.
+    """
+    rubrics_path = data_path() / 'rubrics.json'
+    if not rubrics_path.is_file():
+        raise FileNotFoundError(f'Файл {rubrics_path} не найден')
+
+    with open(rubrics_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@functools.lru_cache()
+def load_cities() -> list[dict[str, Any]]:
+    """Load cities list `data/cities.json`.
+
+    Returns:
+        List of cities.
+    """
+    cities_path = data_path() / 'cities.json'
+    if not cities_path.is_file():
+        raise FileNotFoundError(f'Файл {cities_path} не найден')
+
+    with open(cities_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def leaf_rubrics(code: str, is_russian: bool = True) -> list[dict[str, Any]]:
+    """Get leaf rubrics of the rubric tree node.
+
+    Args:
+        code: Rubric code.
+        is_russian: Whether to walk Russian or non-Russian rubric tree.
+
+    Returns:
+        List of leaf rubrics, the rubric itself if it's a leaf
+        or empty list if rubric is unknown.
+    """
+    rubrics = load_rubrics()
+    country_flag = 'isRussian' if is_russian else 'isNonRussian'
+
+    def walk(code: str, leaves: list[dict[str, Any]]) -> None:
+        node = rubrics.get(code)
+        if not node or not node.get(country_flag, True):
+            return
+
+        children = [x for x in node['children']
+                    if x in rubrics and rubrics[x].get(country_flag, True)]
+        if not children:
+            leaves.append(node)
+
+        for child_code in children:
+            walk(child_code, leaves)
+
+    leaves: list[dict[str, Any]] = []
+    walk(code, leaves)
+    return leaves
+
+
+def city_leaf_rubrics(code: str, city: dict[str, Any]) -> list[dict[str, Any]]:
+    """Get leaf rubrics of the rubric tree node available in the city.
+
+    Note:
+        Rubric tree is picked by the city's country, not by its 2GIS domain
+        (e.g. Kyzylorda is a Kazakh city on `2gis.ru`).
+
+    Args:
+        code: Rubric code.
+        city: City from `data/cities.json`.
+
+    Returns:
+        List of leaf rubrics (see `leaf_rubrics`).
+    """
+    return leaf_rubrics(code, city['country_code'] == 'ru')
+
+
+def _find_city(domain: str, code: str) -> dict[str, Any] | None:
+    """Find city of `data/cities.json` by its 2GIS domain and code."""
+    return next((x for x in load_cities() if x['domain'] == domain and x['code'] == code), None)
+
+
+def split_rubric_url(url: str) -> list[str]:
+    """Expand search URL with parent rubric into URLs of its leaf rubrics.
+
+    Args:
+        url: 2GIS search URL with rubric (`/search/<query>/rubricId/<code>`).
+
+    Returns:
+        List of leaf rubric URLs or empty list if URL has no parent rubric
+        or its city is unknown.
+    """
+    url_match = re.match(_RUBRIC_URL_REGEX, url)
+    if not url_match:
+        return []
+
+    city = _find_city(url_match.group('domain'), url_match.group('city'))
+    if not city:
+        return []
+
+    leaves = city_leaf_rubrics(url_match.group('code'), city)
+    if not leaves or [x['code'] for x in leaves] == [url_match.group('code')]:
+        return []
+
+    # Page number is not relevant for other rubrics
+    rest = re.sub(r'/page/\d+', '', url_match.group('rest'))
+
+    base_url = url_match.group('base') + url_match.group('city') + url_match.group('search')
+    return [f'{base_url}{url_query_encode(x["label"])}/rubricId/{x["code"]}{rest}' for x in leaves]
+
+
+def split_city_url(url: str) -> list[str]:
+    """Fan out search URL to all cities of its country (`data/cities.json`).
+
+    Args:
+        url: 2GIS search URL.
+
+    Returns:
+        List of URLs, one per city, or empty list if URL is not a search URL.
+    """
+    url_match = re.match(_SEARCH_URL_REGEX, url)
+    if not url_match:
+        return []
+
+    # Map viewport belongs to the original city
+    split_rest = urllib.parse.urlsplit(url_match.group('rest'))
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(split_rest.query) if k != 'm']
+    rest = urllib.parse.urlunsplit(split_rest._replace(query=urllib.parse.urlencode(query)))
+
+    domain = url_match.group('domain')
+    return [f'https://2gis.{x["domain"]}/{x["code"]}{rest}'
+            for x in load_cities() if x['domain'] == domain]
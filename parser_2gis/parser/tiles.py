@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import math
+import re
+import urllib.parse
+from typing import Optional
+
+from pydantic import BaseModel
+
+# Size of the map world in pixels at zoom 0
+_WORLD_SIZE = 256
+
+
+class Tile(BaseModel):
+    """Map viewport, the way 2GIS keeps it in URL parameter `m`:
+    `m=<lon>,<lat>/<zoom>`.
+
+    Attributes:
+        lon: Longitude of the viewport center.
+        lat: Latitude of the viewport center.
+        zoom: Map zoom.
+    """
+    lon: float
+    lat: float
+    zoom: float
+
+    def split(self, viewport_width: int, viewport_height: int) -> list[Tile]:
+        """Split tile into 4 quarters with doubled zoom.
+
+        Args:
+            viewport_width: Map viewport width in pixels.
+            viewport_height: Map viewport height in pixels.
+
+        Returns:
+            List of child tiles.
+        """
+        world_size = _WORLD_SIZE * 2 ** self.zoom
+        x, y = _project(self.lon, self.lat, world_size)
+        dx, dy = viewport_width / 4, viewport_height / 4
+
+        tiles = []
+        for x_offset, y_offset in ((-dx, -dy), (dx, -dy), (-dx, dy), (dx, dy)):
+            lon, lat = _unproject(x + x_offset, y + y_offset, world_size)
+            tiles.append(Tile(lon=lon, lat=lat, zoom=self.zoom + 1))
+
+        return tiles
+
+    def __str__(self) -> str:
+        return f'{self.lon:.6f},{self.lat:.6f}/{self.zoom:g}'
+
+
+def _project(lon: float, lat: float, world_size: float) -> tuple[float, float]:
+    """Project WGS84 coordinates into Web Mercator pixels."""
+    x = (lon + 180) / 360 * world_size
+    sin_lat = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * world_size
+    return x, y
+
+
+def _unproject(x: float, y: float, world_size: float) -> tuple[float, float]:
+    """Unproject Web Mercator pixels into WGS84 coordinates."""
+    lon = x / world_size * 360 - 180
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / world_size))))
+    return lon, lat
+
+
+def url_tile(url: str) -> Optional[Tile]:
+    """Get map viewport from 2GIS URL.
+
+    Args:
+        url: 2GIS URL.
+
+    Returns:
+        Tile or `None` if URL has no viewport.
+    """
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+    for m_value in query.get('m', []):
+        m_match = re.match(r'(?P<lon>[-\d.]+),(?P<lat>[-\d.]+)/(?P<zoom>[\d.]+)', m_value)
+        if m_match:
+            return Tile(lon=m_match.group('lon'), lat=m_match.group('lat'),
+                        zoom=m_match.group('zoom'))
+
+    return None
+
+
+def tile_url(url: str, tile: Tile) -> str:
+    """Put map viewport into 2GIS URL.
+
+    Args:
+        url: 2GIS URL.
+        tile: Map viewport.
+
+    Returns:
+        URL with the viewport.
+    """
+    split_url = urllib.parse.urlsplit(url)
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(split_url.query) if k != 'm']
+    query.append(('m', str(tile)))
+    return urllib.parse.urlunsplit(split_url._replace(query=urllib.parse.urlencode(query)))
+
+
+def split_url(url: str, viewport_width: int, viewport_height: int,
+              max_zoom: float) -> list[str]:
+    """Split 2GIS search URL into 4 URLs with quarters of its map viewport.
+
+    Args:
+        url: 2GIS search URL with map viewport.
+        viewport_width: Map viewport width in pixels.
+        viewport_height: Map viewport height in pixels.
+        max_zoom: Max zoom allowed, URL with bigger zoom is not split.
+
+    Returns:
+        List of URLs or empty list if URL could not be split.
+    """
+    tile = url_tile(url)
+    if not tile or tile.zoom + 1 > max_zoom or viewport_width <= 0 or viewport_height <= 0:
+        return []
+
+    return [tile_url(url, x) for x in tile.split(viewport_width, viewport_height)]
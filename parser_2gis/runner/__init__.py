@@ -1,7 +1,9 @@
 from .cli import CLIRunner
 from .gui import GUIRunner
+from .pool import ParserPool
 
 __all__ = [
     'CLIRunner',
     'GUIRunner',
+    'ParserPool',
 ]
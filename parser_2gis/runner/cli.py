@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from ..exceptions import ChromeRuntimeException, ChromeUserAbortException
+from ..exceptions import ChromeRuntimeException, ChromeUserAbortException, WriterFormatUnavailable
 from ..logger import logger
-from ..parser import get_parser
 from ..writer import get_writer
+from .pool import ParserPool
 from .runner import AbstractRunner
 
 
@@ -12,25 +12,21 @@ class CLIRunner(AbstractRunner):
 
     Args:
         urls: 2GIS URLs with items to be collected.
-        output_path: Path to the result file.
-        format: `csv`, `xlsx` or `json` format.
+        output_path: Path to the result file or list of paths for several outputs.
+        format: `csv`, `xlsx`, `json`, `jsonl`, `parquet` or `sqlite` format
+            or list of formats, one for every path.
         config: Configuration.
     """
     def start(self):
         logger.info('Парсинг запущен.')
         try:
             with get_writer(self._output_path, self._format, self._config.writer) as writer:
-                for url in self._urls:
-                    logger.info(f'Парсинг ссылки {url}')
-                    with get_parser(url,
-                                    chrome_options=self._config.chrome,
-                                    parser_options=self._config.parser) as parser:
-                        try:
-                            parser.parse(writer)
-                        finally:
-                            logger.info('Парсинг ссылки завершён.')
+                pool = ParserPool(writer, self._config)
+                pool.run(self._urls)
         except (KeyboardInterrupt, ChromeUserAbortException):
             logger.error('Работа парсера прервана пользователем.')
+        except WriterFormatUnavailable as e:
+            logger.error(str(e))
         except Exception as e:
             if isinstance(e, ChromeRuntimeException) and str(e) == 'Tab has been stopped':
                 logger.error('Вкладка браузера была закрыта.')
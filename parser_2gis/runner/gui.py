@@ -3,23 +3,24 @@ from __future__ import annotations
 import threading
 from typing import TYPE_CHECKING
 
-from ..exceptions import ChromeRuntimeException, ChromeUserAbortException
+from ..exceptions import ChromeRuntimeException, ChromeUserAbortException, WriterFormatUnavailable
 from ..logger import logger
-from ..parser import get_parser
 from ..writer import get_writer
+from .pool import ParserPool
 from .runner import AbstractRunner
 
 if TYPE_CHECKING:
     from ..config import Configuration
+    from ..writer import FileWriter
 
 
 class GUIRunner(AbstractRunner, threading.Thread):
-    """GUI thread runner.
+    """GUI thread runner, URLs get parsed by parser pool (see `ParserPool`).
 
     Args:
         urls: 2GIS URLs with items to be collected.
         output_path: Path to the result file.
-        format: `csv`, `xlsx` or `json` format.
+        format: `csv`, `xlsx`, `json`, `jsonl`, `parquet` or `sqlite` format.
         config: Configuration.
     """
     def __init__(self, urls: list[str], output_path: str, format: str,
@@ -27,7 +28,7 @@ class GUIRunner(AbstractRunner, threading.Thread):
         AbstractRunner.__init__(self, urls, output_path, format, config)
         threading.Thread.__init__(self)
 
-        self._parser = None
+        self._pool: ParserPool | None = None
         self._lock = threading.Lock()
 
     def start(self) -> None:
@@ -44,41 +45,35 @@ class GUIRunner(AbstractRunner, threading.Thread):
         if self._cancelled:
             return  # We can stop the thread only once
 
-        self._cancelled = True
-        self._stop_parser()
+        with self._lock:
+            self._cancelled = True
+            if self._pool:
+                self._pool.stop()
 
-    def _stop_parser(self) -> None:
-        """Close parser if it's been opened."""
+    def _run_pool(self, writer: FileWriter) -> None:
+        """Parse URLs by parser pool, unless thread has been stopped."""
+        pool = ParserPool(writer, self._config)
         with self._lock:
-            if self._parser:
-                self._parser.close()
-                self._parser = None
+            if self._cancelled:
+                return
+            self._pool = pool
+
+        pool.run(self._urls)
 
     def run(self) -> None:
         """Thread's activity."""
-        with get_writer(self._output_path, self._format, self._config.writer) as writer:
-            for url in self._urls:
-                try:
-                    logger.info(f'Парсинг ссылки {url}')
-                    self._parser = get_parser(url,
-                                              chrome_options=self._config.chrome,
-                                              parser_options=self._config.parser)
-                    assert self._parser
-
-                    if not self._cancelled:
-                        self._parser.parse(writer)
-                except Exception as e:
-                    if not self._cancelled:  # Don't catch intended exceptions caused by stopping parser
-                        if isinstance(e, ChromeRuntimeException) and str(e) == 'Tab has been stopped':
-                            logger.error('Вкладка браузера была закрыта.')
-                        elif isinstance(e, ChromeUserAbortException):
-                            logger.error('Работа парсера прервана пользователем.')
-                        else:
-                            logger.error('Ошибка во время работы парсера.', exc_info=True)
-                finally:
-                    logger.info('Парсинг ссылки завершён.')
-                    self._stop_parser()
-                    if self._cancelled:
-                        break
-
-        logger.info('Парсинг завершён.')
+        try:
+            with get_writer(self._output_path, self._format, self._config.writer) as writer:
+                self._run_pool(writer)
+        except WriterFormatUnavailable as e:
+            logger.error(str(e))
+        except Exception as e:
+            if not self._cancelled:  # Don't catch intended exceptions caused by stopping parser
+                if isinstance(e, ChromeRuntimeException) and str(e) == 'Tab has been stopped':
+                    logger.error('Вкладка браузера была закрыта.')
+                elif isinstance(e, ChromeUserAbortException):
+                    logger.error('Работа парсера прервана пользователем.')
+                else:
+                    logger.error('Ошибка во время работы парсера.', exc_info=True)
+        finally:
+            logger.info('Парсинг завершён.')
@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import itertools
+import queue
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from ..exceptions import ChromeRuntimeException, ChromeUserAbortException
+from ..logger import logger
+from ..parser import (ProbeResult, SearchProbe, get_parser, get_parser_class, split_city_url,
+                      split_rubric_url, split_url)
+from ..parser.parsers import MainParser
+from ..writer import IdSet
+
+if TYPE_CHECKING:
+    from ..config import Configuration
+    from ..writer import FileWriter, WriterOptions
+
+_ParserT = TypeVar('_ParserT', bound=MainParser)
+
+
+class SharedWriter:
+    """Thread-safe proxy of a file writer shared between workers,
+    drops documents of organizations already written by any worker
+    if duplicates removal is enabled.
+
+    Args:
+        writer: Target file writer.
+        writer_options: Writer options.
+    """
+    def __init__(self, writer: FileWriter, writer_options: WriterOptions) -> None:
+        self._writer = writer
+        self._remove_duplicates = writer_options.csv.remove_duplicates
+        self._lock = threading.Lock()
+        self._seen_ids = IdSet()
+
+    @staticmethod
+    def _doc_id(catalog_doc: Any) -> str | None:
+        """Get catalog item id of Catalog Item API JSON document."""
+        try:
+            item_id = catalog_doc['result']['items'][0]['id']
+        except (KeyError, IndexError, TypeError):
+            return None
+
+        return item_id if isinstance(item_id, str) else None
+
+    def write(self, catalog_doc: Any) -> None:
+        """Write Catalog Item API JSON document if it hasn't been written yet."""
+        doc_id = self._doc_id(catalog_doc) if self._remove_duplicates else None
+        with self._lock:
+            if doc_id and not self._seen_ids.add(doc_id):
+                return
+
+            self._writer.write(catalog_doc)
+
+
+class SourceWriter:
+    """Proxy that tags documents with URL they've been collected by
+    (`meta.source_url`) before handing them over to the shared writer.
+
+    Args:
+        writer: Shared writer.
+        source_url: URL of the job.
+    """
+    def __init__(self, writer: SharedWriter, source_url: str) -> None:
+        self._writer = writer
+        self._source_url = source_url
+
+    def write(self, catalog_doc: Any) -> None:
+        """Tag Catalog Item API JSON document and write it."""
+        meta = catalog_doc.get('meta') if isinstance(catalog_doc, dict) else None
+        if isinstance(meta, dict):
+            meta.setdefault('source_url', self._source_url)
+
+        self._writer.write(catalog_doc)
+
+
+class Job(BaseModel):
+    """Parser pool job.
+
+    Attributes:
+        url: 2GIS URL.
+        probe: Whether URL should be probed before parsing.
+        cost: Estimated cost of the job (number of results), `None` if unknown.
+        source_url: URL the job has been derived from (e.g. split into map tiles),
+            `None` if it's the original URL.
+    """
+    url: str
+    probe: bool = False
+    cost: Optional[int] = None
+    source_url: Optional[str] = None
+
+
+# Job along with its priority in the queue
+QueueItem = Tuple[Tuple[int, int, int], Job]
+
+
+class ParserPool:
+    """Pool of workers, each worker runs its own browser and
+    takes jobs from the shared priority queue.
+
+    Before the start search URLs could be fanned out to all cities of their
+    country and expanded into leaf rubrics (see `ParserOptions.split_by_cities`,
+    `ParserOptions.split_by_rubrics`).
+
+    Search URLs could be probed with a cheap page load first
+    (see `ParserOptions.probe_urls`): empty and not found URLs get skipped,
+    the rest get parsed in order of their number of results, the largest first.
+    URLs with too many results could be split into map viewport tiles
+    (see `ParserOptions.split_by_tiles`), produced tiles go back
+    into the job queue and get distributed among all workers.
+    2GIS ranks results by viewport rather than filters them, so URL is
+    not split if none of its tiles has fewer results, and the number of tiles
+    is limited (see `ParserOptions.tiles_max_count`).
+
+    Worker could take the next job in advance and load its URL in a standby tab
+    while current URL is being parsed (see `ParserOptions.prefetch_urls`).
+
+    Args:
+        writer: Target file writer.
+        config: Configuration.
+    """
+    def __init__(self, writer: FileWriter, config: Configuration) -> None:
+        self._writer = SharedWriter(writer, config.writer)
+        self._config = config
+        self._jobs: queue.PriorityQueue[QueueItem] = queue.PriorityQueue()
+        self._jobs_counter = itertools.count()
+        self._probe_results: dict[str, ProbeResult] = {}
+        self._tiles_count = 0
+        self._stopped = threading.Event()
+        self._active_parsers: set[MainParser] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def probe_results(self) -> dict[str, ProbeResult]:
+        """Recorded probe results, keys are probed URLs."""
+        with self._lock:
+            return dict(self._probe_results)
+
+    def _put_job(self, job: Job) -> None:
+        """Put job into the queue. Probes go first, then
+        jobs with the highest cost, then jobs with unknown cost
+        in order of their arrival."""
+        priority = (0 if job.probe else 1, -(job.cost or 0), next(self._jobs_counter))
+        self._jobs.put((priority, job))
+
+    def _all_jobs_done(self) -> bool:
+        """Whether job queue is empty and no job is in progress."""
+        with self._jobs.mutex:
+            return self._jobs.unfinished_tasks == 0
+
+    def _open(self, parser: _ParserT) -> _ParserT:
+        """Register parser, so it could be closed on stop."""
+        with self._lock:
+            if self._stopped.is_set():
+                parser.close()
+                raise ChromeUserAbortException
+            self._active_parsers.add(parser)
+        return parser
+
+    def _close(self, parser: MainParser) -> None:
+        """Unregister and close parser, unless pool has closed it already."""
+        with self._lock:
+            is_active = parser in self._active_parsers
+            self._active_parsers.discard(parser)
+
+        if is_active:
+            parser.close()
+
+    def _plan_jobs(self, urls: list[str]) -> list[Job]:
+        """Expand URLs into jobs by cities and rubrics, drop duplicates.
+
+        Args:
+            urls: 2GIS URLs with items to be collected.
+
+        Returns:
+            List of jobs.
+        """
+        parser_options = self._config.parser
+
+        if parser_options.split_by_cities:
+            urls = [x for url in urls for x in split_city_url(url) or [url]]
+
+        if parser_options.split_by_rubrics:
+            urls = [x for url in urls for x in split_rubric_url(url) or [url]]
+
+        unique_urls = list(dict.fromkeys(urls))
+        if len(unique_urls) != len(urls) or parser_options.split_by_cities or parser_options.split_by_rubrics:
+            logger.info('Количество ссылок для парсинга: %d.', len(unique_urls))
+
+        probe = parser_options.probe_urls or parser_options.split_by_tiles
+        return [Job(url=url, probe=probe and self._is_search_url(url)) for url in unique_urls]
+
+    @staticmethod
+    def _is_search_url(url: str) -> bool:
+        """Whether URL is a search URL that could be probed."""
+        return bool(re.match(MainParser.url_pattern(), url))
+
+    def _probe(self, probe: SearchProbe, url: str) -> ProbeResult:
+        """Probe search URL, unless it's been probed already.
+
+        Args:
+            probe: Search probe.
+            url: Search URL.
+
+        Returns:
+            Probe result.
+        """
+        with self._lock:
+            result = self._probe_results.get(url)
+
+        if result is None:
+            result = probe.probe(url)
+            with self._lock:
+                self._probe_results[url] = result
+
+        return result
+
+    def _split_into_tiles(self, probe: SearchProbe, job: Job, result: ProbeResult) -> list[str]:
+        """Split probed search URL into map viewport tiles, tiles get probed.
+
+        Args:
+            probe: Search probe.
+            job: Probe job.
+            result: Probe result of the job.
+
+        Returns:
+            Tile URLs or empty list if URL should not be split.
+        """
+        parser_options = self._config.parser
+
+        tile_urls = split_url(result.location or job.url, result.viewport_width,
+                              result.viewport_height, parser_options.tiles_max_zoom)
+        if not tile_urls:
+            return []
+
+        with self._lock:
+            if self._tiles_count + len(tile_urls) > parser_options.tiles_max_count:
+                logger.warning('Ссылка %s не разбита, достигнуто максимальное количество частей карты: %d.',
+                               job.url, parser_options.tiles_max_count)
+                return []
+            self._tiles_count += len(tile_urls)
+
+        # Results are ranked by viewport, not filtered by it,
+        # so tiles could have as many results as the whole URL
+        assert result.total is not None
+        tile_totals = [self._probe(probe, x).total for x in tile_urls]
+        if not any(x is not None and x < result.total for x in tile_totals):
+            logger.info('Ссылка %s не разбита, количество результатов частей карты не уменьшается.', job.url)
+            with self._lock:
+                self._tiles_count -= len(tile_urls)  # Rejected tiles don't take the budget
+            return []
+
+        return tile_urls
+
+    def _probe_job(self, probe: SearchProbe, job: Job) -> None:
+        """Probe search URL, then schedule parsing of it, split it into map viewport tiles
+        if it has too many results or skip it if there's nothing to parse.
+
+        Args:
+            probe: Search probe.
+            job: Probe job.
+        """
+        parser_options = self._config.parser
+
+        result = self._probe(probe, job.url)
+
+        if result.status == 404 and parser_options.skip_404_response:
+            logger.warning('Ссылка %s пропущена, сервер вернул сообщение '
+                           '"Точных совпадений нет / Не найдено".', job.url)
+            return
+
+        if result.total == 0:
+            logger.warning('Ссылка %s пропущена, результаты не найдены.', job.url)
+            return
+
+        if result.total is not None:
+            logger.info('Ссылка %s: %d результатов.', job.url, result.total)
+
+        if parser_options.split_by_tiles and result.total and result.total > parser_options.tiles_results_cap:
+            tile_urls = self._split_into_tiles(probe, job, result)
+            if tile_urls:
+                logger.info('Ссылка %s (%d результатов) разбита на %d части карты.',
+                            job.url, result.total, len(tile_urls))
+                for tile_url in tile_urls:
+                    self._put_job(Job(url=tile_url, probe=True, source_url=job.source_url or job.url))
+                return
+
+        self._put_job(Job(url=job.url, cost=result.total, source_url=job.source_url))
+
+    @property
+    def _reuse_parsers(self) -> bool:
+        """Whether worker keeps its parser for the next URL."""
+        return self._config.parser.spa_navigation or self._config.parser.prefetch_urls
+
+    def _get_parser(self, url: str, parser: MainParser | None = None) -> MainParser:
+        """Get parser for URL.
+
+        Note:
+            If SPA navigation or prefetching is enabled, the browser of previous
+            parser is reused for the URL of the same kind, otherwise fresh one gets started.
+
+        Args:
+            url: URL to be parsed.
+            parser: Parser of the previous URL.
+
+        Returns:
+            Parser pointed to `url`.
+        """
+        if parser and (not self._reuse_parsers or type(parser) is not get_parser_class(url)):
+            self._close(parser)
+            parser = None
+
+        if parser:
+            parser.url = url
+            return parser
+
+        return self._open(get_parser(url,
+                                     chrome_options=self._config.chrome,
+                                     parser_options=self._config.parser))
+
+    def _prefetch_next_job(self, parser: MainParser) -> QueueItem | None:
+        """Take next job from the queue and let parser preload its URL in a standby tab.
+
+        Args:
+            parser: Parser of the current URL.
+
+        Returns:
+            Taken queue item or `None` if next job could not be prefetched.
+        """
+        try:
+            queue_item = self._jobs.get_nowait()
+        except queue.Empty:
+            return None
+
+        _, job = queue_item
+        if job.probe or type(parser) is not get_parser_class(job.url):
+            # Give it back to the queue
+            self._jobs.put(queue_item)
+            self._jobs.task_done()
+            return None
+
+        parser.prefetch(job.url)
+        return queue_item
+
+    def _worker(self) -> None:
+        """Worker's activity."""
+        probe: SearchProbe | None = None
+        parser: MainParser | None = None
+        prefetched_item: QueueItem | None = None
+
+        try:
+            while not self._stopped.is_set():
+                if prefetched_item:
+                    queue_item, prefetched_item = prefetched_item, None
+                else:
+                    try:
+                        queue_item = self._jobs.get(timeout=0.1)
+                    except queue.Empty:
+                        if self._all_jobs_done():
+                            break
+                        continue
+
+                _, job = queue_item
+                try:
+                    if job.probe:
+                        if not probe:
+                            probe = self._open(SearchProbe(chrome_options=self._config.chrome,
+                                                           parser_options=self._config.parser))
+                        self._probe_job(probe, job)
+                        continue
+
+                    logger.info(f'Парсинг ссылки {job.url}')
+                    try:
+                        # Failed parser gets closed, don't keep it
+                        parser, reused_parser = None, parser
+                        current_parser = self._get_parser(job.url, reused_parser)
+
+                        if self._config.parser.prefetch_urls:
+                            prefetched_item = self._prefetch_next_job(current_parser)
+
+                        try:
+                            source_writer = SourceWriter(self._writer, job.source_url or job.url)
+                            current_parser.parse(source_writer)  # type: ignore[arg-type]
+                        except Exception:
+                            self._close(current_parser)
+                            raise
+
+                        if self._reuse_parsers:
+                            parser = current_parser
+                        else:
+                            self._close(current_parser)
+                    finally:
+                        logger.info('Парсинг ссылки завершён.')
+                except Exception as e:
+                    if not self._stopped.is_set():  # Don't catch intended exceptions caused by stopping pool
+                        if isinstance(e, ChromeRuntimeException) and str(e) == 'Tab has been stopped':
+                            logger.error('Вкладка браузера была закрыта.')
+                        elif isinstance(e, ChromeUserAbortException):
+                            logger.error('Работа парсера прервана пользователем.')
+                        else:
+                            logger.error('Ошибка во время работы парсера.', exc_info=True)
+                finally:
+                    self._jobs.task_done()
+        finally:
+            for opened_parser in (probe, parser):
+                if opened_parser:
+                    self._close(opened_parser)
+
+    def run(self, urls: list[str]) -> None:
+        """Parse `urls` and wait until all jobs get done.
+
+        Args:
+            urls: 2GIS URLs with items to be collected.
+        """
+        for job in self._plan_jobs(urls):
+            self._put_job(job)
+
+        workers = [threading.Thread(target=self._worker, daemon=True)
+                   for _ in range(self._config.parser.workers)]
+        for worker in workers:
+            worker.start()
+
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(0.5)
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop workers and close their browsers."""
+        self._stopped.set()
+        with self._lock:
+            active_parsers = list(self._active_parsers)
+            self._active_parsers.clear()
+
+        for parser in active_parsers:
+            parser.close()
@@ -1,13 +1,41 @@
-from .options import WriterOptions, CSVOptions
-from .writers import CSVWriter, JSONWriter, FileWriter, XLSXWriter
+from .options import WriterOptions, CSVOptions, JSONLOptions, ParquetOptions, SQLiteOptions
+from .writers import (AsyncWriter, CSVWriter, JSONWriter, JSONLWriter, FileWriter, XLSXWriter,
+                      ParquetWriter, PARQUET_ENABLED, SQLiteWriter, TeeWriter, ShardedWriter,
+                      PartitionedWriter, STDOUT_PATH)
 from .factory import get_writer
+from .id_set import IdSet
+from .compression import ZSTD_ENABLED
+from .diff import DiffIndex, DiffWriter
+from .archive import (ArchiveChunk, ArchiveWriter, read_archive, read_archive_chunk,
+                      read_archive_index)
 
 __all__ = [
     'WriterOptions',
     'CSVOptions',
+    'JSONLOptions',
+    'ParquetOptions',
+    'SQLiteOptions',
     'CSVWriter',
     'XLSXWriter',
+    'ParquetWriter',
+    'PARQUET_ENABLED',
+    'SQLiteWriter',
     'JSONWriter',
+    'JSONLWriter',
     'FileWriter',
+    'STDOUT_PATH',
+    'AsyncWriter',
+    'TeeWriter',
+    'ShardedWriter',
+    'PartitionedWriter',
     'get_writer',
+    'IdSet',
+    'ZSTD_ENABLED',
+    'DiffIndex',
+    'DiffWriter',
+    'ArchiveChunk',
+    'ArchiveWriter',
+    'read_archive',
+    'read_archive_chunk',
+    'read_archive_index',
 ]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from typing import TYPE_CHECKING, Any, Iterator
+
+from pydantic import BaseModel
+
+from ..logger import logger
+from .writers import FileWriter
+
+if TYPE_CHECKING:
+    from .options import WriterOptions
+
+
+class ArchiveChunk(BaseModel):
+    """Chunk of raw archive: independent gzip member with JSON Lines of catalog documents.
+
+    Attributes:
+        offset: Chunk offset in archive file.
+        length: Chunk length in bytes.
+        count: Number of documents in the chunk.
+    """
+    offset: int
+    length: int
+    count: int
+
+
+def archive_index_path(archive_path: str) -> str:
+    """Path to the offset index of raw archive."""
+    return archive_path + '.idx'
+
+
+def read_archive_index(archive_path: str) -> list[ArchiveChunk]:
+    """Read offset index of raw archive.
+
+    Args:
+        archive_path: Path to raw archive.
+
+    Returns:
+        Archive chunks in order of their offsets.
+    """
+    chunks = []
+    with open(archive_index_path(archive_path), 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                chunks.append(ArchiveChunk.parse_raw(line))
+
+    return chunks
+
+
+def read_archive_chunk(archive_path: str, chunk: ArchiveChunk) -> list[Any]:
+    """Read catalog documents of raw archive chunk.
+
+    Args:
+        archive_path: Path to raw archive.
+        chunk: Archive chunk.
+
+    Returns:
+        Catalog Item API JSON documents.
+    """
+    with open(archive_path, 'rb') as f:
+        f.seek(chunk.offset)
+        data = gzip.decompress(f.read(chunk.length))
+
+    return [json.loads(x) for x in data.splitlines() if x]
+
+
+def read_archive(archive_path: str) -> Iterator[Any]:
+    """Read all catalog documents of raw archive sequentially, index is not needed.
+
+    Args:
+        archive_path: Path to raw archive.
+
+    Returns:
+        Iterator of Catalog Item API JSON documents.
+    """
+    with gzip.open(archive_path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ArchiveWriter(FileWriter):
+    """Proxy that appends every accepted catalog document to a raw archive
+    before handing it over to the target writer.
+
+    Archive is a sequence of gzip members, every member holds up to
+    `WriterOptions.archive_chunk_size` documents as JSON Lines. Offsets of the members
+    are kept in `<archive>.idx`, so chunks could be decoded in parallel.
+    Archive is appended by every run.
+
+    Args:
+        writer: Target file writer.
+        writer_options: Writer options.
+    """
+    def __init__(self, writer: FileWriter, writer_options: WriterOptions) -> None:
+        super().__init__(writer._file_path, writer_options)
+        self._writer = writer
+        self._archive_path = str(writer_options.archive_path)
+
+    def __enter__(self) -> ArchiveWriter:
+        self._writer.__enter__()
+        self._archive_file = open(self._archive_path, 'ab')
+        self._index_file = open(archive_index_path(self._archive_path), 'a', encoding='utf-8')
+        self._chunk: list[bytes] = []
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            self._write_chunk()
+        finally:
+            self._archive_file.close()
+            self._index_file.close()
+            self._writer.__exit__(*exc_info)
+
+    def _write_chunk(self) -> None:
+        """Compress buffered documents into a new archive member."""
+        if not self._chunk:
+            return
+
+        try:
+            data = gzip.compress(b''.join(self._chunk))
+            offset = self._archive_file.seek(0, os.SEEK_END)
+            self._archive_file.write(data)
+            self._archive_file.flush()
+
+            chunk = ArchiveChunk(offset=offset, length=len(data), count=len(self._chunk))
+            self._index_file.write(chunk.json() + '\n')
+            self._index_file.flush()
+        except OSError as e:
+            logger.error('Ошибка во время записи архива: %s', e)
+
+        self._chunk.clear()
+
+    def write(self, catalog_doc: Any) -> None:
+        """Archive Catalog Item API JSON document and write it down with target writer.
+
+        Args:
+            catalog_doc: Catalog Item API JSON document.
+        """
+        if self._check_catalog_doc(catalog_doc, verbose=False):
+            self._chunk.append(json.dumps(catalog_doc, ensure_ascii=False).encode('utf-8') + b'\n')
+            if len(self._chunk) >= self._options.archive_chunk_size:
+                self._write_chunk()
+
+        self._writer.write(catalog_doc)
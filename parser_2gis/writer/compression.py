@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import gzip
+import io
+import os
+from typing import IO, Any, Optional
+
+try:
+    import zstandard
+    ZSTD_ENABLED = True
+except ImportError:
+    ZSTD_ENABLED = False
+
+_COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+
+_DEFAULT_LEVELS = {
+    'gzip': 6,
+    'zstd': 3,
+}
+
+
+def split_compression_ext(file_path: str) -> tuple[str, str]:
+    """Split compression extension off the `file_path`.
+
+    Args:
+        file_path: Path to the file, e.g. `result.csv.gz`.
+
+    Returns:
+        Path without compression extension and the extension itself,
+        e.g. (`result.csv`, `.gz`). Extension is empty for uncompressed file.
+    """
+    root, ext = os.path.splitext(file_path)
+    if ext.lower() in _COMPRESSION_EXTENSIONS:
+        return root, ext
+    return file_path, ''
+
+
+def path_compression(file_path: str) -> Optional[str]:
+    """Compression of the file chosen by its extension.
+
+    Args:
+        file_path: Path to the file.
+
+    Returns:
+        `gzip`, `zstd` or `None` if file is not compressed.
+    """
+    _, ext = split_compression_ext(file_path)
+    return _COMPRESSION_EXTENSIONS.get(ext.lower())
+
+
+def open_compressed(file_path: str, mode: str, compression: str, level: Optional[int] = None,
+                    buffering: int = -1, **text_kwargs) -> IO[Any]:
+    """Open text stream through compressed file.
+
+    Appending adds a new gzip member (zstd frame) to the file,
+    while reading goes across all of them.
+
+    Args:
+        file_path: Path to the file.
+        mode: `r`, `w` or `a`.
+        compression: `gzip` or `zstd`.
+        level: Compression level, codec default if not set.
+            Gzip levels above 9 are treated as 9.
+        buffering: Buffering of underlying file (zstd only, gzip has its own buffer).
+        text_kwargs: `encoding`, `errors` and `newline` of text stream.
+
+    Returns:
+        Text stream.
+    """
+    if level is None:
+        level = _DEFAULT_LEVELS[compression]
+
+    binary_file: Any
+    if compression == 'gzip':
+        binary_file = gzip.open(file_path, mode + 'b', compresslevel=min(level, 9))
+    else:
+        raw_file = open(file_path, mode + 'b', buffering=buffering)
+        if mode == 'r':
+            dctx = zstandard.ZstdDecompressor()
+            binary_file = dctx.stream_reader(raw_file, read_across_frames=True)
+        else:
+            cctx = zstandard.ZstdCompressor(level=level)
+            binary_file = cctx.stream_writer(raw_file)
+
+    return io.TextIOWrapper(binary_file, **text_kwargs)
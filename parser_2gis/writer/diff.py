@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+from ..logger import logger
+from .compression import open_compressed
+from .id_set import IdSet
+from .writers import CSVWriter, FileWriter
+
+if TYPE_CHECKING:
+    from .options import WriterOptions
+
+# Header of diff index file: magic and number of records
+_DIFF_INDEX_MAGIC = b'P2GDIFF1'
+_DIFF_INDEX_HEADER_SIZE = 16
+
+# Magic numbers of compressed files
+_COMPRESSION_MAGICS = {
+    b'\x1f\x8b': 'gzip',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+}
+
+# Flag of firm key that is a hash of non-numeric id
+_HASHED_KEY_FLAG = 1 << 63
+
+
+def firm_key(item_id: str) -> int:
+    """64-bit key of organization: numeric firm id as is,
+    hash of non-numeric one (flagged by the highest bit).
+
+    Args:
+        item_id: Catalog item id.
+
+    Returns:
+        Firm key.
+    """
+    firm_id = item_id.split('_')[0]
+    if firm_id.isdigit() and int(firm_id) < _HASHED_KEY_FLAG:
+        return int(firm_id)
+
+    digest = hashlib.blake2b(firm_id.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') | _HASHED_KEY_FLAG
+
+
+def content_hash(row: dict[str, Any]) -> int:
+    """64-bit hash of extracted record content, empty fields
+    and order of fields don't matter.
+
+    Args:
+        row: Record extracted from catalog item.
+
+    Returns:
+        Content hash.
+    """
+    content = '\x1f'.join(f'{k}\x1e{v}' for k, v in sorted(row.items()) if v is not None and v != '')
+    digest = hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def write_diff_index(index_path: str, keys: array[int], hashes: array[int]) -> None:
+    """Write diff index: records sorted by firm key, so they could be
+    looked up with binary search right in the memory mapped file.
+
+    Args:
+        index_path: Path to diff index.
+        keys: Firm keys.
+        hashes: Content hashes of the records.
+    """
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+
+    tmp_index_path = index_path + '.tmp'
+    with open(tmp_index_path, 'wb') as f:
+        f.write(_DIFF_INDEX_MAGIC)
+        f.write(len(keys).to_bytes(8, 'little'))
+        array('Q', (keys[i] for i in order)).tofile(f)
+        array('Q', (hashes[i] for i in order)).tofile(f)
+
+    os.replace(tmp_index_path, index_path)
+
+
+class DiffIndex:
+    """Diff index of the previous run: memory mapped file
+    with sorted firm keys followed by content hashes of the records.
+
+    Args:
+        index_path: Path to diff index.
+    """
+    def __init__(self, index_path: str) -> None:
+        self._file = open(index_path, 'rb')
+        header = self._file.read(_DIFF_INDEX_HEADER_SIZE)
+        if len(header) != _DIFF_INDEX_HEADER_SIZE or header[:8] != _DIFF_INDEX_MAGIC:
+            self._file.close()
+            raise ValueError(f'Not a diff index: {index_path}')
+
+        count = int.from_bytes(header[8:], 'little')
+        self._mmap: Optional[mmap.mmap] = None
+        self._views: list[memoryview] = []
+        self._keys: Any = []
+        self._hashes: Any = []
+        if count:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self._mmap)
+            values = view[_DIFF_INDEX_HEADER_SIZE:].cast('Q')
+            self._keys, self._hashes = values[:count], values[count:count * 2]
+            self._views = [view, values, self._keys, self._hashes]
+
+        self._seen = bytearray(count)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def compare(self, key: int, digest: int) -> Optional[str]:
+        """Compare record with the previous run, mark it as seen.
+
+        Args:
+            key: Firm key.
+            digest: Content hash of the record.
+
+        Returns:
+            `added`, `changed` or `None` if record hasn't changed.
+        """
+        i = bisect.bisect_left(self._keys, key)
+        if i == len(self._seen) or self._keys[i] != key:
+            return 'added'
+
+        self._seen[i] = 1
+        return None if self._hashes[i] == digest else 'changed'
+
+    def removed_keys(self) -> Iterator[int]:
+        """Keys of the previous run's records that haven't been seen."""
+        i = self._seen.find(0)
+        while i != -1:
+            yield self._keys[i]
+            i = self._seen.find(0, i + 1)
+
+    def close(self) -> None:
+        """Close index file."""
+        # Views must be released before the map gets closed
+        for view in reversed(self._views):
+            view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+def read_base_docs(base_path: str) -> Iterator[Any]:
+    """Read Catalog Item API JSON documents of a previous run:
+    raw archive or JSON Lines output, compressed or not.
+
+    Args:
+        base_path: Path to raw archive or JSON Lines file.
+
+    Returns:
+        Iterator of Catalog Item API JSON documents.
+    """
+    with open(base_path, 'rb') as f:
+        magic = f.read(4)
+
+    compression = next((v for k, v in _COMPRESSION_MAGICS.items() if magic.startswith(k)), None)
+    if compression:
+        f_base = open_compressed(base_path, 'r', compression, encoding='utf-8-sig', errors='replace')
+    else:
+        f_base = open(base_path, 'r', encoding='utf-8-sig', errors='replace')
+
+    with f_base:
+        for line in f_base:
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Broken line of interrupted run
+
+            if isinstance(obj, dict):
+                # Raw archive keeps whole documents, JSON Lines output keeps items
+                yield obj if 'result' in obj else {'meta': {'code': 200}, 'result': {'items': [obj]}}
+
+
+class DiffWriter(FileWriter):
+    """Proxy that hands over to the target writer only records
+    added or changed since the previous run, followed by removed ones.
+
+    Every record is keyed by its firm id and its extracted content is hashed.
+    Keys and hashes of the previous run are kept in diff index
+    (`WriterOptions.diff_index`, 16 bytes per record), that is looked up
+    right on disk. Index of the current run replaces it on exit.
+    Initial index could be built from raw archive or JSON Lines output
+    of a previous run (`WriterOptions.diff_base`).
+
+    Change type (`added`, `changed`, `removed`) is set to `change_type`
+    field of the item. Removed records carry only id.
+
+    Note:
+        Interrupted run reports no removed records and keeps the previous index.
+
+    Args:
+        writer: Target file writer, expected to be quiet (`verbose` disabled).
+        writer_options: Writer options.
+    """
+    def __init__(self, writer: FileWriter, writer_options: WriterOptions) -> None:
+        super().__init__(writer._file_path, writer_options)
+        self._writer = writer
+        self._index_path = str(writer_options.diff_index)
+
+        # Records are extracted like for CSV table to get hashed
+        self._extractor = CSVWriter('', writer_options.copy(update={'verbose': False}))
+
+    def _record(self, catalog_doc: Any) -> Optional[tuple[int, int]]:
+        """Firm key and content hash of checked Catalog Item API JSON document."""
+        row = self._extractor._extract_raw(catalog_doc)
+        if not row:
+            return None
+
+        row = self._extractor._join_row(row)
+        row.pop('change_type', None)  # Set by a previous run
+
+        return firm_key(catalog_doc['result']['items'][0]['id']), content_hash(row)
+
+    def _build_index(self, base_path: str) -> None:
+        """Build diff index out of documents of a previous run."""
+        logger.info('Построение индекса изменений из файла %s.', base_path)
+        keys, hashes = array('Q'), array('Q')
+        written_ids = IdSet()
+        for catalog_doc in read_base_docs(base_path):
+            if not self._check_catalog_doc(catalog_doc, verbose=False):
+                continue
+
+            item = catalog_doc['result']['items'][0]
+            if item.get('change_type') == 'removed' or not isinstance(item.get('id'), str):
+                continue  # Removed record of a previous diff
+
+            record = self._record(catalog_doc)
+            if record and written_ids.add(item['id']):
+                keys.append(record[0])
+                hashes.append(record[1])
+
+        write_diff_index(self._index_path, keys, hashes)
+
+    def __enter__(self) -> DiffWriter:
+        if self._options.diff_base:
+            self._build_index(self._options.diff_base)
+
+        self._index: Optional[DiffIndex] = None
+        if os.path.isfile(self._index_path):
+            self._index = DiffIndex(self._index_path)
+            logger.info('Сравнение с предыдущим запуском, записей в индексе: %d.', len(self._index))
+
+        self._keys, self._hashes = array('Q'), array('Q')
+        self._indexed_ids = IdSet()  # Index keeps every firm once, duplicates could be written though
+        self._changes = {'added': 0, 'changed': 0, 'removed': 0}
+        self._wrote_count = 0
+        self._writer.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            if exc_info[0] is None:
+                if self._index:
+                    self._write_removed(self._index)
+                    self._index.close()
+                    self._index = None
+                write_diff_index(self._index_path, self._keys, self._hashes)
+            else:
+                logger.warning('Работа прервана, удалённые записи не определены, индекс изменений не обновлён.')
+        finally:
+            if self._index:
+                self._index.close()
+            self._writer.__exit__(*exc_info)
+
+        logger.info('Добавлено записей: %d, изменено: %d, удалено: %d.',
+                    self._changes['added'], self._changes['changed'], self._changes['removed'])
+
+    def _write_removed(self, index: DiffIndex) -> None:
+        """Write down records of the previous run that haven't been seen."""
+        skipped_count = 0
+        for key in index.removed_keys():
+            if key & _HASHED_KEY_FLAG:
+                skipped_count += 1  # Id is unknown
+                continue
+
+            self._changes['removed'] += 1
+            self._writer.write({
+                'meta': {'code': 200},
+                'result': {'items': [{'id': str(key), 'locale': '', 'type': '', 'change_type': 'removed'}]},
+            })
+
+        if skipped_count:
+            logger.warning('Пропущено удалённых записей с нечисловым идентификатором: %d.', skipped_count)
+
+    def write(self, catalog_doc: Any) -> None:
+        """Write Catalog Item API JSON document down with target writer
+        if it's been added or changed since the previous run.
+
+        Args:
+            catalog_doc: Catalog Item API JSON document.
+        """
+        if not self._check_catalog_doc(catalog_doc) or self._is_duplicate(catalog_doc):
+            return
+
+        record = self._record(catalog_doc)
+        if not record:
+            return
+
+        key, digest = record
+        item = catalog_doc['result']['items'][0]
+        if self._indexed_ids.add(item['id']):
+            self._keys.append(key)
+            self._hashes.append(digest)
+
+        self._report_item(item)
+        self._wrote_count += 1
+
+        change_type = self._index.compare(key, digest) if self._index else 'added'
+        if change_type:
+            self._changes[change_type] += 1
+            item['change_type'] = change_type
+            self._writer.write(catalog_doc)
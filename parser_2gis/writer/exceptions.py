@@ -3,6 +3,12 @@ class WriterUnknownFileFormat(Exception):
     pass
 
 
+class WriterFormatUnavailable(Exception):
+    """Raises when output file format requires a package that is not installed."""
+    pass
+
+
 __all__ = [
     'WriterUnknownFileFormat',
+    'WriterFormatUnavailable',
 ]
@@ -1,32 +1,120 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
-from .writers import CSVWriter, XLSXWriter, FileWriter, JSONWriter
-
-from .exceptions import WriterUnknownFileFormat
+from ..logger import logger
+from .archive import ArchiveWriter
+from .compression import ZSTD_ENABLED, path_compression
+from .diff import DiffWriter
+from .exceptions import WriterFormatUnavailable, WriterUnknownFileFormat
+from .writers import (PARQUET_ENABLED, AsyncWriter, CSVWriter, FileWriter, JSONLWriter, JSONWriter,
+                      ParquetWriter, PartitionedWriter, ShardedWriter, SQLiteWriter, STDOUT_PATH, TeeWriter,
+                      XLSXWriter)
 
 if TYPE_CHECKING:
     from .options import WriterOptions
 
 
-def get_writer(file_path: str, file_format: str, writer_options: WriterOptions) -> FileWriter:
+def _get_format_writer(file_path: str, file_format: str, writer_options: WriterOptions) -> FileWriter:
+    """Create writer of a single output file."""
+    if file_format == 'json':
+        return JSONWriter(file_path, writer_options)
+    elif file_format == 'jsonl':
+        return JSONLWriter(file_path, writer_options)
+    elif file_format == 'csv':
+        return CSVWriter(file_path, writer_options)
+    elif file_format == 'xlsx':
+        return XLSXWriter(file_path, writer_options)
+    elif file_format == 'sqlite':
+        return SQLiteWriter(file_path, writer_options)
+    elif file_format == 'parquet':
+        if not PARQUET_ENABLED:
+            raise WriterFormatUnavailable('Для формата parquet необходимо установить пакет pyarrow: '
+                                          'pip install parser-2gis[parquet]')
+        return ParquetWriter(file_path, writer_options)
+    else:
+        raise WriterUnknownFileFormat('Неизвестный формат файла: %s', file_format)
+
+
+def _get_output_writer(file_path: str, file_format: str, writer_options: WriterOptions) -> FileWriter:
+    """Create writer of a single output, partitioned or sharded one if set up."""
+    if file_path == STDOUT_PATH:
+        if file_format not in ('csv', 'json', 'jsonl'):
+            raise WriterFormatUnavailable('Формат %s не поддерживает вывод в stdout.' % file_format)
+        if writer_options.partition_by or writer_options.shard_records or writer_options.shard_bytes:
+            raise WriterFormatUnavailable('Вывод в stdout не разбивается на разделы и части.')
+
+        return _get_format_writer(file_path, file_format, writer_options)
+
+    compression = path_compression(file_path)
+    if compression and file_format in ('xlsx', 'parquet', 'sqlite'):
+        logger.warning('Формат %s не поддерживает сжатие, файл будет записан без сжатия.', file_format)
+    elif compression == 'zstd' and not ZSTD_ENABLED:
+        raise WriterFormatUnavailable('Для сжатия zstd необходимо установить пакет zstandard: '
+                                      'pip install parser-2gis[zstd]')
+
+    if writer_options.partition_by:
+        if writer_options.shard_records or writer_options.shard_bytes:
+            logger.warning('Разбиение результата на части не применяется к разделам.')
+
+        def create_partition_writer(partition_path: str, partition_options: WriterOptions) -> FileWriter:
+            return _get_format_writer(partition_path, file_format, partition_options)
+
+        return PartitionedWriter(file_path, writer_options, file_format, create_partition_writer)
+
+    if writer_options.shard_records or writer_options.shard_bytes:
+        def create_writer(shard_path: str, shard_options: WriterOptions) -> FileWriter:
+            return _get_format_writer(shard_path, file_format, shard_options)
+
+        return ShardedWriter(file_path, writer_options, create_writer)
+
+    return _get_format_writer(file_path, file_format, writer_options)
+
+
+def get_writer(file_path: Union[str, list[str]], file_format: Union[str, list[str]],
+               writer_options: WriterOptions) -> FileWriter:
     """Writer factory function.
 
+    CSV and JSON outputs get compressed on the fly if `file_path`
+    has compression extension: `.gz` or `.zst`. Outputs get rotated
+    into numbered shards if shard limits are set, or written into
+    directory of partitions if partitioning is set. Only changes since
+    the previous run get written if diff index is set. CSV and JSON
+    records are streamed to `stdout` if `file_path` is `STDOUT_PATH` (`-`).
+
     Args:
-        output_path: Path to thr result file.
-        format: `csv`, `xlsx` or `json` format.
+        file_path: Path to the result file or list of paths for several outputs.
+        file_format: `csv`, `xlsx`, `json`, `jsonl`, `parquet` or `sqlite` format
+            or list of formats, one for every path.
         writer_options: Writer options.
 
     Returns:
         File Writer instance.
     """
+    # Diff writer reports written items instead of target writer
+    report_options = writer_options.copy(update={'verbose': False}) if writer_options.diff_index else writer_options
 
-    if file_format == 'json':
-        return JSONWriter(file_path, writer_options)
-    elif file_format == 'csv':
-        return CSVWriter(file_path, writer_options)
-    elif file_format == 'xlsx':
-        return XLSXWriter(file_path, writer_options)
+    writer: FileWriter
+    if isinstance(file_path, list) or isinstance(file_format, list):
+        file_paths = [file_path] if isinstance(file_path, str) else file_path
+        file_formats = [file_format] if isinstance(file_format, str) else file_format
+        if len(file_paths) != len(file_formats):
+            raise ValueError('Number of paths and formats mismatch')
+
+        # Composite writer reports written items instead of target writers
+        target_options = writer_options.copy(update={'verbose': False})
+        writer = TeeWriter([_get_output_writer(path, format, target_options)
+                            for path, format in zip(file_paths, file_formats)], report_options)
+    else:
+        writer = _get_output_writer(file_path, file_format, report_options)
+
+    if writer_options.diff_index:
+        writer = DiffWriter(writer, writer_options)
+
+    if writer_options.archive_path:
+        writer = ArchiveWriter(writer, writer_options)
+
+    if writer_options.async_write:
+        writer = AsyncWriter(writer, writer_options)
 
-    raise WriterUnknownFileFormat('Неизвестный формат файла: %s', file_format)
+    return writer
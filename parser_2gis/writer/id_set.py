@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+from array import array
+
+# Mask of unsigned 64-bit integer
+_MASK_64 = (1 << 64) - 1
+
+
+def id_hash(item_id: str) -> int:
+    """64-bit hash of organization id.
+
+    Note:
+        Branch id looks like `<firm_id>_<hash>`, only firm id is taken into account.
+        Numeric firm ids are used as is (shifted by one), others get hashed with BLAKE2.
+
+    Args:
+        item_id: Catalog item id.
+
+    Returns:
+        Non-zero 64-bit hash.
+    """
+    firm_id = item_id.split('_')[0]
+    if firm_id.isdigit() and len(firm_id) < 20:
+        return int(firm_id) + 1  # Zero marks an empty slot
+
+    value = int.from_bytes(hashlib.blake2b(firm_id.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+class IdSet:
+    """Compact set of organization ids.
+
+    Ids are kept as 64-bit hashes in an open addressing table
+    backed by `array`, that is 16 bytes per id at most.
+
+    Args:
+        capacity: Initial number of slots, power of 2.
+    """
+    def __init__(self, capacity: int = 1024) -> None:
+        self._slots = array('Q', bytes(8 * capacity))
+        self._mask = capacity - 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _find(self, value: int) -> int:
+        """Find slot index of the hash or empty slot where it should be put."""
+        slots, mask = self._slots, self._mask
+
+        # Spread sequential ids all over the table (Fibonacci hashing)
+        index = (((value * 0x9E3779B97F4A7C15) & _MASK_64) >> 32) & mask
+        while slots[index] and slots[index] != value:
+            index = (index + 1) & mask
+        return index
+
+    def _grow(self) -> None:
+        """Double the table."""
+        old_slots = self._slots
+        self._slots = array('Q', bytes(16 * len(old_slots)))
+        self._mask = len(self._slots) - 1
+        for value in old_slots:
+            if value:
+                self._slots[self._find(value)] = value
+
+    def __contains__(self, item_id: str) -> bool:
+        return bool(self._slots[self._find(id_hash(item_id))])
+
+    def add(self, item_id: str) -> bool:
+        """Add organization id.
+
+        Args:
+            item_id: Catalog item id.
+
+        Returns:
+            `True` if id has been added, `False` if it was already in the set.
+        """
+        value = id_hash(item_id)
+        index = self._find(value)
+        if self._slots[index]:
+            return False
+
+        self._slots[index] = value
+        self._size += 1
+
+        # Keep load factor under 0.5
+        if self._size * 2 > len(self._slots):
+            self._grow()
+
+        return True
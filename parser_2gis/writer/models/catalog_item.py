@@ -78,14 +78,24 @@ class CatalogItem(BaseModel):
 
     @property
     def url(self) -> str:
-        return 'https://2gis.com/firm/%s' % self.id.split('_')[0]
+        return firm_url(self.id)
 
     @property
     def timezone(self) -> str | None:
-        if self.timezone_offset is None:
-            return None
-        sign = '-' if self.timezone_offset < 0 else '+'
-        minutes = abs(self.timezone_offset)
-        h = minutes // 60
-        m = minutes % 60
-        return '{}{:02d}:{:02d}'.format(sign, h, m)
+        return timezone_str(self.timezone_offset)
+
+
+def firm_url(item_id: str) -> str:
+    """2GIS URL of organization by its branch id."""
+    return 'https://2gis.com/firm/%s' % item_id.split('_')[0]
+
+
+def timezone_str(timezone_offset: int | None) -> str | None:
+    """Timezone offset in minutes as a string (e.g. `+07:00`)."""
+    if timezone_offset is None:
+        return None
+    sign = '-' if timezone_offset < 0 else '+'
+    minutes = abs(timezone_offset)
+    h = minutes // 60
+    m = minutes % 60
+    return '{}{:02d}:{:02d}'.format(sign, h, m)
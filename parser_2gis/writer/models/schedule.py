@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -67,25 +67,35 @@ class Schedule(BaseModel):
         Returns:
             Schedule as a string.
         """
-        days_names = [x.name for x in self.__fields__.values() if x.type_ == ScheduleDay]
-        days_mapping = dict(Mon='Пн', Tue='Вт', Wed='Ср', Thu='Чт', Fri='Пт', Sat='Сб', Sun='Вс')
+        return schedule_str(self.dict(by_alias=True), join_char, add_comment)
 
-        slots_list = []
-        for day_name in days_names:
-            day_value = getattr(self, day_name)
-            if not day_value:
-                continue
 
-            day_slot = f'{days_mapping[day_name]}: '
-            for i, time_slot in enumerate(day_value.working_hours):
-                if i > 0:
-                    day_slot += ', '
-                day_slot += f'{time_slot.from_}-{time_slot.to}'
+# Schedule days in order along with their short names
+_DAYS_MAPPING = dict(Mon='Пн', Tue='Вт', Wed='Ср', Thu='Чт', Fri='Пт', Sat='Сб', Sun='Вс')
 
-            slots_list.append(day_slot)
 
-        result = join_char.join(slots_list)
-        if add_comment and self.comment:
-            result += ' (%s)' % self.comment
+def schedule_str(schedule: dict[str, Any], join_char: str, add_comment: bool = False) -> str:
+    """Schedule of Catalog Item API JSON document as a string.
 
-        return result
+    Args:
+        schedule: Schedule of Catalog Item API JSON document.
+        join_char: Char for splitting split days.
+        add_comment: Whether to add comment at the end.
+
+    Returns:
+        Schedule as a string.
+    """
+    slots_list = []
+    for day_name, day_short_name in _DAYS_MAPPING.items():
+        day_value = schedule.get(day_name)
+        if not day_value:
+            continue
+
+        time_slots = (f'{x["from"]}-{x["to"]}' for x in day_value['working_hours'])
+        slots_list.append(f'{day_short_name}: ' + ', '.join(time_slots))
+
+    result = join_char.join(slots_list)
+    if add_comment and schedule.get('comment'):
+        result += ' (%s)' % schedule['comment']
+
+    return result
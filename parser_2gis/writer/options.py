@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import codecs
+from typing import Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PositiveInt, validator
 
 
 class CSVOptions(BaseModel):
@@ -14,7 +15,7 @@ class CSVOptions(BaseModel):
             with extra info, business hours.
         columns_per_entity: Number of columns for a result with multiple possible values.
         remove_empty_columns: Remove empty columns after parsing process finished.
-        remove_duplicates: Remove duplicates after parsing process finished.
+        remove_duplicates: Skip organizations that have already been written (any output format).
         join_char: Char for joining complex values.
     """
     add_rubrics: bool = True
@@ -25,16 +26,86 @@ class CSVOptions(BaseModel):
     join_char: str = '; '
 
 
+class JSONLOptions(BaseModel):
+    """Represent all possible options for JSON Lines Writer.
+
+    Attributes:
+        flush_every: Flush file every N records.
+        fsync: Sync file to disk on every flush.
+        append: Append records to existing file instead of overwriting it.
+    """
+    flush_every: PositiveInt = 100
+    fsync: bool = False
+    append: bool = False
+
+
+class ParquetOptions(BaseModel):
+    """Represent all possible options for Parquet Writer.
+
+    Attributes:
+        row_group_size: Number of records in a row group.
+        compression: Compression codec: `snappy`, `gzip`, `brotli`, `zstd`, `lz4` or `none`.
+    """
+    row_group_size: PositiveInt = 10000
+    compression: str = 'zstd'
+
+    @validator('compression')
+    def compression_exists(cls, v: str) -> str:
+        """Determine if `compression` codec is known."""
+        if v.lower() not in ('snappy', 'gzip', 'brotli', 'zstd', 'lz4', 'none'):
+            raise ValueError
+        return v.lower()
+
+
+class SQLiteOptions(BaseModel):
+    """Represent all possible options for SQLite Writer.
+
+    Attributes:
+        batch_size: Number of records inserted in a single transaction.
+    """
+    batch_size: PositiveInt = 500
+
+
 class WriterOptions(BaseModel):
     """Represent all possible options for File Writer.
 
     Attributes:
        encoding: Encoding of output document.
        verbose: Echo to stdout parsing item's name.
+       async_write: Convert and write documents in a separate thread.
+       queue_size: Max number of documents waiting to be written,
+           parser blocks when the queue is full.
+       archive_path: Path to raw archive of catalog documents, no archive if not set.
+       archive_chunk_size: Number of documents in a single archive chunk.
+       compression_level: Level of output file compression (`.gz`, `.zst`),
+           codec default if not set.
+       shard_records: Rotate output into a new shard after N records, no limit if not set.
+       shard_bytes: Rotate output into a new shard after M bytes, no limit if not set.
+       partition_by: Write records into output directory partitioned by city
+           and `rubric` or source `url`, no partitioning if not set.
+       partition_open_files: Max number of partition files kept open.
+       diff_index: Path to diff index of the previous run, only added, changed
+           and removed records get written if set.
+       diff_base: Path to raw archive or JSON Lines output of a previous run
+           to build diff index from.
     """
     encoding: str = 'utf-8-sig'
     verbose: bool = True
+    async_write: bool = False
+    queue_size: PositiveInt = 1000
+    archive_path: Optional[str] = None
+    archive_chunk_size: PositiveInt = 1000
+    compression_level: Optional[int] = Field(None, ge=1, le=22)
+    shard_records: Optional[PositiveInt] = None
+    shard_bytes: Optional[PositiveInt] = None
+    partition_by: Optional[str] = None
+    partition_open_files: PositiveInt = 64
+    diff_index: Optional[str] = None
+    diff_base: Optional[str] = None
     csv: CSVOptions = CSVOptions()
+    jsonl: JSONLOptions = JSONLOptions()
+    parquet: ParquetOptions = ParquetOptions()
+    sqlite: SQLiteOptions = SQLiteOptions()
 
     @validator('encoding')
     def encoding_exists(cls, v: str) -> str:
@@ -44,3 +115,10 @@ class WriterOptions(BaseModel):
         except LookupError:
             raise ValueError
         return v
+
+    @validator('partition_by')
+    def partition_by_exists(cls, v: Optional[str]) -> Optional[str]:
+        """Determine if `partition_by` is known."""
+        if v is not None and v.lower() not in ('rubric', 'url'):
+            raise ValueError
+        return v and v.lower()
@@ -1,11 +1,27 @@
-from .file_writer import FileWriter
+from .file_writer import FileWriter, STDOUT_PATH
+from .async_writer import AsyncWriter
 from .csv_writer import CSVWriter
 from .json_writer import JSONWriter
+from .jsonl_writer import JSONLWriter
 from .xlsx_writer import XLSXWriter
+from .parquet_writer import ParquetWriter, PARQUET_ENABLED
+from .sqlite_writer import SQLiteWriter
+from .tee_writer import TeeWriter
+from .sharded_writer import ShardedWriter
+from .partitioned_writer import PartitionedWriter
 
 __all__ = [
     'FileWriter',
+    'STDOUT_PATH',
+    'AsyncWriter',
     'CSVWriter',
     'XLSXWriter',
+    'ParquetWriter',
+    'PARQUET_ENABLED',
+    'SQLiteWriter',
     'JSONWriter',
+    'JSONLWriter',
+    'TeeWriter',
+    'ShardedWriter',
+    'PartitionedWriter',
 ]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+from .file_writer import FileWriter
+
+if TYPE_CHECKING:
+    from ..options import WriterOptions
+
+
+class AsyncWriter(FileWriter):
+    """Proxy that hands documents over to the target writer running in a separate thread.
+
+    Document conversion and file output overlap with browser waits,
+    `write` returns immediately unless the bounded queue is full
+    (backpressure for the parser). All queued documents get
+    written down on exit.
+
+    The first error of the target writer stops writing, it's raised
+    by the next `write` call or on exit.
+
+    Args:
+        writer: Target file writer.
+        writer_options: Writer options.
+    """
+    def __init__(self, writer: FileWriter, writer_options: WriterOptions) -> None:
+        super().__init__(writer._file_path, writer_options)
+        self._writer = writer
+
+    def __enter__(self) -> AsyncWriter:
+        self._writer.__enter__()
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=self._options.queue_size)
+        self._error: Optional[Exception] = None  # Not raised yet
+        self._failed = False
+        self._thread = threading.Thread(target=self._write_documents, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # Flush the queue
+        self._queue.put(None)
+        self._thread.join()
+
+        # Target writer finishes the output as interrupted one
+        error, self._error = self._error, None
+        if error is not None and exc_info[0] is None:
+            self._writer.__exit__(type(error), error, error.__traceback__)
+            raise error
+
+        self._writer.__exit__(*exc_info)
+
+    def _write_documents(self) -> None:
+        """Writer thread's activity."""
+        while True:
+            catalog_doc = self._queue.get()
+            if catalog_doc is None:
+                break
+
+            if self._failed:
+                continue  # Writing has failed, drain the queue
+
+            try:
+                self._writer.write(catalog_doc)
+            except Exception as e:
+                self._error, self._failed = e, True
+
+    def _raise_error(self) -> None:
+        """Raise error of the target writer once."""
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def write(self, catalog_doc: Any) -> None:
+        """Put Catalog Item API JSON document into the writer queue.
+
+        Args:
+            catalog_doc: Catalog Item API JSON document.
+
+        Raises:
+            Exception: Error of the target writer.
+        """
+        self._raise_error()
+        if catalog_doc is not None:
+            self._queue.put(catalog_doc)
@@ -1,22 +1,107 @@
 from __future__ import annotations
 
 import csv
+import functools
 import os
 import re
 import shutil
-from typing import Any, Callable
+from typing import Any, Callable, Optional, Tuple
 
 from pydantic import ValidationError
 
 from ...common import report_from_validation_error
 from ...logger import logger
 from ..models import CatalogItem
-from .file_writer import FileWriter
+from ..models.catalog_item import firm_url, timezone_str
+from ..compression import split_compression_ext
+from ..models.schedule import schedule_str
+from .file_writer import STDOUT_PATH, FileWriter
+
+# Phone `value` sometimes has strange crap inside, so we better parse `text`
+_PHONE_JUNK_REGEX = re.compile(r'[^0-9+]')
+_PHONE_COUNTRY_CODE_REGEX = re.compile(r'^\+7')
+
+
+def _format_phone(phone: str) -> str:
+    """Keep digits only, replace Russian country code with `8`."""
+    return _PHONE_COUNTRY_CODE_REGEX.sub('8', _PHONE_JUNK_REGEX.sub('', phone))
+
+
+def _format_whatsapp(url: str) -> str:
+    """Remove arguments from WhatsApp URL."""
+    return url.split('?')[0]
+
+
+# Buffer size of post-processing file streams
+_POSTPROCESS_BUFFER_SIZE = 1024 * 1024
+
+
+class _MalformedItem(Exception):
+    """Field of raw catalog item has unexpected type."""
+
+
+def _get(obj: Any, key: str, types: type | tuple[type, ...], required: bool = False) -> Any:
+    """Get field of raw catalog item, check its type.
+
+    Args:
+        obj: Raw catalog item or its nested object.
+        key: Field name.
+        types: Expected types of the field value.
+        required: Whether field must present.
+
+    Returns:
+        Field value or `None` if field is missing.
+
+    Raises:
+        _MalformedItem: Field is malformed.
+    """
+    if not isinstance(obj, dict):
+        raise _MalformedItem(key)
+
+    if not isinstance(types, tuple):
+        types = (types,)
+
+    value = obj.get(key)
+    if value is None:
+        if required:
+            raise _MalformedItem(key)
+        return None
+
+    # `bool` is a subclass of `int`, but pydantic doesn't treat it as a number
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+        raise _MalformedItem(key)
+
+    return value
+
+
+def _get_float(obj: Any, key: str, required: bool = False) -> float | None:
+    """Get float field of raw catalog item, integers get converted like pydantic does."""
+    value = _get(obj, key, (float, int), required)
+    return None if value is None else float(value)
+
+
+# Contact plan: contact type (see `Contact` in `catalog_item.py`) -> fields of contact
+# to be added sorted by priority along with field value formatter
+ContactPlan = Tuple[Tuple[str, ...], Optional[Callable[[str], str]]]
+
+_CONTACTS_PLAN: dict[str, ContactPlan] = {
+    # URLs
+    **{t: (('url',), None) for t in ['website', 'vkontakte', 'viber', 'telegram',
+                                     'instagram', 'facebook', 'twitter', 'youtube']},
+    'whatsapp': (('url',), _format_whatsapp),
+
+    # Values
+    'email': (('value',), None),
+    'skype': (('value',), None),
+
+    # Phone (`value` sometimes has strange crap inside, so we better parse `text`)
+    'phone': (('text',), _format_phone),
+}
 
 
 class CSVWriter(FileWriter):
     """Writer to CSV table."""
-    @property
+    @functools.cached_property
     def _type_names(self) -> dict[str, str]:
         return {
             'parking': 'Парковка',
@@ -26,7 +111,7 @@ class CSVWriter(FileWriter):
             'station': 'Остановка',
         }
 
-    @property
+    @functools.cached_property
     def _complex_mapping(self) -> dict[str, Any]:
         # Complex mapping means its content could contain several entities bound by user settings.
         # For example: phone -> phone_1, phone_2, ..., phone_n
@@ -36,7 +121,7 @@ class CSVWriter(FileWriter):
             'viber': 'Viber', 'telegram': 'Telegram', 'youtube': 'YouTube', 'skype': 'Skype'
         }
 
-    @property
+    @functools.cached_property
     def _data_mapping(self) -> dict[str, Any]:
         data_mapping = {
             'name': 'Наименование', 'description': 'Описание', 'rubrics': 'Рубрики',
@@ -54,6 +139,10 @@ class CSVWriter(FileWriter):
         if not self._options.csv.add_rubrics:
             data_mapping.pop('rubrics', None)
 
+        # Change type of the record (see `DiffWriter`)
+        if self._options.diff_index:
+            data_mapping = {'change_type': 'Изменение', **data_mapping}
+
         return {
             **data_mapping,
             **{
@@ -64,54 +153,55 @@ class CSVWriter(FileWriter):
             }
         }
 
+    @functools.cached_property
+    def _columns(self) -> list[str]:
+        """Column plan: row keys in order of table columns."""
+        return list(self._data_mapping.keys())
+
+    def _join_values(self, values: list[str]) -> Any:
+        """Represent multiple values of a single cell."""
+        return self._options.csv.join_char.join(values)
+
     def _writerow(self, row: dict[str, Any]) -> None:
         """Write a `row` into CSV."""
         if self._options.verbose:
-            logger.info('Парсинг [%d] > %s', self._wrote_count + 1, row['name'])
+            logger.info('Парсинг [%d] > %s', self._wrote_count + 1, row.get('name'))
+
+        # Track non-empty columns to find out empty ones without re-reading the table
+        self._filled_columns.update(k for k, v in row.items() if v is not None and v != '')
 
         try:
-            self._writer.writerow(row)
+            self._write_values(list(map(row.get, self._columns)))
         except Exception as e:
             logger.error('Ошибка во время записи: %s', e)
 
+    def _write_values(self, values: list[Any]) -> None:
+        """Write row values ordered by column plan."""
+        self._writer.writerow(values)
+
     def __enter__(self) -> CSVWriter:
         super().__enter__()
-        self._writer = csv.DictWriter(self._file, self._data_mapping.keys())
-        self._writer.writerow(self._data_mapping)  # Write header
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self._data_mapping.values())  # Write header
         self._wrote_count = 0
+        self._filled_columns: set[str] = set()
         return self
 
     def __exit__(self, *exc_info) -> None:
         super().__exit__(*exc_info)
-        if self._options.csv.remove_empty_columns:
+        if self._options.csv.remove_empty_columns and self._file_path != STDOUT_PATH:
             logger.info('Удаление пустых колонок CSV.')
             self._remove_empty_columns()
-        if self._options.csv.remove_duplicates:
-            logger.info('Удаление повторяющихся записей CSV.')
-            self._remove_duplicates()
 
-    def _remove_empty_columns(self) -> None:
-        """Post-process: Remove empty columns."""
+    def _non_empty_mapping(self) -> dict[str, Any]:
+        """Data mapping without complex columns that have been empty in every written row."""
         complex_columns = self._complex_mapping.keys()
-        complex_columns_count = {c: 0 for c in self._data_mapping.keys() if
-                                 re.match('|'.join(fr'^{x}_\d+$' for x in complex_columns), c)}
-
-        # Looking for empty columns
-        with self._open_file(self._file_path, 'r') as f_csv:
-            csv_reader = csv.DictReader(f_csv, self._data_mapping.keys())  # type: ignore
-            next(csv_reader, None)  # Skip header
-            for row in csv.DictReader(f_csv, self._data_mapping.keys()):  # type: ignore
-                for column_name in complex_columns_count.keys():
-                    if row[column_name] != '':
-                        complex_columns_count[column_name] += 1
+        complex_column_regex = re.compile('|'.join(fr'^{x}_\d+$' for x in complex_columns))
 
         # Generate new data mapping
         new_data_mapping: dict[str, Any] = {}
         for k, v in self._data_mapping.items():
-            if k in complex_columns_count:
-                if complex_columns_count[k] > 0:
-                    new_data_mapping[k] = v
-            else:
+            if not complex_column_regex.match(k) or k in self._filled_columns:
                 new_data_mapping[k] = v
 
         # Rename single complex column - remove postfix numbers
@@ -119,35 +209,30 @@ class CSVWriter(FileWriter):
             if f'{column}_1' in new_data_mapping and f'{column}_2' not in new_data_mapping:
                 new_data_mapping[f'{column}_1'] = re.sub(r'\s+\d+$', '', new_data_mapping[f'{column}_1'])
 
-        # Populate new csv
-        tmp_csv_name = os.path.splitext(self._file_path)[0] + '.removed-columns.csv'
+        return new_data_mapping
 
-        with self._open_file(tmp_csv_name, 'w') as f_tmp_csv, \
-                self._open_file(self._file_path, 'r') as f_csv:
-            csv_writer = csv.DictWriter(f_tmp_csv, new_data_mapping.keys())  # type: ignore
-            csv_reader = csv.DictReader(f_csv, self._data_mapping.keys())  # type: ignore
-            csv_writer.writerow(new_data_mapping)  # Write new header
-            next(csv_reader, None)  # Skip header
+    def _remove_empty_columns(self) -> None:
+        """Post-process: Remove empty columns."""
+        new_data_mapping = self._non_empty_mapping()
+        if new_data_mapping == self._data_mapping:
+            return  # Nothing to remove
 
-            for row in csv_reader:
-                new_row = {k: v for k, v in row.items() if k in new_data_mapping}
-                csv_writer.writerow(new_row)
+        # Indices of kept columns
+        kept_indices = [i for i, k in enumerate(self._data_mapping.keys()) if k in new_data_mapping]
 
-        # Replace original table with new one
-        shutil.move(tmp_csv_name, self._file_path)
-
-    def _remove_duplicates(self) -> None:
-        """Post-process: Remove duplicates."""
-        tmp_csv_name = os.path.splitext(self._file_path)[0] + '.deduplicated.csv'
-        with self._open_file(tmp_csv_name, 'w') as f_tmp_csv, \
-                self._open_file(self._file_path, 'r') as f_csv:
-            seen_records = set()
-            for line in f_csv:
-                if line in seen_records:
-                    continue
+        # Populate new csv
+        # Temporary table gets compressed the same way
+        file_path, compression_ext = split_compression_ext(self._file_path)
+        tmp_csv_name = os.path.splitext(file_path)[0] + '.removed-columns.csv' + compression_ext
+
+        with self._open_file(tmp_csv_name, 'w', buffering=_POSTPROCESS_BUFFER_SIZE) as f_tmp_csv, \
+                self._open_file(self._file_path, 'r', buffering=_POSTPROCESS_BUFFER_SIZE) as f_csv:
+            csv_writer = csv.writer(f_tmp_csv)
+            csv_reader = csv.reader(f_csv)
+            csv_writer.writerow(new_data_mapping.values())  # Write new header
+            next(csv_reader, None)  # Skip header
 
-                seen_records.add(line)
-                f_tmp_csv.write(line)
+            csv_writer.writerows([row[i] for i in kept_indices] for row in csv_reader)
 
         # Replace original table with new one
         shutil.move(tmp_csv_name, self._file_path)
@@ -158,27 +243,49 @@ class CSVWriter(FileWriter):
         Args:
             catalog_doc: Catalog Item API JSON document.
         """
-        if not self._check_catalog_doc(catalog_doc):
+        if not self._check_catalog_doc(catalog_doc) or self._is_duplicate(catalog_doc):
             return
 
         row = self._extract_raw(catalog_doc)
         if row:
-            self._writerow(row)
-            self._wrote_count += 1
+            self._write_extracted(catalog_doc, row)
+
+    def _write_extracted(self, catalog_doc: Any, row: dict[str, Any]) -> None:
+        """Write down a `row` extracted from checked `catalog_doc`."""
+        self._writerow(self._join_row(row))
+        self._wrote_count += 1
+
+    def _join_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Represent multiple values of the extracted `row` cells with `_join_values`.
+
+        Note:
+            Extracted row could be shared by writers with different
+            representation (see `TeeWriter`), so it's never changed.
+        """
+        return {k: self._join_values(v) if isinstance(v, list) else v for k, v in row.items()}
 
     def _extract_raw(self, catalog_doc: Any) -> dict[str, Any]:
         """Extract data from Catalog Item API JSON document.
 
+        Note:
+            Needed fields are read right out of the raw document, it gets validated
+            with `CatalogItem` only if some of the fields are malformed or missing.
+            Multiple values of a single cell are kept as lists (see `_join_row`).
+
         Args:
             catalog_doc: Catalog Item API JSON document.
 
         Returns:
             Dictionary for CSV row.
         """
-        data: dict[str, Any] = {k: None for k in self._data_mapping.keys()}
-
         item = catalog_doc['result']['items'][0]
 
+        try:
+            return self._extract_item(item)
+        except _MalformedItem:
+            pass
+
+        # Let pydantic coerce malformed fields or report about them
         try:
             catalog_item = CatalogItem(**item)
         except ValidationError as e:
@@ -195,109 +302,132 @@ class CSVWriter(FileWriter):
 
             return {}
 
-        # Name, description
-        if catalog_item.name_ex:
-            data['name'] = catalog_item.name_ex.primary
-            data['description'] = catalog_item.name_ex.extension
-        elif catalog_item.name:
-            data['name'] = catalog_item.name
-        elif catalog_item.type in self._type_names:
-            data['name'] = self._type_names[catalog_item.type]
+        return self._extract_item({**catalog_item.dict(by_alias=True), 'change_type': item.get('change_type')})
+
+    def _extract_item(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Extract data from raw catalog item.
+
+        Args:
+            item: Raw catalog item.
+
+        Returns:
+            Dictionary for CSV row.
+
+        Raises:
+            _MalformedItem: Some of the needed or `CatalogItem` required fields are malformed.
+        """
+        data: dict[str, Any] = {}
+
+        # Required by `CatalogItem`, though not written
+        _get(item, 'locale', str, required=True)
+        org = _get(item, 'org', dict)
+        if org:
+            _get(org, 'id', str, required=True)
+            _get(org, 'name', str, required=True)
+            _get(org, 'branch_count', int, required=True)
+
+        # Change type (see `DiffWriter`)
+        data['change_type'] = _get(item, 'change_type', str)
 
         # Type
-        data['type'] = catalog_item.type
+        item_type = _get(item, 'type', str, required=True)
+        data['type'] = item_type
+
+        # Name, description
+        name_ex = _get(item, 'name_ex', dict)
+        name = _get(item, 'name', str)
+        if name_ex:
+            data['name'] = _get(name_ex, 'primary', str, required=True)
+            data['description'] = _get(name_ex, 'extension', str)
+        elif name:
+            data['name'] = name
+        elif item_type in self._type_names:
+            data['name'] = self._type_names[item_type]
 
         # Address
-        data['address'] = catalog_item.address_name
+        data['address'] = _get(item, 'address_name', str)
 
         # Reviews
-        if catalog_item.reviews:
-            data['general_rating'] = catalog_item.reviews.general_rating
-            data['general_review_count'] = catalog_item.reviews.general_review_count
+        reviews = _get(item, 'reviews', dict)
+        if reviews:
+            data['general_rating'] = _get_float(reviews, 'general_rating')
+            data['general_review_count'] = _get(reviews, 'general_review_count', int)
 
         # Point location
-        if catalog_item.point:
-            data['point_lat'] = catalog_item.point.lat  # Latitude (широта)
-            data['point_lon'] = catalog_item.point.lon  # Longitude (долгота)
+        point = _get(item, 'point', dict)
+        if point:
+            data['point_lat'] = _get_float(point, 'lat', required=True)  # Latitude (широта)
+            data['point_lon'] = _get_float(point, 'lon', required=True)  # Longitude (долгота)
 
         # Address comment
-        data['address_comment'] = catalog_item.address_comment
+        data['address_comment'] = _get(item, 'address_comment', str)
 
         # Post code
-        if catalog_item.address:
-            data['postcode'] = catalog_item.address.postcode
+        address = _get(item, 'address', dict)
+        if address:
+            data['postcode'] = _get(address, 'postcode', str)
 
         # Timezone
-        if catalog_item.timezone is not None:
-            data['timezone'] = catalog_item.timezone
+        data['timezone'] = timezone_str(_get(item, 'timezone_offset', int))
 
         # Administrative location details
-        for div in catalog_item.adm_div:
-            for t in ('country', 'region', 'district_area', 'city', 'district', 'living_area'):
-                if div.type == t:
-                    data[t] = div.name
+        for div in _get(item, 'adm_div', list) or []:
+            div_type = _get(div, 'type', str, required=True)
+            div_name = _get(div, 'name', str, required=True)
+            if div_type in ('country', 'region', 'district_area', 'city', 'district', 'living_area'):
+                data[div_type] = div_name
 
         # Item URL
-        data['url'] = catalog_item.url
+        data['url'] = firm_url(_get(item, 'id', str, required=True))
 
         # Contacts
-        for contact_group in catalog_item.contact_groups:
-            def append_contact(contact_type: str, priority_fields: list[str],
-                               formatter: Callable[[str], str] | None = None) -> None:
-                """Add contact to `data`.
-
-                Args:
-                    contact_type: Contact type (see `Contact` in `catalog_item.py`)
-                    priority_fields: Field of contact to be added, sorted by priority
-                    formatter: Field value formatter
-                """
-                contacts = [x for x in contact_group.contacts if x.type == contact_type]
-                for i, contact in enumerate(contacts, 1):
-                    contact_value = None
-
-                    for field in priority_fields:
-                        if hasattr(contact, field):
-                            contact_value = getattr(contact, field)
-                            break
+        columns_per_entity = self._options.csv.columns_per_entity
+        for contact_group in _get(item, 'contact_groups', list) or []:
+            # Group contacts by type in a single pass
+            grouped_contacts: dict[str, list[dict[str, Any]]] = {}
+            for contact in _get(contact_group, 'contacts', list, required=True):
+                contact_type = _get(contact, 'type', str, required=True)
+                _get(contact, 'value', str, required=True)
+                if contact_type in _CONTACTS_PLAN:
+                    grouped_contacts.setdefault(contact_type, []).append(contact)
+
+            for contact_type, contacts in grouped_contacts.items():
+                priority_fields, formatter = _CONTACTS_PLAN[contact_type]
+                for i, contact in enumerate(contacts[:columns_per_entity], 1):
+                    contact_value = next(filter(None, (_get(contact, x, str) for x in priority_fields)), None)
 
                     # Empty contact value, bail
                     if not contact_value:
-                        return
+                        break
 
-                    data_name = f'{contact_type}_{i}'
-                    if data_name in data:
-                        data[data_name] = formatter(contact_value) if formatter else contact_value
+                    if formatter:
+                        contact_value = formatter(contact_value)
 
-                        # Add comment on demand
-                        if self._options.csv.add_comments and contact.comment:
-                            data[data_name] += ' (%s)' % contact.comment
+                    # Add comment on demand
+                    contact_comment = _get(contact, 'comment', str)
+                    if self._options.csv.add_comments and contact_comment:
+                        contact_value += ' (%s)' % contact_comment
 
-            # URLs
-            for t in ['website', 'vkontakte', 'whatsapp', 'viber', 'telegram',
-                      'instagram', 'facebook', 'twitter', 'youtube', 'skype']:
-                append_contact(t, ['url'])
-
-            # Remove arguments from WhatsApp URL
-            for field in data:
-                if field.startswith('whatsapp') and data[field]:
-                    data[field] = data[field].split('?')[0]
-
-            # Values
-            for t in ['email', 'skype']:
-                append_contact(t, ['value'])
-
-            # Phone (`value` sometimes has strange crap inside, so we better parse `text`.
-            # If no `text` field in contact - use `value` attribute)
-            append_contact('phone', ['text', 'value'],
-                           formatter=lambda x: re.sub(r'^\+7', '8', re.sub(r'[^0-9+]', '', x)))
+                    data[f'{contact_type}_{i}'] = contact_value
 
         # Schedule
-        if catalog_item.schedule:
-            data['schedule'] = catalog_item.schedule.to_str(self._options.csv.join_char,
-                                                            self._options.csv.add_comments)
+        schedule = _get(item, 'schedule', dict)
+        if schedule:
+            try:
+                data['schedule'] = schedule_str(schedule, self._options.csv.join_char,
+                                                self._options.csv.add_comments)
+            except (KeyError, TypeError):
+                raise _MalformedItem('schedule')
 
         # Rubrics
+        rubric_names = []
+        for rubric in _get(item, 'rubrics', list) or []:
+            _get(rubric, 'id', str, required=True)
+            _get(rubric, 'kind', str, required=True)
+            _get(rubric, 'short_id', int, required=True)
+            rubric_names.append(_get(rubric, 'name', str, required=True))
+
         if self._options.csv.add_rubrics:
-            data['rubrics'] = self._options.csv.join_char.join(x.name for x in catalog_item.rubrics)
+            data['rubrics'] = rubric_names
 
         return data
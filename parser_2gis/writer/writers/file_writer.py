@@ -1,27 +1,102 @@
 from __future__ import annotations
 
+import io
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any, IO
 
 from ...logger import logger
+from ..compression import open_compressed, path_compression
+from ..id_set import IdSet
 
 if TYPE_CHECKING:
     from ..options import WriterOptions
 
+# Output path that stands for `stdout`
+STDOUT_PATH = '-'
+
+_STDOUT_FD = 1
+
+
+class _StdoutStream(io.TextIOWrapper):
+    """Line buffered text stream over `stdout` descriptor, so every written record
+    reaches the reader of the pipe at once. Descriptor is kept open on close.
+    Once the reader is gone (`head`, etc.) further output gets discarded."""
+    def __init__(self, encoding: str) -> None:
+        super().__init__(open(_STDOUT_FD, 'wb', closefd=False), encoding=encoding,
+                         newline='', errors='replace', line_buffering=True)
+        self._pipe_closed = False
+
+    def _on_broken_pipe(self) -> None:
+        if not self._pipe_closed:
+            self._pipe_closed = True
+            logger.warning('Поток вывода закрыт получателем, дальнейшие записи отброшены.')
+
+    def write(self, s: str) -> int:
+        if not self._pipe_closed:
+            try:
+                return super().write(s)
+            except BrokenPipeError:
+                self._on_broken_pipe()
+        return len(s)
+
+    def flush(self) -> None:
+        if not self._pipe_closed:
+            try:
+                super().flush()
+            except BrokenPipeError:
+                self._on_broken_pipe()
+
+    def close(self) -> None:
+        try:
+            super().close()
+        except BrokenPipeError:
+            # Data left in the buffer can't be written, stream gets closed anyway
+            self._on_broken_pipe()
+
 
 class FileWriter(ABC):
     """Base writer."""
     def __init__(self, file_path: str, writer_options: WriterOptions) -> None:
         self._file_path = file_path
         self._options = writer_options
+        self._written_ids = IdSet()
+        self._wrote_count = 0  # Number of written items
 
     @abstractmethod
     def write(self, catalog_doc: Any) -> None:
         """Write Catalog Item API JSON document retrieved by parser."""
         pass
 
-    def _open_file(self, file_path: str, mode: str = 'r') -> IO[Any]:
-        return open(file_path, mode, encoding=self._options.encoding,
+    @property
+    def _encoding(self) -> str:
+        """Encoding of output file."""
+        return self._options.encoding
+
+    def _open_file(self, file_path: str, mode: str = 'r', buffering: int = -1) -> IO[Any]:
+        """Open text file, compressed one is streamed through
+        the codec chosen by its extension (`.gz`, `.zst`).
+        `STDOUT_PATH` opened for writing is `stdout`.
+
+        Args:
+            file_path: Path to the file.
+            mode: `r`, `w` or `a`.
+            buffering: Buffering of the file.
+
+        Returns:
+            Text stream.
+        """
+        if file_path == STDOUT_PATH and mode != 'r':
+            # BOM is of no use in a pipe
+            encoding = self._encoding
+            return _StdoutStream('utf-8' if encoding.lower() == 'utf-8-sig' else encoding)
+
+        compression = path_compression(file_path)
+        if compression:
+            return open_compressed(file_path, mode, compression, self._options.compression_level,
+                                   buffering=buffering, encoding=self._encoding,
+                                   newline='', errors='replace')
+
+        return open(file_path, mode, buffering=buffering, encoding=self._encoding,
                     newline='', errors='replace')
 
     def _check_catalog_doc(self, catalog_doc: Any, verbose: bool = True) -> bool:
@@ -64,6 +139,35 @@ class FileWriter(ABC):
                 logger.error('Сервер ответил неизвестным документом.')
             return False
 
+    def _report_item(self, item: Any) -> None:
+        """Echo name of the item being written, `_wrote_count` is its number."""
+        if self._options.verbose:
+            try:
+                name = item['name_ex']['primary']
+            except KeyError:
+                name = '...'
+
+            logger.info('Парсинг [%d] > %s', self._wrote_count + 1, name)
+
+    def _is_duplicate(self, catalog_doc: Any) -> bool:
+        """Check whether organization of Catalog Item API JSON document
+        has already been written, if duplicates removal is enabled.
+
+        Args:
+            catalog_doc: Checked Catalog Item API JSON document.
+
+        Returns:
+            `True` if organization has already been written.
+        """
+        if not self._options.csv.remove_duplicates:
+            return False
+
+        item_id = catalog_doc['result']['items'][0].get('id')
+        if not isinstance(item_id, str):
+            return False
+
+        return not self._written_ids.add(item_id)
+
     def __enter__(self) -> FileWriter:
         self._file = self._open_file(self._file_path, 'w')
         return self
@@ -4,7 +4,6 @@ import json
 import os
 from typing import Any
 
-from ...logger import logger
 from .file_writer import FileWriter
 
 
@@ -25,14 +24,7 @@ class JSONWriter(FileWriter):
     def _writedoc(self, catalog_doc: Any) -> None:
         """Write a `catalog_doc` into JSON document."""
         item = catalog_doc['result']['items'][0]
-
-        if self._options.verbose:
-            try:
-                name = item['name_ex']['primary']
-            except KeyError:
-                name = '...'
-
-            logger.info('Парсинг [%d] > %s', self._wrote_count + 1, name)
+        self._report_item(item)
 
         if self._wrote_count > 0:
             self._file.write(',')
@@ -47,7 +39,7 @@ class JSONWriter(FileWriter):
         Args:
             catalog_doc: Catalog Item API JSON document.
         """
-        if not self._check_catalog_doc(catalog_doc):
+        if not self._check_catalog_doc(catalog_doc) or self._is_duplicate(catalog_doc):
             return
 
         self._writedoc(catalog_doc)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+from ...logger import logger
+from .file_writer import STDOUT_PATH
+from .json_writer import JSONWriter
+
+
+class JSONLWriter(JSONWriter):
+    """Writer to JSON Lines file: one item per line.
+
+    Every line is a valid document on its own, so the file
+    could be read while it's being written and stays readable
+    if parser gets interrupted.
+    """
+    @property
+    def _encoding(self) -> str:
+        # BOM is not allowed in JSON Lines and would get duplicated on append
+        return 'utf-8' if self._options.encoding.lower() == 'utf-8-sig' else self._options.encoding
+
+    def __enter__(self) -> JSONLWriter:
+        if self._options.jsonl.append and self._file_path != STDOUT_PATH and os.path.isfile(self._file_path):
+            self._load_written_ids()
+            self._file = self._open_file(self._file_path, 'a')
+        else:
+            self._file = self._open_file(self._file_path, 'w')
+
+        self._wrote_count = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._flush()
+        self._file.close()
+
+    def _load_written_ids(self) -> None:
+        """Remember organizations of the file being appended, so they don't get duplicated."""
+        if not self._options.csv.remove_duplicates:
+            return
+
+        with self._open_file(self._file_path, 'r') as f:
+            for line in f:
+                try:
+                    item_id = json.loads(line).get('id')
+                except (json.JSONDecodeError, AttributeError):
+                    continue  # Broken line of interrupted run
+
+                if isinstance(item_id, str):
+                    self._written_ids.add(item_id)
+
+        logger.info('Дозапись в файл %s, записей в файле: %d.', self._file_path, len(self._written_ids))
+
+    def _flush(self) -> None:
+        """Flush written lines, sync them to disk on demand."""
+        self._file.flush()
+        if self._options.jsonl.fsync and self._file_path != STDOUT_PATH:
+            os.fsync(self._file.fileno())
+
+    def _writedoc(self, catalog_doc: Any) -> None:
+        """Write a `catalog_doc` into JSON Lines file."""
+        item = catalog_doc['result']['items'][0]
+        self._report_item(item)
+
+        self._file.write(json.dumps(item, ensure_ascii=False) + '\n')
+        self._wrote_count += 1
+
+        if self._wrote_count % self._options.jsonl.flush_every == 0:
+            self._flush()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import functools
+from typing import Any
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_ENABLED = True
+except ImportError:
+    PARQUET_ENABLED = False
+
+from ...logger import logger
+from .csv_writer import CSVWriter
+
+
+class ParquetWriter(CSVWriter):
+    """Writer to Parquet file.
+
+    Columns and extraction are the same as for CSV table, but values are typed:
+    coordinates and rating are floats, number of reviews is an integer,
+    rubrics and complex columns (phone_1, phone_2, ...) are collapsed into
+    lists of strings. Rows are buffered and written down by row groups.
+
+    Note:
+        Requires `pyarrow` package (`pip install parser-2gis[parquet]`).
+    """
+    @functools.cached_property
+    def _schema(self) -> pa.Schema:
+        """Parquet schema following the column plan."""
+        column_types = {
+            'rubrics': pa.list_(pa.string()),
+            'general_rating': pa.float64(),
+            'general_review_count': pa.int64(),
+            'point_lat': pa.float64(),
+            'point_lon': pa.float64(),
+            **{x: pa.list_(pa.string()) for x in self._complex_mapping.keys()},
+        }
+
+        fields = []
+        for column in self._columns:
+            # Complex columns collapsed into one list column
+            name, _, number = column.rpartition('_')
+            if name in self._complex_mapping:
+                if number == '1':
+                    fields.append(pa.field(name, column_types[name]))
+                continue
+
+            fields.append(pa.field(column, column_types.get(column, pa.string())))
+
+        return pa.schema(fields)
+
+    def _join_values(self, values: list[str]) -> Any:
+        return values
+
+    def __enter__(self) -> ParquetWriter:
+        self._parquet_writer = pq.ParquetWriter(self._file_path, self._schema,
+                                                compression=self._options.parquet.compression)
+        self._buffer: dict[str, list[Any]] = {x: [] for x in self._schema.names}
+
+        # Row keys of every Parquet column, list columns take several keys
+        columns_per_entity = self._options.csv.columns_per_entity
+        self._row_plan = [(self._buffer[x], tuple(f'{x}_{n}' for n in range(1, columns_per_entity + 1))
+                           if x in self._complex_mapping else x) for x in self._schema.names]
+        self._buffered_count = 0
+        self._wrote_count = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._write_row_group()
+        self._parquet_writer.close()
+
+    def _write_row_group(self) -> None:
+        """Write buffered rows down as a row group."""
+        if not self._buffered_count:
+            return
+
+        table = pa.Table.from_pydict(self._buffer, schema=self._schema)
+        self._parquet_writer.write_table(table)
+
+        for values in self._buffer.values():
+            values.clear()
+        self._buffered_count = 0
+
+    def _writerow(self, row: dict[str, Any]) -> None:
+        """Put a `row` into the row group buffer."""
+        if self._options.verbose:
+            logger.info('Парсинг [%d] > %s', self._wrote_count + 1, row.get('name'))
+
+        for values, keys in self._row_plan:
+            if isinstance(keys, tuple):
+                values.append([row[x] for x in keys if row.get(x)])
+            else:
+                values.append(row.get(keys))
+
+        self._buffered_count += 1
+        if self._buffered_count >= self._options.parquet.row_group_size:
+            self._write_row_group()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import os
+import re
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ...logger import logger
+from .file_writer import FileWriter
+
+if TYPE_CHECKING:
+    from ..options import WriterOptions
+
+# Search URL: https://2gis.<domain>/<city>/search/<rest>
+_SEARCH_URL_CITY_REGEX = re.compile(r'https?://2gis\.[^/]+/(?P<city>[^/]+)/search/')
+
+# Chars not allowed in file names on some of the platforms
+_PATH_JUNK_REGEX = re.compile(r'[\x00-\x1f\\/:*?"<>|]+')
+
+_UNKNOWN_PARTITION = 'unknown'
+
+
+def _path_component(name: Optional[str]) -> str:
+    """Make a safe file name out of `name`."""
+    name = _PATH_JUNK_REGEX.sub('_', name or '').strip(' .')[:100]
+    return name or _UNKNOWN_PARTITION
+
+
+def item_city(catalog_doc: Any) -> Optional[str]:
+    """City of Catalog Item API JSON document: city code of the search URL
+    the item has been collected by (e.g. `moscow`).
+
+    Note:
+        `adm_div` city of the item is never used, so items of the same city
+        don't get split between its code and its name.
+    """
+    url_match = _SEARCH_URL_CITY_REGEX.match(source_url(catalog_doc) or '')
+    return url_match.group('city') if url_match else None
+
+
+def item_rubric(catalog_doc: Any) -> Optional[str]:
+    """Primary rubric name of Catalog Item API JSON document."""
+    rubrics = [x for x in catalog_doc['result']['items'][0].get('rubrics') or [] if isinstance(x, dict)]
+    for rubric in sorted(rubrics, key=lambda x: x.get('kind') != 'primary'):
+        if rubric.get('name'):
+            return str(rubric['name'])
+
+    return None
+
+
+def source_url(catalog_doc: Any) -> Optional[str]:
+    """URL the Catalog Item API JSON document has been collected by, if known."""
+    meta = catalog_doc.get('meta')
+    url = meta.get('source_url') if isinstance(meta, dict) else None
+    return url if isinstance(url, str) else None
+
+
+class PartitionedWriter(FileWriter):
+    """Writer that routes every record into partition file
+    `<directory>/<city>/<partition>.<format>`, where city is the city code
+    of the search URL (see `item_city`) and partition is either
+    primary rubric of the item or hash of the URL it has been collected by
+    (see `WriterOptions.partition_by`).
+
+    Every partition is written by its own target writer. At most
+    `WriterOptions.partition_open_files` partitions are kept open,
+    least recently used one gets closed to open another. Partition
+    opened again gets written into a new part `<partition>-00002.<format>`,
+    so every file stays valid on its own.
+
+    Note:
+        Partitions share the same columns, so empty columns are never removed.
+
+    Args:
+        directory_path: Path to the output directory.
+        writer_options: Writer options.
+        file_format: Format of the partitions, used as their extension.
+        create_writer: Target writer factory, takes path to the partition and writer options.
+    """
+    def __init__(self, directory_path: str, writer_options: WriterOptions, file_format: str,
+                 create_writer: Callable[[str, WriterOptions], FileWriter]) -> None:
+        super().__init__(directory_path, writer_options)
+        self._file_format = file_format
+        self._create_writer = create_writer
+
+        # Partition writers are quiet, partitions have the same columns
+        self._partition_options = writer_options.copy(update={
+            'verbose': False,
+            'csv': writer_options.csv.copy(update={'remove_empty_columns': False}),
+        })
+
+    def __enter__(self) -> PartitionedWriter:
+        os.makedirs(self._file_path, exist_ok=True)
+        self._writers: collections.OrderedDict[tuple[str, str], FileWriter] = collections.OrderedDict()
+        self._parts: collections.Counter[tuple[str, str]] = collections.Counter()
+        self._wrote_count = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            while self._writers:
+                _, writer = self._writers.popitem(last=False)
+                writer.__exit__(*exc_info)
+        finally:
+            logger.info('Записано разделов: %d.', len(self._parts))
+
+    def _partition_key(self, catalog_doc: Any) -> tuple[str, str]:
+        """City and partition names of the document."""
+        if self._options.partition_by == 'url':
+            url = source_url(catalog_doc)
+            partition = hashlib.sha1(url.encode('utf-8')).hexdigest()[:12] if url else None
+        else:
+            partition = item_rubric(catalog_doc)
+
+        return _path_component(item_city(catalog_doc)), _path_component(partition)
+
+    def _get_partition_writer(self, key: tuple[str, str]) -> FileWriter:
+        """Get writer of the partition, open it if it's closed."""
+        writer = self._writers.get(key)
+        if writer is not None:
+            self._writers.move_to_end(key)
+            return writer
+
+        # Close least recently used partition
+        if len(self._writers) >= self._options.partition_open_files:
+            _, lru_writer = self._writers.popitem(last=False)
+            lru_writer.__exit__(None, None, None)
+
+        city, partition = key
+        self._parts[key] += 1
+        if self._parts[key] > 1:
+            partition += f'-{self._parts[key]:05d}'
+
+        os.makedirs(os.path.join(self._file_path, city), exist_ok=True)
+        path = os.path.join(self._file_path, city, f'{partition}.{self._file_format}')
+        writer = self._create_writer(path, self._partition_options)
+        writer.__enter__()
+
+        self._writers[key] = writer
+        return writer
+
+    def write(self, catalog_doc: Any) -> None:
+        """Write Catalog Item API JSON document down to its partition.
+
+        Args:
+            catalog_doc: Catalog Item API JSON document.
+        """
+        if not self._check_catalog_doc(catalog_doc) or self._is_duplicate(catalog_doc):
+            return
+
+        writer = self._get_partition_writer(self._partition_key(catalog_doc))
+        writer.write(catalog_doc)
+
+        self._report_item(catalog_doc['result']['items'][0])
+        self._wrote_count += 1
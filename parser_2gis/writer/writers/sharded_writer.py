@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ...logger import logger
+from ..compression import split_compression_ext
+from .file_writer import FileWriter
+
+if TYPE_CHECKING:
+    from ..options import WriterOptions
+
+_CHECKSUM_BUFFER_SIZE = 1024 * 1024
+
+
+def shard_path(file_path: str, number: int) -> str:
+    """Path to the numbered shard: `result.csv.gz` -> `result-00001.csv.gz`."""
+    file_path, compression_ext = split_compression_ext(file_path)
+    root, ext = os.path.splitext(file_path)
+    return f'{root}-{number:05d}{ext}{compression_ext}'
+
+
+def manifest_path(file_path: str) -> str:
+    """Path to the shards manifest: `result.csv.gz` -> `result.csv.manifest.json`."""
+    file_path, _ = split_compression_ext(file_path)
+    return file_path + '.manifest.json'
+
+
+def file_checksum(file_path: str) -> str:
+    """SHA-256 hex digest of the file."""
+    checksum = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHECKSUM_BUFFER_SIZE), b''):
+            checksum.update(chunk)
+
+    return checksum.hexdigest()
+
+
+class ShardedWriter(FileWriter):
+    """Writer that rotates output into numbered shards
+    after `WriterOptions.shard_records` records or `WriterOptions.shard_bytes` bytes.
+
+    Every shard is written by its own target writer, so it's a valid file on its own
+    (CSV header, closed JSON array, etc.). Manifest with names, records count, sizes
+    and SHA-256 checksums of the shards is written next to them on exit.
+
+    Note:
+        Shards share the same columns, so empty columns are never removed.
+        Size is checked against flushed data of the shard, so shard could
+        exceed the limit by the size of writer's buffer. XLSX and Parquet
+        get flushed on close only, their shards are rotated by records.
+
+    Args:
+        file_path: Path to the result file, shard number is added to it.
+        writer_options: Writer options.
+        create_writer: Target writer factory, takes path to the shard and writer options.
+    """
+    def __init__(self, file_path: str, writer_options: WriterOptions,
+                 create_writer: Callable[[str, WriterOptions], FileWriter]) -> None:
+        super().__init__(file_path, writer_options)
+        self._create_writer = create_writer
+
+        # Shard writers are quiet, shards have the same columns
+        self._shard_options = writer_options.copy(update={
+            'verbose': False,
+            'csv': writer_options.csv.copy(update={'remove_empty_columns': False}),
+        })
+
+    def __enter__(self) -> ShardedWriter:
+        self._shards: list[dict[str, Any]] = []
+        self._writer: Optional[FileWriter] = None
+        self._wrote_count = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            if self._writer is not None or not self._shards:
+                self._close_shard(*exc_info)
+        finally:
+            self._write_manifest()
+
+    def _open_shard(self) -> FileWriter:
+        """Open next shard."""
+        path = shard_path(self._file_path, len(self._shards) + 1)
+        self._writer = self._create_writer(path, self._shard_options)
+        self._writer.__enter__()
+        self._shards.append({'name': os.path.basename(path), 'path': path})
+        return self._writer
+
+    def _close_shard(self, *exc_info) -> None:
+        """Close current shard (open an empty one if nothing's been written)
+        and take its records count, size and checksum."""
+        writer = self._writer or self._open_shard()
+        self._writer = None
+        writer.__exit__(*exc_info)
+
+        shard = self._shards[-1]
+        shard['records'] = getattr(writer, '_wrote_count', 0)
+        try:
+            shard['bytes'] = os.path.getsize(shard['path'])
+            shard['sha256'] = file_checksum(shard['path'])
+        except OSError as e:
+            logger.error('Ошибка во время подсчёта контрольной суммы: %s', e)
+
+        logger.info('Записан файл %s, записей: %d.', shard['name'], shard['records'])
+
+    def _shard_is_full(self, writer: FileWriter) -> bool:
+        """Whether current shard has reached records or size limit."""
+        shard_records = self._options.shard_records
+        if shard_records and getattr(writer, '_wrote_count', 0) >= shard_records:
+            return True
+
+        shard_bytes = self._options.shard_bytes
+        if shard_bytes:
+            try:
+                return os.path.getsize(self._shards[-1]['path']) >= shard_bytes
+            except OSError:
+                pass
+
+        return False
+
+    def _write_manifest(self) -> None:
+        """Write manifest of written shards."""
+        manifest = {
+            'records': sum(x.get('records', 0) for x in self._shards),
+            'shards': [{k: v for k, v in x.items() if k != 'path'} for x in self._shards],
+        }
+
+        try:
+            with open(manifest_path(self._file_path), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=4)
+        except OSError as e:
+            logger.error('Ошибка во время записи манифеста: %s', e)
+
+    def write(self, catalog_doc: Any) -> None:
+        """Write Catalog Item API JSON document down to the current shard,
+        rotate the shard once it's full.
+
+        Args:
+            catalog_doc: Catalog Item API JSON document.
+        """
+        if not self._check_catalog_doc(catalog_doc) or self._is_duplicate(catalog_doc):
+            return
+
+        writer = self._writer or self._open_shard()
+        writer.write(catalog_doc)
+
+        self._report_item(catalog_doc['result']['items'][0])
+        self._wrote_count += 1
+
+        if self._shard_is_full(writer):
+            self._close_shard(None, None, None)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import functools
+import json
+import sqlite3
+from typing import Any
+
+from ...logger import logger
+from .csv_writer import CSVWriter
+
+
+class SQLiteWriter(CSVWriter):
+    """Writer to SQLite database.
+
+    Records are upserted into `items` table by organization id, so the same
+    database could be refreshed by recurring runs: rows get updated
+    (along with `updated_at`) only if raw item has changed.
+
+    Columns and extraction are the same as for CSV table, raw item JSON
+    is kept in `raw` column. Records are inserted by batches, every batch
+    is committed, so results could be queried while parser is running.
+    """
+    @functools.cached_property
+    def _column_types(self) -> dict[str, str]:
+        """SQL types of table columns."""
+        return {
+            'id': 'TEXT PRIMARY KEY',
+            **{x: 'TEXT' for x in self._columns},
+            'general_rating': 'REAL',
+            'general_review_count': 'INTEGER',
+            'point_lat': 'REAL',
+            'point_lon': 'REAL',
+            'raw': 'TEXT',
+            'updated_at': 'TEXT',
+        }
+
+    def _create_table(self) -> None:
+        """Create `items` table and its indexes, add columns missing in existing table."""
+        column_types = self._column_types
+        self._connection.execute('CREATE TABLE IF NOT EXISTS items (%s)' %
+                                 ', '.join(f'{k} {v}' for k, v in column_types.items()))
+
+        # Column plan could have been changed (e.g. `columns_per_entity`)
+        existing_columns = {x[1] for x in self._connection.execute('PRAGMA table_info(items)')}
+        for column, column_type in column_types.items():
+            if column not in existing_columns:
+                self._connection.execute(f'ALTER TABLE items ADD COLUMN {column} {column_type}')
+
+        for column in ('city', 'rubrics', 'updated_at'):
+            if column in column_types:
+                self._connection.execute(f'CREATE INDEX IF NOT EXISTS items_{column} ON items ({column})')
+
+        self._connection.commit()
+
+    @functools.cached_property
+    def _upsert_query(self) -> str:
+        """Insert new record or update existing one if its raw item has changed."""
+        columns = ['id', *self._columns, 'raw']
+        updates = ', '.join(f'{x} = excluded.{x}' for x in columns[1:])
+        return (f'INSERT INTO items ({", ".join(columns)}, updated_at) '
+                f'VALUES ({", ".join("?" * len(columns))}, CURRENT_TIMESTAMP) '
+                f'ON CONFLICT (id) DO UPDATE SET {updates}, updated_at = excluded.updated_at '
+                f'WHERE items.raw IS NOT excluded.raw')
+
+    def __enter__(self) -> SQLiteWriter:
+        # Writer could be used by another thread (see `AsyncWriter`), never concurrently though
+        self._connection = sqlite3.connect(self._file_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._create_table()
+
+        self._batch: list[list[Any]] = []
+        self._wrote_count = 0
+        self._changed_count = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._write_batch()
+        self._connection.close()
+        logger.info('Добавлено или обновлено записей в базе данных: %d.', self._changed_count)
+
+    def _write_batch(self) -> None:
+        """Upsert batched records in a single transaction."""
+        if not self._batch:
+            return
+
+        try:
+            with self._connection:
+                total_changes = self._connection.total_changes
+                self._connection.executemany(self._upsert_query, self._batch)
+                self._changed_count += self._connection.total_changes - total_changes
+        except sqlite3.Error as e:
+            logger.error('Ошибка во время записи в базу данных: %s', e)
+
+        self._batch.clear()
+
+    def _write_extracted(self, catalog_doc: Any, row: dict[str, Any]) -> None:
+        """Write down a `row` extracted from checked `catalog_doc` along with raw item."""
+        item = catalog_doc['result']['items'][0]
+        self._writerow({**self._join_row(row), 'id': item['id'].split('_')[0],
+                        'raw': json.dumps(item, ensure_ascii=False, sort_keys=True)})
+        self._wrote_count += 1
+
+    def _writerow(self, row: dict[str, Any]) -> None:
+        """Put a `row` into the batch."""
+        if self._options.verbose:
+            logger.info('Парсинг [%d] > %s', self._wrote_count + 1, row.get('name'))
+
+        self._batch.append([row['id'], *map(row.get, self._columns), row['raw']])
+        if len(self._batch) >= self._options.sqlite.batch_size:
+            self._write_batch()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import contextlib
+from typing import TYPE_CHECKING, Any
+
+from .csv_writer import CSVWriter
+from .file_writer import FileWriter
+from .json_writer import JSONWriter
+
+if TYPE_CHECKING:
+    from ..options import WriterOptions
+
+
+class TeeWriter(FileWriter):
+    """Composite writer that fans every document out to several writers,
+    so a single parsing run produces several outputs.
+
+    Document check, duplicates removal and row extraction (for table formats)
+    are done once for all of the writers. Target writers are expected
+    to be quiet (`verbose` disabled), composite writer reports written items itself.
+
+    Args:
+        writers: Target file writers.
+        writer_options: Writer options.
+    """
+    def __init__(self, writers: list[FileWriter], writer_options: WriterOptions) -> None:
+        super().__init__(writers[0]._file_path, writer_options)
+        self._writers = writers
+
+    def __enter__(self) -> TeeWriter:
+        with contextlib.ExitStack() as stack:
+            for writer in self._writers:
+                stack.enter_context(writer)
+            self._exit_stack = stack.pop_all()
+
+        self._wrote_count = 0
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._exit_stack.__exit__(*exc_info)
+
+    def write(self, catalog_doc: Any) -> None:
+        """Write Catalog Item API JSON document down with every target writer.
+
+        Args:
+            catalog_doc: Catalog Item API JSON document.
+        """
+        if not self._check_catalog_doc(catalog_doc) or self._is_duplicate(catalog_doc):
+            return
+
+        row: dict[str, Any] | None = None
+        for writer in self._writers:
+            if isinstance(writer, CSVWriter):
+                if row is None:
+                    row = writer._extract_raw(catalog_doc)
+                if row:
+                    writer._write_extracted(catalog_doc, row)
+            elif isinstance(writer, JSONWriter):
+                writer._writedoc(catalog_doc)
+            else:
+                writer.write(catalog_doc)
+
+        self._report_item(catalog_doc['result']['items'][0])
+        self._wrote_count += 1
@@ -1,34 +1,48 @@
 from __future__ import annotations
 
-import csv
-import os
-import shutil
+from typing import Any
 
 from xlsxwriter.workbook import Workbook
 
+from ...logger import logger
 from .csv_writer import CSVWriter
 
 
 class XLSXWriter(CSVWriter):
-    """Writer (post-process converter) to XLSX table."""
+    """Writer to XLSX table.
+
+    Rows are streamed right into the worksheet in `constant_memory` mode,
+    columns and extraction are the same as for CSV table.
+
+    Note:
+        Rows can't be altered once written, so empty columns
+        get hidden instead of being removed.
+    """
+    def __enter__(self) -> XLSXWriter:
+        self._workbook = Workbook(self._file_path, {'constant_memory': True})
+        self._worksheet = self._workbook.add_worksheet()
+
+        bold = self._workbook.add_format({'bold': True})  # Add header format
+        self._worksheet.write_row(0, 0, list(self._data_mapping.values()), bold)  # Write header
+
+        self._wrote_count = 0
+        self._filled_columns: set[str] = set()
+        return self
 
     def __exit__(self, *exc_info) -> None:
-        super().__exit__(*exc_info)
-
-        # Convert csv to xlsx table
-        tmp_xlx_name = os.path.splitext(self._file_path)[0] + '.converted.xlsx'
-        with Workbook(tmp_xlx_name) as workbook:
-            bold = workbook.add_format({'bold': True})  # Add header format
-
-            worksheet = workbook.add_worksheet()
-            with self._open_file(self._file_path, 'r') as f_csv:
-                csv_reader = csv.reader(f_csv)
-                for r, row in enumerate(csv_reader):
-                    for c, col in enumerate(row):
-                        if r == 0:
-                            worksheet.write(r, c, col, bold)  # Write header
-                        else:
-                            worksheet.write(r, c, col)
-
-        # Replace original table with new one
-        shutil.move(tmp_xlx_name, self._file_path)
+        if self._options.csv.remove_empty_columns:
+            logger.info('Скрытие пустых колонок XLSX.')
+            self._hide_empty_columns()
+
+        self._workbook.close()
+
+    def _hide_empty_columns(self) -> None:
+        """Hide empty complex columns."""
+        non_empty_mapping = self._non_empty_mapping()
+        for i, column in enumerate(self._columns):
+            if column not in non_empty_mapping:
+                self._worksheet.set_column(i, i, None, None, {'hidden': True})
+
+    def _write_values(self, values: list[Any]) -> None:
+        """Write row values ordered by column plan."""
+        self._worksheet.write_row(self._wrote_count + 1, 0, values)
@@ -107,6 +107,12 @@ if __name__ == '__main__':
             'gui': [
                 'PySimpleGUI==4.59.0',
             ],
+            'parquet': [
+                'pyarrow>=8.0.0',
+            ],
+            'zstd': [
+                'zstandard>=0.18.0',
+            ],
             'dev': (
                 (
                     ["pyinstaller>=5.0,<5.7.0"]
@@ -0,0 +1,68 @@
+from parser_2gis.parser import (generate_urls, leaf_rubrics, load_cities, normalize_url,
+                                select_cities, split_city_url,
+                                split_rubric_url, split_url, url_tile)
+
+
+def test_split_url():
+    """Split search URL into map viewport quarters and check they cover the parent viewport."""
+    url = 'https://2gis.ru/moscow/search/Аптеки?m=37.62%2C55.75%2F11'
+    parent_tile = url_tile(url)
+    assert parent_tile and parent_tile.zoom == 11
+
+    tile_urls = split_url(url, 1280, 720, max_zoom=18)
+    assert len(tile_urls) == 4
+
+    tiles = [url_tile(x) for x in tile_urls]
+    assert all(x and x.zoom == 12 for x in tiles)
+    assert min(x.lon for x in tiles) < parent_tile.lon < max(x.lon for x in tiles)
+    assert min(x.lat for x in tiles) < parent_tile.lat < max(x.lat for x in tiles)
+
+    # Max zoom reached or no viewport in URL
+    assert split_url(url, 1280, 720, max_zoom=11) == []
+    assert split_url('https://2gis.ru/moscow/search/Аптеки', 1280, 720, max_zoom=18) == []
+
+
+def test_split_rubric_url():
+    """Expand parent rubric URL into URLs of its leaf rubrics."""
+    url = 'https://2gis.ru/moscow/search/Медицина/rubricId/5/page/3'
+    leaf_codes = [x['code'] for x in leaf_rubrics('5')]
+
+    rubric_urls = split_rubric_url(url)
+    assert len(rubric_urls) == len(leaf_codes) > 1
+    assert all(x.endswith(f'/rubricId/{code}') for x, code in zip(rubric_urls, leaf_codes))
+    assert not any('/page/' in x for x in rubric_urls)
+
+    # Leaf rubric could not be expanded
+    assert split_rubric_url(rubric_urls[0]) == []
+
+    # Rubric tree is picked by the city's country the same way URLs get generated
+    kyzylorda_url = 'https://2gis.ru/kyzylorda/search/Медицина/rubricId/5'
+    generated_urls = generate_urls(select_cities(['kyzylorda']), rubric_codes=['5'], expand_rubrics=True)
+    generated_codes = [url.split('/rubricId/')[1].split('/')[0] for url, _ in generated_urls]
+    split_codes = [url.split('/rubricId/')[1] for url in split_rubric_url(kyzylorda_url)]
+    assert split_codes == generated_codes
+    assert len(generated_codes) == len(leaf_rubrics('5', is_russian=False)) < len(leaf_codes)
+
+
+def test_split_city_url():
+    """Fan out search URL to all cities of its country."""
+    city_urls = split_city_url('https://2gis.kz/almaty/search/Аптеки?m=76.9%2C43.2%2F11')
+    cities = [x for x in load_cities() if x['domain'] == 'kz']
+    assert len(city_urls) == len(cities) > 1
+    assert all(x.startswith('https://2gis.kz/') and x.endswith('/search/Аптеки') for x in city_urls)
+
+
+def test_generate_urls():
+    """Generate unique city × rubric URLs."""
+    cities = select_cities(['moscow', 'spb'])
+    assert sorted(x['code'] for x in cities) == ['moscow', 'spb']
+
+    # Duplicated rubric code gets deduplicated
+    urls = list(generate_urls(cities, rubric_codes=['5', '5', '116']))
+    assert len(urls) == 4
+    assert urls[0][0] == normalize_url(urls[0][0])
+    assert urls[0][1] > urls[1][1] == 1  # Parent rubric costs more than a leaf one
+
+    leaf_urls = list(generate_urls(cities, query='Аптеки', rubric_codes=['5'], expand_rubrics=True))
+    assert len(leaf_urls) == 2 * len(leaf_rubrics('5'))
+    assert all('/search/Аптеки/rubricId/' in url for url, _ in leaf_urls)
@@ -0,0 +1,475 @@
+import copy
+import csv
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import zipfile
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from parser_2gis.writer import (STDOUT_PATH, ArchiveWriter, AsyncWriter, CSVOptions, CSVWriter, IdSet,
+                                JSONLOptions, JSONLWriter, JSONWriter, SQLiteWriter, TeeWriter, WriterOptions,
+                                XLSXWriter, get_writer, read_archive, read_archive_chunk, read_archive_index)
+from parser_2gis.writer.exceptions import WriterFormatUnavailable
+
+
+def catalog_doc(firm_id='70000001000000001'):
+    """Catalog Item API JSON document of a made up organization."""
+    return {
+        'meta': {'code': 200},
+        'result': {'items': [{
+            'id': f'{firm_id}_hash',
+            'locale': 'ru_RU',
+            'type': 'branch',
+            'name_ex': {'primary': 'Аптека', 'extension': 'аптека'},
+            'address_name': 'Ленина, 1',
+            'adm_div': [{'type': 'city', 'name': 'Москва'}, {'type': 'country', 'name': 'Россия'}],
+            'point': {'lat': 55, 'lon': 37.6},
+            'reviews': {'general_rating': 4.5, 'general_review_count': 10},
+            'rubrics': [{'id': '1', 'kind': 'primary', 'name': 'Аптеки', 'short_id': 1}],
+            'timezone_offset': 180,
+            'contact_groups': [{'contacts': [
+                {'type': 'phone', 'value': '+74950000000', 'text': '+7 (495) 000-00-00', 'comment': 'справка'},
+                {'type': 'whatsapp', 'value': '7999', 'url': 'https://wa.me/7999?text=hi'},
+            ]}],
+            'schedule': {'Mon': {'working_hours': [{'from': '09:00', 'to': '21:00'}]}},
+        }]},
+    }
+
+
+def read_csv(file_path):
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_extraction():
+    """Fast extraction and extraction of validated `CatalogItem` produce the same row."""
+    writer = CSVWriter('', WriterOptions(verbose=False))
+    row = writer._extract_raw(catalog_doc())
+    assert row['name'] == 'Аптека'
+    assert row['point_lat'] == 55.0
+    assert row['phone_1'] == '84950000000 (справка)'
+    assert row['whatsapp_1'] == 'https://wa.me/7999'
+    assert row['schedule'] == 'Пн: 09:00-21:00'
+    assert row['timezone'] == '+03:00'
+    assert row['url'] == 'https://2gis.com/firm/70000001000000001'
+
+    # Malformed but coercible field goes through `CatalogItem`
+    coercible_doc = catalog_doc()
+    coercible_doc['result']['items'][0]['point']['lat'] = '55'
+    assert writer._extract_raw(coercible_doc) == row
+
+    # Invalid document is skipped
+    invalid_doc = copy.deepcopy(coercible_doc)
+    del invalid_doc['result']['items'][0]['rubrics'][0]['name']
+    assert writer._extract_raw(invalid_doc) == {}
+
+    # Field required by `CatalogItem` is missing, though not written
+    no_locale_doc = catalog_doc()
+    del no_locale_doc['result']['items'][0]['locale']
+    assert writer._extract_raw(no_locale_doc) == {}
+
+    # Phone is taken from `text` only
+    no_text_doc = catalog_doc()
+    del no_text_doc['result']['items'][0]['contact_groups'][0]['contacts'][0]['text']
+    assert writer._extract_raw(no_text_doc).get('phone_1') is None
+
+
+def test_csv_writer():
+    """Write CSV table and check its content."""
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, 'output.csv')
+        with CSVWriter(result_path, WriterOptions(verbose=False)) as writer:
+            writer.write(catalog_doc('1'))
+            writer.write(catalog_doc('2'))
+
+        rows = read_csv(result_path)
+        assert [x['2GIS URL'] for x in rows] == ['https://2gis.com/firm/1', 'https://2gis.com/firm/2']
+        assert rows[0]['Телефон'] == '84950000000 (справка)'
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet', 'sqlite'])
+def test_unnamed_item(file_format):
+    """Item without name gets written with an empty one."""
+    if file_format == 'parquet':
+        pq = pytest.importorskip('pyarrow.parquet')
+
+    unnamed_doc = {'meta': {'code': 200}, 'result': {'items': [{'id': '123_abc', 'locale': 'ru_RU', 'type': 'building'}]}}
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, f'output.{file_format}')
+        with get_writer(result_path, file_format, WriterOptions(verbose=True, async_write=False)) as writer:
+            writer.write(unnamed_doc)
+
+        if file_format == 'csv':
+            rows = [(x['Наименование'], x['Тип']) for x in read_csv(result_path)]
+            assert rows == [('', 'building')]
+        elif file_format == 'parquet':
+            table = pq.read_table(result_path)
+            assert list(zip(table.column('name').to_pylist(), table.column('type').to_pylist())) == [(None, 'building')]
+        else:
+            connection = sqlite3.connect(result_path)
+            assert connection.execute('SELECT id, name, type FROM items').fetchall() == [('123', None, 'building')]
+            connection.close()
+
+
+def test_xlsx_writer():
+    """Write XLSX table, empty columns get hidden."""
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, 'output.xlsx')
+        with XLSXWriter(result_path, WriterOptions(verbose=False)) as writer:
+            writer.write(catalog_doc('1'))
+            writer.write(catalog_doc('2'))
+
+        with zipfile.ZipFile(result_path) as xlsx:
+            sheet = xlsx.read('xl/worksheets/sheet1.xml').decode('utf-8')
+
+        assert '<row r="3"' in sheet
+        assert 'hidden="1"' in sheet
+
+
+def test_jsonl_writer():
+    """Write JSON Lines file, then append to it."""
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, 'output.jsonl')
+        with JSONLWriter(result_path, WriterOptions(verbose=False)) as writer:
+            writer.write(catalog_doc('1'))
+            writer.write(catalog_doc('2'))
+
+        append_options = WriterOptions(verbose=False, jsonl=JSONLOptions(append=True, flush_every=1))
+        with JSONLWriter(result_path, append_options) as writer:
+            writer.write(catalog_doc('2'))
+            writer.write(catalog_doc('3'))
+
+        with open(result_path, 'r', encoding='utf-8') as f:
+            items = [json.loads(x) for x in f]
+
+        assert [x['id'] for x in items] == ['1_hash', '2_hash', '3_hash']
+
+
+def test_parquet_writer():
+    """Write Parquet file by several row groups and check column types."""
+    pq = pytest.importorskip('pyarrow.parquet')
+    from parser_2gis.writer import ParquetOptions, ParquetWriter
+
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, 'output.parquet')
+        options = WriterOptions(verbose=False, parquet=ParquetOptions(row_group_size=2))
+        with ParquetWriter(result_path, options) as writer:
+            for firm_id in range(5):
+                writer.write(catalog_doc(str(firm_id)))
+
+        parquet_file = pq.ParquetFile(result_path)
+        assert parquet_file.metadata.num_row_groups == 3
+
+        table = parquet_file.read()
+        assert table.num_rows == 5
+        assert str(table.schema.field('point_lat').type) == 'double'
+        assert str(table.schema.field('general_review_count').type) == 'int64'
+        assert table.column('phone').to_pylist()[0] == ['84950000000 (справка)']
+        assert table.column('rubrics').to_pylist()[0] == ['Аптеки']
+
+
+def test_sqlite_writer():
+    """Upsert records into SQLite database, unchanged records stay untouched."""
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, 'output.sqlite')
+        with SQLiteWriter(result_path, WriterOptions(verbose=False)) as writer:
+            writer.write(catalog_doc('1'))
+            writer.write(catalog_doc('2'))
+
+        changed_doc = catalog_doc('2')
+        changed_doc['result']['items'][0]['name_ex']['primary'] = 'Аптека 2'
+        with SQLiteWriter(result_path, WriterOptions(verbose=False)) as writer:
+            writer.write(catalog_doc('1'))
+            writer.write(changed_doc)
+            writer.write(catalog_doc('3'))
+
+        assert writer._changed_count == 2
+
+        connection = sqlite3.connect(result_path)
+        rows = connection.execute('SELECT id, name, point_lat FROM items ORDER BY id').fetchall()
+        connection.close()
+        assert rows == [('1', 'Аптека', 55.0), ('2', 'Аптека 2', 55.0), ('3', 'Аптека', 55.0)]
+
+
+def test_async_writer_error():
+    """Error of the target writer stops writing and gets raised in the parser thread."""
+    class FailingWriter(JSONLWriter):
+        def write(self, catalog_doc):
+            raise OSError('No space left on device')
+
+    with TemporaryDirectory() as tmpdir:
+        options = WriterOptions(verbose=False)
+        writer = AsyncWriter(FailingWriter(os.path.join(tmpdir, 'output.jsonl'), options), options)
+        with pytest.raises(OSError):
+            with writer:
+                writer.write(catalog_doc('1'))
+
+        with pytest.raises(OSError):
+            with writer:
+                writer.write(catalog_doc('1'))
+                writer._thread.join(0.1)
+                writer.write(catalog_doc('2'))
+
+
+def test_id_set():
+    """Ids are compared by firm id, set grows without losing ids."""
+    id_set = IdSet(capacity=4)
+    assert all(id_set.add(f'{x}_hash') for x in range(10000))
+    assert len(id_set) == 10000
+    assert '9999_other_hash' in id_set
+    assert not id_set.add('0_other_hash')
+    assert 'not_numeric' not in id_set and id_set.add('not_numeric')
+
+
+def test_duplicates_removal():
+    """Organizations get written once in every format."""
+    with TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, 'output.csv')
+        json_path = os.path.join(tmpdir, 'output.json')
+        with CSVWriter(csv_path, WriterOptions(verbose=False)) as csv_writer, \
+                JSONWriter(json_path, WriterOptions(verbose=False)) as json_writer:
+            for firm_id in ('1', '2', '1'):
+                csv_writer.write(catalog_doc(firm_id))
+                json_writer.write(catalog_doc(firm_id))
+
+        assert len(read_csv(csv_path)) == 2
+        with open(json_path, 'r', encoding='utf-8-sig') as f:
+            assert len(json.load(f)) == 2
+
+
+def test_tee_writer():
+    """Several outputs are written by a single composite writer."""
+    with TemporaryDirectory() as tmpdir:
+        file_paths = [os.path.join(tmpdir, f'output.{x}') for x in ('csv', 'json', 'sqlite')]
+        with get_writer(file_paths, ['csv', 'json', 'sqlite'], WriterOptions(verbose=False)) as writer:
+            assert isinstance(writer, TeeWriter)
+            for firm_id in ('1', '2', '1'):
+                writer.write(catalog_doc(firm_id))
+
+        csv_path, json_path, sqlite_path = file_paths
+        assert len(read_csv(csv_path)) == 2
+        with open(json_path, 'r', encoding='utf-8-sig') as f:
+            assert len(json.load(f)) == 2
+
+        connection = sqlite3.connect(sqlite_path)
+        assert connection.execute('SELECT COUNT(*) FROM items').fetchone() == (2,)
+        connection.close()
+
+
+@pytest.mark.parametrize('formats', [('csv', 'parquet', 'sqlite'), ('parquet', 'sqlite', 'csv')])
+def test_tee_writer_joined_values(formats):
+    """Every table format represents multiple values of shared row its own way."""
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    with TemporaryDirectory() as tmpdir:
+        file_paths = [os.path.join(tmpdir, f'output.{x}') for x in formats]
+        with get_writer(file_paths, list(formats), WriterOptions(verbose=False)) as writer:
+            writer.write(catalog_doc())
+
+        csv_path, parquet_path, sqlite_path = (os.path.join(tmpdir, f'output.{x}') for x in ('csv', 'parquet', 'sqlite'))
+        assert read_csv(csv_path)[0]['Рубрики'] == 'Аптеки'
+        assert pq.read_table(parquet_path).column('rubrics').to_pylist() == [['Аптеки']]
+
+        connection = sqlite3.connect(sqlite_path)
+        assert connection.execute('SELECT rubrics FROM items').fetchone() == ('Аптеки',)
+        connection.close()
+
+
+def test_sharded_writer():
+    """Output gets rotated into valid shards listed by manifest."""
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, 'output.csv')
+        options = WriterOptions(verbose=False, async_write=False, shard_records=2)
+        with get_writer(result_path, 'csv', options) as writer:
+            for firm_id in ('1', '2', '1', '3', '4', '5'):
+                writer.write(catalog_doc(firm_id))
+
+        with open(os.path.join(tmpdir, 'output.csv.manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        assert manifest['records'] == 5
+        assert [(x['name'], x['records']) for x in manifest['shards']] == [
+            ('output-00001.csv', 2), ('output-00002.csv', 2), ('output-00003.csv', 1)]
+
+        shard = manifest['shards'][1]
+        shard_path = os.path.join(tmpdir, shard['name'])
+        with open(shard_path, 'rb') as f:
+            assert hashlib.sha256(f.read()).hexdigest() == shard['sha256']
+        assert [x['2GIS URL'] for x in read_csv(shard_path)] == ['https://2gis.com/firm/3',
+                                                                 'https://2gis.com/firm/4']
+
+        # Size limit is checked against flushed data
+        result_path = os.path.join(tmpdir, 'output.json')
+        options = WriterOptions(verbose=False, async_write=False, shard_bytes=10000)
+        with get_writer(result_path, 'json', options) as writer:
+            for firm_id in range(100):
+                writer.write(catalog_doc(str(firm_id)))
+
+        with open(os.path.join(tmpdir, 'output.json.manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        assert len(manifest['shards']) > 1
+        for shard in manifest['shards']:
+            with open(os.path.join(tmpdir, shard['name']), 'r', encoding='utf-8-sig') as f:
+                assert len(json.load(f)) == shard['records']
+
+
+def test_partitioned_writer():
+    """Records get routed into partitions by city and rubric or source URL."""
+    def partition_doc(firm_id, city, rubric):
+        doc = catalog_doc(firm_id)
+        doc['meta']['source_url'] = f'https://2gis.ru/{city}/search/{rubric}'
+        doc['result']['items'][0]['rubrics'][0]['name'] = rubric
+        return doc
+
+    with TemporaryDirectory() as tmpdir:
+        result_path = os.path.join(tmpdir, 'output')
+        options = WriterOptions(verbose=False, async_write=False, partition_by='rubric', partition_open_files=1)
+        with get_writer(result_path, 'csv', options) as writer:
+            writer.write(partition_doc('1', 'moscow', 'Аптеки'))
+            writer.write(partition_doc('2', 'moscow', 'Кафе'))
+            writer.write(partition_doc('3', 'moscow', 'Аптеки'))
+            writer.write(partition_doc('4', 'kazan', 'Кафе/бары'))
+            writer.write(catalog_doc('5'))  # No source URL
+
+        partitions = sorted(os.path.relpath(os.path.join(root, x), result_path)
+                            for root, _, files in os.walk(result_path) for x in files)
+        assert partitions == [os.path.join('kazan', 'Кафе_бары.csv'), os.path.join('moscow', 'Аптеки-00002.csv'),
+                              os.path.join('moscow', 'Аптеки.csv'), os.path.join('moscow', 'Кафе.csv'),
+                              os.path.join('unknown', 'Аптеки.csv')]
+        assert len(read_csv(os.path.join(result_path, 'moscow', 'Аптеки-00002.csv'))) == 1
+
+        # City is taken from source URL even if item has `adm_div` city
+        result_path = os.path.join(tmpdir, 'output_url')
+        doc = catalog_doc('1')
+        doc['meta']['source_url'] = 'https://2gis.ru/kazan/search/Аптеки'
+        options = WriterOptions(verbose=False, async_write=False, partition_by='url')
+        with get_writer(result_path, 'jsonl', options) as writer:
+            writer.write(doc)
+
+        assert os.listdir(os.path.join(result_path, 'kazan')) == [
+            hashlib.sha1(doc['meta']['source_url'].encode('utf-8')).hexdigest()[:12] + '.jsonl']
+
+
+def test_diff_writer():
+    """Only records added, changed or removed since the previous run get written."""
+    changed_doc = catalog_doc('2')
+    changed_doc['result']['items'][0]['address_name'] = 'Ленина, 2'
+
+    with TemporaryDirectory() as tmpdir:
+        index_path = os.path.join(tmpdir, 'diff.idx')
+        options = WriterOptions(verbose=False, async_write=False, diff_index=index_path)
+
+        result_path = os.path.join(tmpdir, 'first.jsonl')
+        with get_writer(result_path, 'jsonl', options) as writer:
+            for firm_id in ('1', '2', '3'):
+                writer.write(catalog_doc(firm_id))
+
+        result_path = os.path.join(tmpdir, 'second.csv')
+        with get_writer(result_path, 'csv', options) as writer:
+            for doc in (catalog_doc('1'), changed_doc, catalog_doc('4')):
+                writer.write(doc)
+
+        rows = read_csv(result_path)
+        assert [(x['Изменение'], x['2GIS URL']) for x in rows] == [
+            ('changed', 'https://2gis.com/firm/2'), ('added', 'https://2gis.com/firm/4'),
+            ('removed', 'https://2gis.com/firm/3')]
+        assert rows[0]['Адрес'] == 'Ленина, 2'
+
+        # Index gets built from JSON Lines output of the first run
+        base_options = WriterOptions(verbose=False, async_write=False, diff_index=index_path,
+                                     diff_base=os.path.join(tmpdir, 'first.jsonl'))
+        result_path = os.path.join(tmpdir, 'third.jsonl')
+        with get_writer(result_path, 'jsonl', base_options) as writer:
+            for firm_id in ('1', '2', '3'):
+                writer.write(catalog_doc(firm_id))
+
+        with open(result_path, 'r', encoding='utf-8') as f:
+            assert f.read() == ''
+
+
+def test_diff_writer_duplicates():
+    """Duplicates kept by the writer don't get reported as removed by the next run."""
+    with TemporaryDirectory() as tmpdir:
+        index_path = os.path.join(tmpdir, 'diff.idx')
+        options = WriterOptions(verbose=False, async_write=False, diff_index=index_path,
+                                csv=CSVOptions(remove_duplicates=False))
+        result_path = os.path.join(tmpdir, 'result.jsonl')
+        for firm_ids in (('1', '2', '1'), ('1', '2')):
+            with get_writer(result_path, 'jsonl', options) as writer:
+                for firm_id in firm_ids:
+                    writer.write(catalog_doc(firm_id))
+
+        with open(result_path, 'r', encoding='utf-8') as f:
+            assert f.read() == ''
+
+
+def test_compressed_output():
+    """Compressed CSV gets post-processed through compressed temporary table,
+    compressed JSON Lines file gets appended with a new zstd frame."""
+    with TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, 'output.csv.gz')
+        with CSVWriter(csv_path, WriterOptions(verbose=False, compression_level=1)) as writer:
+            writer.write(catalog_doc('1'))
+
+        assert os.listdir(tmpdir) == ['output.csv.gz']
+        with gzip.open(csv_path, 'rt', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]['Телефон'] == '84950000000 (справка)'
+
+        pytest.importorskip('zstandard')
+        jsonl_path = os.path.join(tmpdir, 'output.jsonl.zst')
+        for firm_ids in (('1', '2'), ('2', '3')):
+            options = WriterOptions(verbose=False, jsonl=JSONLOptions(append=True))
+            with JSONLWriter(jsonl_path, options) as writer:
+                for firm_id in firm_ids:
+                    writer.write(catalog_doc(firm_id))
+
+        with writer._open_file(jsonl_path, 'r') as f:
+            assert [json.loads(x)['id'] for x in f] == ['1_hash', '2_hash', '3_hash']
+
+
+def test_archive_writer():
+    """Archive documents by chunks over two runs, then read them back."""
+    with TemporaryDirectory() as tmpdir:
+        archive_path = os.path.join(tmpdir, 'archive.jsonl.gz')
+        options = WriterOptions(verbose=False, archive_path=archive_path, archive_chunk_size=2)
+        for firm_ids in (('1', '2', '3'), ('4',)):
+            csv_path = os.path.join(tmpdir, 'output.csv')
+            with ArchiveWriter(CSVWriter(csv_path, options), options) as writer:
+                for firm_id in firm_ids:
+                    writer.write(catalog_doc(firm_id))
+
+        assert len(read_csv(csv_path)) == 1
+
+        chunks = read_archive_index(archive_path)
+        assert [x.count for x in chunks] == [2, 1, 1]
+
+        chunk_docs = [doc for chunk in chunks for doc in read_archive_chunk(archive_path, chunk)]
+        assert chunk_docs == list(read_archive(archive_path))
+        assert [x['result']['items'][0]['id'] for x in chunk_docs] == ['1_hash', '2_hash', '3_hash', '4_hash']
+
+
+def test_stdout_output(capfd):
+    """Records get streamed to stdout, file formats are refused."""
+    options = WriterOptions(verbose=False, async_write=False)
+    with get_writer(STDOUT_PATH, 'jsonl', options) as writer:
+        writer.write(catalog_doc('1'))
+        assert json.loads(capfd.readouterr().out)['id'] == '1_hash'  # Written right away
+        writer.write(catalog_doc('2'))
+
+    assert json.loads(capfd.readouterr().out)['id'] == '2_hash'
+
+    with get_writer(STDOUT_PATH, 'csv', options) as writer:
+        writer.write(catalog_doc('1'))
+
+    rows = list(csv.DictReader(capfd.readouterr().out.splitlines()))
+    assert rows[0]['Телефон 1'] == '84950000000 (справка)'
+    assert 'Телефон 2' in rows[0]  # Empty columns are kept
+
+    with pytest.raises(WriterFormatUnavailable):
+        get_writer(STDOUT_PATH, 'xlsx', options)